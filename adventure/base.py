@@ -4,29 +4,152 @@ from typing import Optional
 
 from . import constants, materials, phrasing, commands, utils
 from .enums import Match
-from .utils import select_one, is_rough_match
+from .utils import ItemSet, select_one, is_rough_match
 
 Player = "adventure.base.Player"
 GameItem = "adventure.base.GameItem"
 GameRoom = "adventure.base.GameRoom"
 
 class GameEntity():
+    """Base class for everything in the game world.
+    
+    The core entity classes declare `__slots__`, so they don't carry a per-instance
+    `__dict__`.  Content subclasses that want extra attributes can either list them
+    in their own `__slots__`, or leave `__slots__` out entirely to opt back in to a
+    regular `__dict__`.
+    """
+    __slots__ = ()
+    
     def delete(self):
         pass
     
+    def touch(self):
+        """Note that something about this entity that shows up in descriptions has changed"""
+        pass
+    
+    def _contents_changed(self, own: int, nested: Optional[typ.List[int]], sign: int):
+        """Note that a thing with properties `own`, holding `nested` (see `_count_properties`),
+        has come into (`sign` 1) or gone out of (-1) this entity, somewhere down"""
+        pass
+    
+    def _contents_resized(self, space: int, weight: int):
+        """Note that what's in this entity takes up `space` more room and weighs `weight`
+        more (either can be negative)"""
+        pass
+
+
+def _count_properties(counts: Optional[typ.List[int]], own: int, nested: Optional[typ.List[int]],
+                      sign: int) -> Optional[typ.List[int]]:
+    """Add a thing (or take it away) from a summary of what's inside a container.
+    
+    A summary counts, for each material property bit, how many things in the
+    container's subtree have it.  None is an empty summary, since most things don't
+    hold anything.
+    """
+    if counts is None:
+        counts = [0] * materials.N_PROPERTIES
+    for bit in range(materials.N_PROPERTIES):
+        if own >> bit & 1:
+            counts[bit] += sign
+    if nested is not None:
+        for bit, count in enumerate(nested):
+            counts[bit] += sign * count
+    return counts if any(counts) else None
+
+
+# Where lit light sources are counted in a summary
+_LIT_BIT = materials.LIT.bit_length() - 1
+
+
+def _summary_mask(counts: Optional[typ.List[int]]) -> int:
+    if counts is None:
+        return 0
+    return sum(1 << bit for bit, count in enumerate(counts) if count)
+
+
+def _note_moved(container: GameEntity, item: "GameItem", sign: int):
+    """Update the summaries of `container` (and what it's in) for `item` arriving or leaving"""
+    own, nested = item.properties, item._nested_counts()
+    if own or nested is not None:
+        container._contents_changed(own, nested, sign)
+
+
+def _find_with(items: typ.Iterable["GameItem"], prop: int) -> typ.List["GameItem"]:
+    """Everything in `items`, or nested inside them, with all of the property bits in `prop`"""
+    found = []
+    pending = [items]
+    while pending:
+        for item in pending.pop():
+            if item.properties & prop == prop:
+                found.append(item)
+            # Only look inside if something in there could match
+            if item.nested_properties & prop == prop:
+                pending.append(item.items)
+    return found
+
+
+def _exits_changed():
+    """Let the engine know a room has gained or lost a way out, so it forgets its routes"""
+    from .engine import GameEngine
+    GameEngine.invalidate_routes()
+
+
+def _described_property(attr: str, doc: str):
+    """Property over the slot `attr` which touches the entity whenever it's set"""
+    def getter(self):
+        return getattr(self, attr)
+    
+    def setter(self, value):
+        setattr(self, attr, value)
+        self.touch()
+    
+    return property(getter, setter, doc=doc)
+
+    
 class Player(GameEntity):
+    __slots__ = ('name', 'inventory', '_room', 'visited_rooms', 'session')
+    
     def __init__(self, initial_inventory = [], name='Player McPlayerface'):
         self.name = name
         from .objects import GameContainer
         self.inventory = GameContainer("some", "pockets", capacity=3, items=initial_inventory)
         self.inventory.currently_in = self
         
-        self.room = None
+        self._room = None
+        # Every room the player has been in, in the order they first got there
+        self.visited_rooms = ItemSet()
+        self.session = None
+    
+    @property
+    def room(self) -> Optional[GameRoom]:
+        return self._room
+    
+    @room.setter
+    def room(self, room: Optional[GameRoom]):
+        carried = self.inventory._nested_counts()
+        if self._room is not None and carried is not None:
+            self._room._contents_changed(0, carried, -1)
+        
+        self._room = room
+        if room is not None:
+            self.visited_rooms.add(room)
+            if carried is not None:
+                room._contents_changed(0, carried, 1)
 
     @commands.SMELL
     def on_smell(self, player):
         return phrasing.foul_smelling_person(player == self)
     
+    def _contents_changed(self, own, nested, sign):
+        # What the player carries counts as being in the room they're in
+        if self._room is not None:
+            self._room._contents_changed(own, nested, sign)
+    
+    @property
+    def can_see(self) -> bool:
+        """Is there light to see by where the player is"""
+        return self._room is None or self._room.is_lit
+    
     def move_to(self, room: typ.Union[GameRoom, str]):
         if isinstance(room, str):
             room = GameEngine.get_room(room)
@@ -43,6 +166,18 @@ class Player(GameEntity):
 
 
 class GameItem(GameEntity):
+    # Whether this kind of item can combine with matching items (see `merge_into`)
+    is_stackable = False
+    # Whether this kind of item leads to another room, with a `goes_to` (i.e. a door)
+    is_exit = False
+    # Whether this kind of item holds things inside itself, so it takes up the same room
+    # however full it is (i.e. a chest).  Anything else gets bulkier with what's on it.
+    is_rigid = False
+    
+    __slots__ = ('_article', '_name', '_verb', '_location', '_is_scenery', '_material', '_combustible', 'size',
+                 '_is_secret', '_include_items_in_description', 'items', 'currently_in', 'used_space', 'capacity',
+                 '_nested', 'weight', '_contents_weight')
+    
     def __init__(self, 
                  article: str, 
                  name: str,
@@ -53,47 +188,172 @@ class GameItem(GameEntity):
                  verb: str = "is",
                  combustible: typ.Optional[bool] = None,
                  include_items_in_description: bool = True,
-                 size: int = 1):
+                 size: int = 1,
+                 weight: typ.Optional[int] = None):
         super().__init__()
-        self.article = article
-        self.name = name
-        self.verb = verb
-        self.location = None
-        self.is_scenery = is_scenery
-        self.material = material
-        self.verb = verb
+        self._article = article
+        self._name = name
+        self._verb = verb
+        self._location = None
+        self._is_scenery = is_scenery
+        self._material = material
         self._combustible = combustible
         self.size = size
-        self.is_secret = is_secret
-        self.include_items_in_description = include_items_in_description
+        self.weight = size if weight is None else weight
+        self._is_secret = is_secret
+        self._include_items_in_description = include_items_in_description
         
-        self.items = list(items)
+        self.currently_in = None
+        self.capacity = 10000
+        
+        self.items = ItemSet(items)
+        self.used_space = 0
+        self._contents_weight = 0
+        self._nested = None
         for item in self.items:
             item.currently_in = self
             item.location = None
-        
-        self.currently_in = None
-        self.used_space = 0
-        self.capacity = 10000
+            self.used_space += item.total_size()
+            self._contents_weight += item.total_weight()
+            self._nested = _count_properties(self._nested, item.properties, item._nested_counts(), 1)
+    
+    article = _described_property('_article', "Article, i.e. 'a' or 'some'")
+    name = _described_property('_name', "Name of the item")
+    verb = _described_property('_verb', "Verb for describing the item, i.e. 'is' or 'are'")
+    include_items_in_description = _described_property(
+        '_include_items_in_description', "Describe the contents along with the item")
+    
+    def touch(self):
+        if self.currently_in is not None:
+            self.currently_in.touch()
+    
+    @property
+    def material(self) -> materials.Material:
+        """What the item is made of"""
+        return self._material
+    
+    @material.setter
+    def material(self, material: materials.Material):
+        before = self.properties
+        self._material = material
+        self._properties_changed(before)
+        self.touch()
+    
+    def _properties_changed(self, before: int):
+        """Update the summaries of whatever this is in, if `properties` has changed from `before`"""
+        after = self.properties
+        if before != after and self.currently_in is not None:
+            self.currently_in._contents_changed(before, None, -1)
+            self.currently_in._contents_changed(after, None, 1)
+    
+    def _set_indexed(self, attr: str, value):
+        """Set an attribute that rooms index their items by, keeping our room's index up to date"""
+        room = self.currently_in
+        if not isinstance(room, GameRoom):
+            setattr(self, attr, value)
+            self.touch()
+            return
+        
+        room._unindex(self)
+        setattr(self, attr, value)
+        room._index(self)
+        room.touch()
+    
+    @property
+    def location(self) -> Optional[str]:
+        """Where in its room the item is, i.e. "on the table".  None unless directly in a room"""
+        return self._location
+    
+    @location.setter
+    def location(self, value: Optional[str]):
+        self._set_indexed('_location', value)
+    
+    @property
+    def is_scenery(self) -> bool:
+        """Is this part of the scenery"""
+        return self._is_scenery
+    
+    @is_scenery.setter
+    def is_scenery(self, value: bool):
+        self._set_indexed('_is_scenery', value)
+    
+    @property
+    def is_secret(self) -> bool:
+        """Is this hidden from the player"""
+        return self._is_secret
+    
+    @is_secret.setter
+    def is_secret(self, value: bool):
+        self._set_indexed('_is_secret', value)
+    
+    def total_size(self) -> int:
+        """How much room this item takes up where it is, with whatever's on it"""
+        return self.size if self.is_rigid else self.size + self.used_space
+    
+    def total_weight(self) -> int:
+        """What this item and everything in it weighs"""
+        return self.weight + self._contents_weight
+    
+    def has_room_for(self, space: int) -> bool:
+        """Could something taking up `space` go in this item.  Only looks up through
+        what it's in as far as the first rigid container, since that's as far as
+        anything gets any bigger."""
+        container = self
+        while isinstance(container, GameItem):
+            if container.used_space + space > container.capacity:
+                return False
+            if container.is_rigid:
+                return True
+            container = container.currently_in
+        return True
+    
+    def _contents_resized(self, space, weight):
+        self.used_space += space
+        self._contents_weight += weight
+        if self.is_rigid:
+            space = 0
+        if self.currently_in is not None and (space or weight):
+            self.currently_in._contents_resized(space, weight)
     
     def add(self, item):
-        if item.size + self.used_space > self.capacity:
+        if item in self.items:
+            return
+        
+        if not self.has_room_for(item.total_size()):
             raise ValueError("Not enough space to add that")
         
-        self.items.append(item)
-        if item.currently_in is not None:
-            item.currently_in.remove(item)
+        item._leave_container()
+        if item.is_stackable and item.merge_into(self.items) is not None:
+            return
+        
+        self.items.add(item)
         item.currently_in = self
         item.location = None
-        self.used_space += item.size
+        self._contents_resized(item.total_size(), item.total_weight())
+        _note_moved(self, item, 1)
+        self.touch()
         
     def remove(self, item: GameItem):
         if item not in self.items:
             raise ValueError(f"{item} not in {self}")
         
         self.items.remove(item)
+        self._contents_resized(-item.total_size(), -item.total_weight())
+        _note_moved(self, item, -1)
         if item.currently_in == self:
             item.currently_in = None
+        self.touch()
+    
+    def _leave_container(self):
+        """Take this item out of whatever it's in, ahead of putting it somewhere else"""
+        if self.currently_in is not None:
+            self.currently_in.remove(self)
+    
+    def merge_into(self, neighbours: typ.Iterable["GameItem"]) -> Optional["GameItem"]:
+        """Called (for stackable items) when this item is put down next to `neighbours`.
+        Returns the item it merged into, if it did, in which case it isn't added itself.
+        """
+        return None
     
     def possessive_or_the(self, relative_to: Player):
         item = self
@@ -110,9 +370,7 @@ class GameItem(GameEntity):
     def delete(self):
         super().delete()
         
-        if self.currently_in is not None:
-            self.currently_in.remove(self)
-            
+        self._leave_container()
         self.currently_in = None
         
     @property
@@ -122,12 +380,40 @@ class GameItem(GameEntity):
         if self._combustible is not None:
             return self._combustible
         return self.material.combustible
+    
+    @property
+    def properties(self) -> int:
+        """The item's own material properties as bits, i.e. `materials.COMBUSTIBLE`"""
+        flags = self.material.flags
+        if self.is_combustible:
+            return flags | materials.COMBUSTIBLE
+        return flags & ~materials.COMBUSTIBLE
+    
+    def _nested_counts(self) -> Optional[typ.List[int]]:
+        return self._nested
+    
+    @property
+    def nested_properties(self) -> int:
+        """Property bits that at least one thing somewhere inside this item has"""
+        return _summary_mask(self._nested)
+    
+    def _contents_changed(self, own, nested, sign):
+        self._nested = _count_properties(self._nested, own, nested, sign)
+        if self.currently_in is not None:
+            self.currently_in._contents_changed(own, nested, sign)
+    
+    def find_with(self, prop: int) -> typ.List[GameItem]:
+        """Everything inside this item (at any depth) with all of the property bits in
+        `prop`, i.e. `materials.COMBUSTIBLE`.  Only looks inside things that hold some."""
+        if self.nested_properties & prop != prop:
+            return []
+        return _find_with(self.items, prop)
 
     @property
     def short_description(self) -> str:
         suffix = ''
         if self.items and self.include_items_in_description:
-            suffix = ' with ' + phrasing.natural_list([x.short_description for x in self.items])
+            suffix = ' with ' + phrasing.natural_list(phrasing.summarize_items(self.items))
         
         if self.material == materials.DEFAULT:
             return self.article + " " + self.name + suffix
@@ -173,6 +459,8 @@ class GameItem(GameEntity):
     
     @commands.LOOK
     def on_look(self, player: Player):
+        if not player.can_see:
+            return "It's too dark to make it out."
         return f"You see " + self.short_description
     
     @commands.SMELL
@@ -219,29 +507,122 @@ class GameItem(GameEntity):
     
     @commands.DISCARD
     def on_drop(self, player):
-        if self not in player.inventory.items:
+        if self.currently_in is not player.inventory:
             return "You can't drop a thing you don't have"
         
-        player.inventory.remove(self)
-        player.inventory.used_space -= self.size
-        
         player.room.add(self, "on the floor")
         
         return f"You drop the {self.name}"
 
 class GameRoom(GameEntity):
-    def __init__(self, title: str, description: Optional[str] = None, objects: typ.Dict[str, typ.List[GameItem]] = {}):
+    """A place in the game world.
+    
+    Besides `items`, a room keeps its visible (non-secret) items bucketed by where
+    in the room they are, separately for scenery and everything else.  The buckets
+    are kept up to date as items come and go (or change location, or become secret
+    or scenery), so describing the room only touches the groups it's going to print.
+    
+    `version` goes up whenever anything in the room changes in a way that could show
+    up in its description.  Looking around caches what it worked out for the current
+    version, and only picks the phrasing fresh each time.
+    
+    `exits` are the items in the room which lead elsewhere (i.e. doors), and
+    `room_id` is the id the room is registered with the engine under.
+    
+    Rooms, like items, keep a count of the material properties of everything inside
+    them at any depth, so `find_with` can skip whatever holds nothing it's after.
+    What the players in the room are carrying counts too, and one of the things
+    counted is lit light sources, so whether a dark room `is_lit` is a lookup.
+    """
+    __slots__ = ('items', 'name', 'description', 'room_id', 'exits', 'version',
+                 '_scenery_groups', '_item_groups', '_look_cache', '_nested', '_is_dark')
+    
+    def __init__(self, title: str, description: Optional[str] = None, objects: typ.Dict[str, typ.List[GameItem]] = {},
+                 is_dark: bool = False):
         super().__init__()
-        self.items = []
+        self.items = ItemSet()
         self.name = title
         self.description = description
+        self.room_id = None
+        self.exits = ItemSet()
+        self.version = 0
+        self._scenery_groups = {}
+        self._item_groups = {}
+        self._look_cache = None
+        self._nested = None
+        self._is_dark = is_dark
         
         self.add_objects(objects)
     
+    is_dark = _described_property('_is_dark', "Does the room need a light to see anything in it")
+    
+    @property
+    def is_lit(self) -> bool:
+        """Can anyone see in here: it isn't dark, or there's a lit light somewhere in it"""
+        return not self._is_dark or self._nested is not None and self._nested[_LIT_BIT] > 0
+    
+    def touch(self):
+        self.version += 1
+    
+    def _contents_changed(self, own, nested, sign):
+        self._nested = _count_properties(self._nested, own, nested, sign)
+    
+    @property
+    def nested_properties(self) -> int:
+        """Property bits that at least one thing somewhere in the room has"""
+        return _summary_mask(self._nested)
+    
+    def find_with(self, prop: int) -> typ.List[GameItem]:
+        """Everything in the room (at any depth) with all of the property bits in `prop`"""
+        if self.nested_properties & prop != prop:
+            return []
+        return _find_with(self.items, prop)
+    
+    def _index(self, item: GameItem):
+        if item.is_secret:
+            return
+        
+        groups = self._scenery_groups if item.is_scenery else self._item_groups
+        group = groups.get(item.location)
+        if group is None:
+            group = groups[item.location] = ItemSet()
+        group.add(item)
+    
+    def _unindex(self, item: GameItem):
+        groups = self._scenery_groups if item.is_scenery else self._item_groups
+        group = groups.get(item.location)
+        if group is not None:
+            group.discard(item)
+            if not group:
+                del groups[item.location]
+    
+    def _beside(self, item: GameItem, location: str) -> typ.Iterable[GameItem]:
+        """Items at `location` which `item` could stack with, i.e. in the same bucket"""
+        if item.is_secret:
+            # Secret items aren't bucketed, but there's rarely any of them
+            return (x for x in self.items if x.location == location and x.is_secret)
+        
+        groups = self._scenery_groups if item.is_scenery else self._item_groups
+        return groups.get(location, ())
+    
     def add(self, item: GameItem, location: str):
+        if item in self.items:
+            item.location = location
+            return
+        
+        item._leave_container()
+        if item.is_stackable and item.merge_into(self._beside(item, location)) is not None:
+            return
+        
         item.location = location
-        self.items.append(item)
+        self.items.add(item)
         item.currently_in = self
+        self._index(item)
+        _note_moved(self, item, 1)
+        if item.is_exit:
+            self.exits.add(item)
+            _exits_changed()
+        self.touch()
         
     def add_objects(self, objects: typ.Dict[str, typ.List[GameItem]]):
         for location, obj_list in objects.items():
@@ -255,22 +636,39 @@ class GameRoom(GameEntity):
         if item not in self.items:
             raise ValueError(f"{item} isn't in {self}")
         
-        item.location = None
         self.items.remove(item)
+        self._unindex(item)
+        if item.is_exit:
+            self.exits.discard(item)
+            _exits_changed()
+        _note_moved(self, item, -1)
         if item.currently_in == self:
             item.currently_in = None
+        item.location = None
+        self.touch()
     
     @commands.LOOK
     def on_look(self, player: Player):
+        if not self.is_lit:
+            return phrasing.dark_room()
+        
         if self.description is not None:
             desc = self.description + "\n\n"
         else:
             desc = "You are in " + self.name + ".  "
             
-        scenery_desc = phrasing.describe_items([x for x in self.items if x.is_scenery and not x.is_secret])
+        if self._look_cache is None or self._look_cache[0] != self.version:
+            self._look_cache = (
+                self.version,
+                phrasing.group_parts(self._scenery_groups),
+                phrasing.group_parts(self._item_groups)
+            )
+        _, scenery_parts, item_parts = self._look_cache
+            
+        scenery_desc = phrasing.describe_parts(scenery_parts)
         if scenery_desc:
             desc += scenery_desc + "\n\n"
             
-        desc += phrasing.describe_items([x for x in self.items if not x.is_scenery and not x.is_secret])
+        desc += phrasing.describe_parts(item_parts)
         
-        return desc
\ No newline at end of file
+        return desc
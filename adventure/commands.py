@@ -4,7 +4,8 @@ import typing as typ
 import inspect, functools
 from collections import defaultdict
 from .enums import Match
-from .constants import CURRENT_OBJECT_WORDS
+from .constants import CURRENT_OBJECT_WORDS, SCOPE_DEPTH
+from .utils import is_rough_match
 
 import re
 
@@ -27,15 +28,37 @@ def _get_class_that_defined_method(meth):
     return getattr(meth, '__objclass__', None)
 
 class _CommandContext():
+    """What the player could be talking about on this turn.
+    
+    Every listener's search goes through the same context, so the expensive parts
+    are worked out once per turn and shared: the visible (non-secret) items in each
+    place searched, those split up by class, and how well each item matches each
+    bit of text tried.  `reset_context` only picks which of those views a search
+    reads.
+    
+    The visible items of a place include what's inside the open containers there,
+    down to `SCOPE_DEPTH` containers deep.  They're gathered into one flat list,
+    along with how deep each one is, so a search never walks the tree itself.
+    Nothing in a dark room is visible except its exits.
+    """
     def __init__(self, player, current_context_obj=None, addl_contexts = []):
         self._player = player
         self._current_context_obj = current_context_obj
         self._addl_contexts = addl_contexts or []
+        self._portions = {}
+        
+        self._base_context = [self._player.inventory, self._player.room] + self._addl_contexts + ([] if self._current_context_obj is None else [self._current_context_obj])
+        # (container, class or None) -> its visible items of that class, nested ones included
+        self._visible = {}
+        # container -> {item: how many containers deep it is in there}
+        self._depth = {}
+        # (item, text) -> how well the item matches the text
+        self._matches = {}
         
         self.reset_context()
     
     def reset_context(self, cls_limit=None, exclude_objs=None, limit_to=None):
-        self._search_context = [self._player.inventory, self._player.room] + self._addl_contexts + ([] if self._current_context_obj is None else [self._current_context_obj])
+        self._search_context = self._base_context
         self._cls_limit = cls_limit
         self._exclude_objs = exclude_objs
         self._limit_to = limit_to
@@ -48,26 +71,72 @@ class _CommandContext():
     def room(self):
         return self._player.room
     
+    def _visible_in(self, ctx, cls=None) -> typ.List[GameEntity]:
+        key = (ctx, cls)
+        items = self._visible.get(key)
+        if items is None:
+            if cls is None:
+                items = self._gather(ctx)
+            else:
+                items = [x for x in self._visible_in(ctx) if isinstance(x, cls)]
+            self._visible[key] = items
+        return items
+    
+    def _gather(self, ctx) -> typ.List[GameEntity]:
+        """Everything visible in `ctx`, nearest first, noting how deep each thing is"""
+        items = []
+        depths = self._depth[ctx] = {}
+        
+        if hasattr(ctx, 'exits') and not ctx.is_lit:
+            # Nothing to be seen in a dark room, but the way out can be found by feel
+            items = [x for x in ctx.exits if not x.is_secret]
+            depths.update((x, 1) for x in items)
+            return items
+        
+        level, depth = [ctx], 1
+        while level and depth <= SCOPE_DEPTH:
+            inner = []
+            for container in level:
+                for item in getattr(container, 'items', ()):
+                    if getattr(item, 'is_secret', False):
+                        continue
+                    
+                    items.append(item)
+                    depths[item] = depth
+                    
+                    if getattr(item, 'items', None) and not getattr(item, 'is_closed', False):
+                        inner.append(item)
+            
+            level, depth = inner, depth + 1
+        
+        return items
+    
+    def _candidates(self, ctx) -> typ.Iterable[GameEntity]:
+        items = self._visible_in(ctx, self._cls_limit)
+        
+        if self._limit_to:
+            items = [x for x in items if x in self._limit_to]
+        
+        if self._exclude_objs:
+            items = [x for x in items if x not in self._exclude_objs]
+        
+        return items
+    
+    def _match(self, item: GameEntity, desc: str) -> Match:
+        key = (item, desc)
+        m = self._matches.get(key)
+        if m is None:
+            m = self._matches[key] = item.matches_name(desc)
+        return m
+    
     def _match_obj(self, desc: str, look_in: GameEntity) -> typ.Tuple[Match, typ.List[GameEntity]]:
         matches = []
         
         if not hasattr(look_in, "items"):
             return (Match.NoMatch, [])
         
-        for item in look_in.items:
-            if getattr(item, 'is_secret', False):
-                continue
-            
-            if self._exclude_objs and item in self._exclude_objs:
-                continue
-            
-            if self._cls_limit is not None and not isinstance(item, self._cls_limit):
-                continue
-            
-            if self._limit_to and item not in self._limit_to:
-                continue
-            
-            m = item.matches_name(desc)
+        for item in self._candidates(look_in):
+            m = self._match(item, desc)
             if m == Match.FullWithDetail:
                 return (m, [item])
             
@@ -77,6 +146,11 @@ class _CommandContext():
         best = max((x[0] for x in matches), default=Match.NoMatch)
         matches = [x[1] for x in matches if x[0] == best]
         
+        # Equally good matches are settled in favour of whatever's nearest to hand
+        depths = self._depth.get(look_in, {})
+        nearest = min((depths.get(x, 1) for x in matches), default=1)
+        matches = [x for x in matches if depths.get(x, 1) == nearest]
+        
         return (best, matches)
     
     def find_objects(self, desc: str) -> typ.Tuple[Match, typ.List[GameEntity]]:
@@ -102,31 +176,49 @@ class _CommandContext():
             if not hasattr(ctx, 'items'):
                 continue
             
-            for item in ctx.items:
-                if item.is_secret:
-                    continue
-                
-                if self._exclude_objs and item in self._exclude_objs:
-                    continue
-                
-                if self._cls_limit is not None and not isinstance(item, self._cls_limit):
-                    continue
-                
-                if self._limit_to and item not in self._limit_to:
-                    continue
-                
-                yield item
+            yield from self._candidates(ctx)
                 
             yield ctx
     
     def narrow_context(self, obj):
         self._search_context = [obj]
+    
+    def find_rooms(self, desc: str) -> typ.Tuple[Match, typ.List["adventure.base.GameRoom"]]:
+        """Find rooms the player has been to which might be called `desc`.  Rooms you
+        can walk straight into through a door here are left out, since the door
+        itself is what you'd be talking about."""
+        here = self.room
+        next_door = {
+            x.goes_to for x in getattr(here, 'exits', ())
+            if not x.is_locked and not x.is_secret
+        }
+        
+        best_m, best_rooms = Match.NoMatch, []
+        for room in self._player.visited_rooms:
+            if room in next_door:
+                continue
+            
+            m = is_rough_match(desc, room.name)
+            if m > best_m:
+                best_m, best_rooms = m, [room]
+            elif m == best_m and m != Match.NoMatch:
+                best_rooms.append(room)
+        
+        return best_m, best_rooms
+    
+    def portion_of(self, obj, quantity: int):
+        """Portion of a stackable object, reusing the same one for every command tried this turn"""
+        key = (id(obj), quantity)
+        if key not in self._portions:
+            self._portions[key] = (obj, obj.portion(quantity))
+        return self._portions[key][1]
 
 class Command():
     _DEFERRED_CLASS_REGISTERS = []
     _REGISTERED_CLASS_LISTENERS = defaultdict(list)
     _REGISTERED_GENERIC_LISTENERS = defaultdict(list)
-    _REGISTERED_OBJECT_LISTENERS = defaultdict(list)
+    # entity -> {command: handlers}, so only entities in scope need looking at
+    _REGISTERED_OBJECT_LISTENERS = defaultdict(lambda: defaultdict(list))
     _REGISTERED_OBJECT_EXCLUSIONS = defaultdict(list)
     
     _KNOWN_COMMANDS = []
@@ -185,12 +277,16 @@ class Command():
         return fn
         
     def register_object_handler(self, fn, obj):
-        Command._REGISTERED_OBJECT_LISTENERS[(self, obj)].append(fn)
+        Command._REGISTERED_OBJECT_LISTENERS[obj][self].append(fn)
         return fn
     
     def unregister_object_handler(self, obj):
-        if (self, obj) in Command._REGISTERED_OBJECT_LISTENERS:
-            del Command._REGISTERED_OBJECT_LISTENERS[(self, obj)]
+        listeners = Command._REGISTERED_OBJECT_LISTENERS.get(obj)
+        if listeners is not None and self in listeners:
+            del listeners[self]
+            
+            if not listeners:
+                del Command._REGISTERED_OBJECT_LISTENERS[obj]
             
     def unregister_generic_handler(self, fn):
         if fn in _REGISTERED_GENERIC_LISTENERS[self]:
@@ -204,6 +300,10 @@ class Command():
         if match == Match.NoMatch:
             handlers = []
         
+        # "take 3 coins" acts on just part of the pile
+        if match_info.get('quantity') is not None and match_info.get('object') is not None:
+            match_info['object'] = context.portion_of(match_info['object'], match_info['quantity'])
+        
         # Make the handler apply to the specific object if there is one
         if 'object' in match_info and match_info['object'] is not None:
             if cls and not isinstance(match_info['object'], cls):
@@ -276,14 +376,22 @@ class Command():
             elif match == best_match_type:
                 best_match_list.append(match_info)
         
-        for (cmd_obj, obj), handlers in Command._REGISTERED_OBJECT_LISTENERS.items():
-            context.reset_context(limit_to = [obj])
-            match, match_info = run_search(cmd_obj, handlers)
-            
-            if match > best_match_type:
-                best_match_type, best_match_list = match, [match_info]
-            elif match == best_match_type:
-                best_match_list.append(match_info)
+        # Only entities the player could be talking about can have their listeners match
+        context.reset_context()
+        in_scope = [
+            x for x in dict.fromkeys(context.available_objects())
+            if x in Command._REGISTERED_OBJECT_LISTENERS
+        ]
+        
+        for obj in in_scope:
+            for cmd_obj, handlers in Command._REGISTERED_OBJECT_LISTENERS[obj].items():
+                context.reset_context(limit_to = [obj])
+                match, match_info = run_search(cmd_obj, handlers)
+                
+                if match > best_match_type:
+                    best_match_type, best_match_list = match, [match_info]
+                elif match == best_match_type:
+                    best_match_list.append(match_info)
             
         if best_match_type == Match.NoMatch:
             best_match_list.clear()
@@ -422,19 +530,45 @@ class _MultiMatchToken(_ParseToken):
         return False, {}
 
 class _StringArg(_ParseToken):
-    def __init__(self):
+    def __init__(self, entity_name='string_arg'):
         super().__init__([])
+        self.entity_name = entity_name
     
     def parse(self, text, context):
         if text is None or text.strip() == '':
             return False, {}
         
-        return True, {'arg': text}
+        bits = text.strip().split(' ')
+        
+        # Same as objects: whatever the verb (etc) on either side doesn't take is the argument
+        for l_idx in range(0, (1 if self._children[0] is None else len(bits)+1)):
+            for r_idx in range(len(bits), (len(bits)-1 if self._children[1] is None else l_idx-1), -1):
+                arg = ' '.join(bits[l_idx:r_idx])
+                if arg.strip() == '':
+                    continue
+                
+                child_match, res = self._parse_children([' '.join(bits[0:l_idx]), ' '.join(bits[r_idx:])], context)
+                if child_match:
+                    res[self.entity_name] = arg if self._children != [None, None] else text
+                    return True, res
+        return False, {}
 
 class _MatchObject(_ParseToken):
-    def __init__(self, entity_name, l_child, r_child):
+    def __init__(self, entity_name, l_child, r_child, allow_quantity=False):
         super().__init__([l_child, r_child])
         self.entity_name = entity_name
+        self.allow_quantity = allow_quantity
+    
+    def _find_quantity(self, bits, context):
+        """Look for "<number> <stackable object>", returning (quantity, object) or None"""
+        if not self.allow_quantity or len(bits) < 2 or not bits[0].isdigit() or int(bits[0]) < 1:
+            return None
+        
+        match, opts = context.find_objects(' '.join(bits[1:]))
+        stacks = [x for x in opts if getattr(x, 'is_stackable', False)]
+        if stacks:
+            return int(bits[0]), stacks[0]
+        return None
         
     def parse(self, text, context):
         text = text.lower().strip()
@@ -452,12 +586,41 @@ class _MatchObject(_ParseToken):
                 if not child_match:
                     continue
         
+                quantity = self._find_quantity(bits[l_idx:r_idx], context)
+                if quantity is not None:
+                    res['quantity'], res[self.entity_name] = quantity
+                    return True, res
+                
                 match, opts = context.find_objects(''.join(bits[l_idx:r_idx]))
                 if opts:
                     res[self.entity_name] = opts[0]
                     return True, res
         return False, {}
 
+class _MatchRoom(_ParseToken):
+    def __init__(self, entity_name, l_child, r_child):
+        super().__init__([l_child, r_child])
+        self.entity_name = entity_name
+        
+    def parse(self, text, context):
+        text = text.lower().strip()
+        if text == '':
+            return False, {}
+        
+        bits = text.split(' ')
+        
+        for l_idx in range(0, (1 if self._children[0] is None else len(bits)+1)):
+            for r_idx in range(len(bits), (len(bits)-1 if self._children[1] is None else l_idx-1), -1):
+                child_match, res = self._parse_children([' '.join(bits[0:l_idx]), ' '.join(bits[r_idx:])], context)
+                if not child_match:
+                    continue
+                
+                match, rooms = context.find_rooms(' '.join(bits[l_idx:r_idx]))
+                if len(rooms) == 1:
+                    res[self.entity_name] = rooms[0]
+                    return True, res
+        return False, {}
+
 class _ObjectInToken(_MatchObject):
     def __init__(self, l_child, r_child):
         super().__init__('object_in', l_child, r_child)
@@ -523,13 +686,15 @@ def _inner_parse_pattern(pattern, verbs, verbose=False, print_prefix=''):
             default = {entity: split[1]}
         
         if entity == 'object':
-            return _MatchObject(entity, None, None), default
+            return _MatchObject(entity, None, None, allow_quantity=True), default
         if entity == 'object_arg':
-            return _MatchObject('arg', None, None), default
+            return _MatchObject(entity, None, None), default
         if entity == 'string_arg':
-            return _StringArg(), default
+            return _StringArg(entity), default
         if entity == 'object_in':
             return _ObjectInToken(None, None), default
+        if entity == 'room':
+            return _MatchRoom(entity, None, None), default
         
         print("Failed to parse", entity)
         return None, {}
@@ -714,4 +879,47 @@ PUT_IN = Command(
     ['put', 'place', 'store', 'sequester'],
     args_list=['object_arg'],
     examples=['put the knife in the cabinet', 'store the scroll in the chest', 'sequester the Congress in Hell']
-)
\ No newline at end of file
+)
+
+TRAVEL = Command(
+    "Go back to a room you've been to before, by the shortest way you can",
+    "{verb} {room}",
+    ['travel to', 'go back to', 'head back to', 'return to', 'head to', 'walk to', 'go to'],
+    args_list=['room'],
+    examples=['go back to the dining room', 'travel to the library']
+)
+
+COMBINE = Command(
+    "Combine things to make something new",
+    "{verb} {string_arg}",
+    ['combine', 'mix', 'put together', 'craft with'],
+    args_list=['string_arg'],
+    examples=['combine the string and the paperclip', 'mix the eye of newt, the toe of frog and the wool of bat']
+)
+
+BURN = Command(
+    "Set something on fire",
+    CommandPattern.VERB_AND_OBJECT,
+    ['burn', 'ignite', 'set fire to', 'set light to', 'torch'],
+    examples=['burn the letter', 'set fire to the curtains']
+)
+
+LIGHT = Command(
+    "Light a lamp, candle or other light",
+    CommandPattern.VERB_AND_OBJECT,
+    ['light', 'turn on', 'switch on', 'kindle'],
+    examples=['light the lantern', 'turn on the flashlight']
+)
+
+EXTINGUISH = Command(
+    "Put out a light",
+    CommandPattern.VERB_AND_OBJECT,
+    ['put out', 'extinguish', 'blow out', 'snuff', 'turn off', 'switch off'],
+    examples=['blow out the candle', 'turn off the flashlight']
+)
+
+SHOW_RECIPES = Command(
+    "See what you could make out of what you're carrying",
+    CommandPattern.JUST_VERB,
+    ['what can i make', 'what can i craft', 'recipes'],
+)
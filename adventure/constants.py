@@ -2,4 +2,19 @@ STOP_WORDS = ['the', 'a', 'an', 'your', 'with', 'in', 'on', 'to', 'from', 'throu
 
 SELF_WORDS = ['yourself', 'me', 'myself']
 
-CURRENT_OBJECT_WORDS = ['it', 'that']
\ No newline at end of file
+CURRENT_OBJECT_WORDS = ['it', 'that']
+
+# Most distinct things to list when describing a room or container, before the
+# rest are summed up as "N other things"
+LISTING_LIMIT = 20
+
+# How many containers deep the player can refer to things without saying where they
+# are, i.e. "take cobweb" for the cobweb on the wine glasses in the place settings
+SCOPE_DEPTH = 3
+
+# Most steps an NPC nobody was watching takes when it's caught up.  A random walk
+# soon forgets where it started, so walking any further wouldn't look any different
+NPC_CATCH_UP_STEPS = 16
+
+# Turns something burns for before there's nothing left of it
+FIRE_BURN_TURNS = 3
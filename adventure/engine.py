@@ -1,18 +1,26 @@
 import abc
-import re
+import contextlib
+import copy
+import io
+import os
+import queue
+import select
 import sys
+import threading
 import typing as typ
-from collections import namedtuple
+import weakref
+from collections import deque, namedtuple
 from dataclasses import dataclass, field
-from time import sleep
+from time import monotonic, sleep
 from typing import Optional
 
-from . import phrasing, commands
+from . import phrasing, commands, templates, utils
+from .fire import Fire
+from .npcs import NpcRoster
+from .scheduler import Scheduler
 from .base import GameEntity, GameItem, GameRoom, Player
 from .enums import Match
 
-from nameparser import HumanName
-
 
 @dataclass
 class GameDefinition():
@@ -36,16 +44,38 @@ class UserInterface(abc.ABC):
     
     @abc.abstractmethod
     def get_response(self, prompt: Optional[str] = None, default: str = '') -> str: pass
+    
+    def display_texts(self, texts: typ.List[str]) -> None:
+        """Show several messages at once, i.e. everything from one turn.  By default
+        they go to `display_text` as one block of text."""
+        self.display_text("\n\n\n".join(texts))
+    
+    def flush(self) -> None:
+        """Block until everything passed to `display_text` has actually been shown"""
+        pass
 
     
 class TerminalInterface(UserInterface):
-    def __init__(self, char_delay=0.02, newline_delay=0.25):
+    """Prints text with a typewriter effect.
+    
+    Text is rendered by a background thread which writes a chunk of characters per
+    frame (one write + flush), so `display_text` returns immediately.  Prompts wait
+    for the rendering to finish, and pressing any key while waiting skips the rest
+    of the animation.  The terminal is taken out of line-at-a-time mode for the wait,
+    so the key counts without Enter, and it's left for the prompt, so typing ahead
+    a command doesn't lose its first letter.
+    """
+    def __init__(self, char_delay=0.02, newline_delay=0.25, frame_interval=1/30):
         self.char_delay = char_delay
         self.newline_delay = newline_delay
-    
-    def display_text(self, text):
-        print()
+        self.frame_interval = frame_interval
         
+        self._frames = queue.Queue()
+        self._skip = threading.Event()
+        self._renderer = None
+    
+    def _plan_frames(self, text):
+        """Split text into (chunk, delay after chunk) pairs"""
         c_delay = self.char_delay
         l_delay = self.newline_delay
         
@@ -54,25 +84,149 @@ class TerminalInterface(UserInterface):
         if len(lines) > 10:
             c_delay *= 0.1
             l_delay *= 5/len(lines)
-            
         
-        for line in text.split("\n"):
-            if c_delay == 0:
-                print(line, end='')
+        chunk_len = 0 if c_delay == 0 else max(1, int(self.frame_interval / c_delay))
+        
+        frames = [("\n", 0)]
+        for line in lines:
+            if chunk_len == 0:
+                frames.append((line, 0))
             else:
-                for c in line:
-                    print(c, end='')
-                    sys.stdout.flush()
-                    sleep(c_delay)
+                for idx in range(0, len(line), chunk_len):
+                    chunk = line[idx:(idx + chunk_len)]
+                    frames.append((chunk, len(chunk) * c_delay))
             
-            print()
-            sleep(l_delay)
-        print()
+            frames.append(("\n", l_delay))
+        frames.append(("\n", 0))
+        
+        return frames
+    
+    def _render_loop(self):
+        while True:
+            frames = self._frames.get()
+            try:
+                self._render(frames)
+            finally:
+                self._frames.task_done()
+    
+    def _render(self, frames):
+        pending = ''
+        next_time = monotonic()
+        for chunk, delay in frames:
+            pending += chunk
+            if delay == 0 or self._skip.is_set():
+                continue
+            
+            sys.stdout.write(pending)
+            sys.stdout.flush()
+            pending = ''
+            
+            next_time += delay
+            self._skip.wait(max(0, next_time - monotonic()))
+        
+        if pending:
+            sys.stdout.write(pending)
+            sys.stdout.flush()
+    
+    @contextlib.contextmanager
+    def _watching_keys(self):
+        """Yields a function which waits up to a timeout for a keypress.  The key is left
+        where it is, so whatever's typed ahead still reaches the next prompt."""
+        msvcrt = utils.optional_import('msvcrt')
+        if msvcrt is not None:
+            def pressed(timeout):
+                if msvcrt.kbhit():
+                    return True
+                sleep(timeout)
+                return False
+            
+            yield pressed
+            return
+        
+        termios = utils.optional_import('termios')
+        try:
+            fd = sys.stdin.fileno()
+            is_terminal = os.isatty(fd)
+        except (ValueError, OSError, io.UnsupportedOperation):
+            is_terminal = False
+        
+        if termios is None or not is_terminal:
+            # Nothing to watch (i.e. piped input, which is all meant for the prompt)
+            def pressed(timeout):
+                sleep(timeout)
+                return False
+            
+            yield pressed
+            return
+        
+        def pressed(timeout):
+            readable, _, _ = select.select([fd], [], [], timeout)
+            return bool(readable)
+        
+        # Without line buffering a single key is enough, rather than a whole line.  Echo
+        # stays on, and the settings go back without flushing input, so typed keys
+        # show up and are still there for `input`.
+        old_settings = termios.tcgetattr(fd)
+        settings = termios.tcgetattr(fd)
+        settings[3] &= ~termios.ICANON
+        settings[6][termios.VMIN] = 1
+        settings[6][termios.VTIME] = 0
+        termios.tcsetattr(fd, termios.TCSANOW, settings)
+        try:
+            yield pressed
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+    
+    def _write(self, text):
+        if self._renderer is None:
+            self._renderer = threading.Thread(target=self._render_loop, name="TerminalInterface", daemon=True)
+            self._renderer.start()
+        
+        self._frames.put(text if isinstance(text, list) else [(text, 0)])
+    
+    def _write_rest(self):
+        """Write out whatever's still queued, without the renderer"""
+        while True:
+            try:
+                frames = self._frames.get_nowait()
+            except queue.Empty:
+                break
+            sys.stdout.write(''.join(chunk for chunk, _ in frames))
+            self._frames.task_done()
+        sys.stdout.flush()
+    
+    def display_text(self, text):
+        self._write(self._plan_frames(text))
+    
+    def display_texts(self, texts):
+        # Still one write, but each message is paced by its own length, as it would
+        # have been shown on its own
+        self._write([frame for text in texts for frame in self._plan_frames(text)])
+    
+    def flush(self):
+        if self._renderer is None:
+            return
+        
+        with self._watching_keys() as key_pressed:
+            while self._frames.unfinished_tasks:
+                if not self._renderer.is_alive():
+                    # Nothing's going to finish the job, so don't wait for it
+                    self._renderer = None
+                    self._write_rest()
+                    break
+                
+                if self._skip.is_set():
+                    # The key's still waiting to be read, so stop looking at it
+                    sleep(self.frame_interval)
+                elif key_pressed(self.frame_interval):
+                    self._skip.set()
+        
+        self._skip.clear()
     
     def get_selection(self, prompt, choice_list, default_index=0) -> int:
         choice_list[default_index] = choice_list[default_index].upper()
         
-        print()
+        self._write("\n")
         
         if len(choice_list) < 5:
         
@@ -86,6 +240,7 @@ class TerminalInterface(UserInterface):
             
             while True:
                 self.display_text(prompt + "  [ " + " / ".join(choice_list) + " ]")
+                self.flush()
                 choice = res_map.get(input("> ").lower(), None)
                 print()
                 if choice is not None:
@@ -96,6 +251,8 @@ class TerminalInterface(UserInterface):
         raise NotImplementedError()
     
     def get_response(self, prompt=None, default=''):
+        self.flush()
+        
         prompt = prompt or ''
         result = input(prompt + "> ")
         
@@ -105,32 +262,46 @@ class TerminalInterface(UserInterface):
         return result or default
 
 
-class GameEngine():
-    def __init__(self):
-        self.game_desc = None
+class GameSession():
+    """One player's run through a game.
+    
+    Holds everything that belongs to a single player (their `Player`, interface and
+    pending output), while the rooms they wander through belong to the `GameEngine`
+    and are shared by every session.
+    """
+    def __init__(self, engine: "GameEngine", game_desc: GameDefinition, interface: UserInterface):
+        self.engine = engine
+        self.game_desc = game_desc
+        self.interface = interface
         self.player = None
+        self.last_context = None
+        # Things set to happen on their own, some turns or seconds from now
+        self.scheduler = Scheduler()
+        # Whatever's burning, on that clock
+        self.fire = Fire(self.scheduler)
         self.__quitting = False
-        self.__interface = None
-        
-        self.__rooms = {}
+        self.__output = []
     
-    def add_room(self, id: str, room: GameRoom):
-        self.__rooms[id] = room
-        
-    def get_room(self, id: str, silent=False):
-        if not silent:
-            return self.__rooms[id]
-        return self.__rooms.get(id, None)
+    @property
+    def is_quitting(self) -> bool:
+        return self.__quitting
     
     def display_text(self, txt):
-        if self.__interface:
-            self.__interface.display_text(self._fill_text(txt))
-        else:
-            print(txt)
+        """Queue text for display.  Everything queued during a turn is sent to the
+        interface in one go when the turn ends (see `flush_output`)"""
+        self.__output.append(txt)
+    
+    def flush_output(self):
+        if not self.__output:
+            return
+        
+        texts = [self._fill_text(x) for x in self.__output]
+        self.__output.clear()
+        
+        self.interface.display_texts(texts)
     
     def get_response(self, prompt=None, default=''):
-        if not self.__interface:
-            return None
+        self.flush_output()
         
         if prompt:
             prompt = self._fill_text(prompt)
@@ -138,40 +309,48 @@ class GameEngine():
         if default:
             default = self._fill_text(default)
             
-        result = self.__interface.get_response(prompt, default=default)
+        result = self.interface.get_response(prompt, default=default)
         return result
-
+    
+    def get_selection(self, prompt, choice_list, default_index=0):
+        self.flush_output()
+        return self.interface.get_selection(prompt, choice_list, default_index)
     
     def _fill_text(self, txt):
         if self.player is None:
             return txt
         
-        locals = {
-            'player': self.player,
-            'room': self.player.room
-        }
-        
-        pieces = re.split("\\{(\\{[^\\}]+\\})\\}", txt)
-        
-        def try_eval(piece):
-            try:
-                return eval(piece, None, locals)
-            except Exception as ex:
-                return piece
-        
-        pieces = [
-            x if not (x[0] == '{' and x[-1] == '}') 
-            else str(try_eval(x[1:-1]))
-            for x in pieces
-        ]
-        
-        return ''.join(pieces)
-        
-    def run(self, game_desc: GameDefinition, interface: UserInterface):
-        self.game_desc = game_desc
-        self.__quitting = False
-        self.__interface = interface
-        
+        return templates.fill(txt, self.player, self.player.room)
+    
+    def quit(self):
+        self.__quitting = True
+    
+    def run(self):
+        """Play the game through to the end.  Holds the engine lock, except while
+        waiting on the interface for input"""
+        with self.engine.lock:
+            self.start()
+            
+            while not self.__quitting:
+                self.display_text("What do you do?")
+                
+                user_response = self.get_response(default='look around')
+                
+                if user_response.lower() == 'debug' and isinstance(self.interface, TerminalInterface):
+                    self.flush_output()
+                    self.interface.flush()
+                    print("Trying to debug....")
+                    import code
+                    code.interact("** DEBUGGING **", local={'player': self.player})
+                    continue
+                
+                self.play_turn(user_response)
+            
+            self.engine.npcs.unwatch(self.player)
+            self.flush_output()
+            self.interface.flush()
+    
+    def start(self):
         title_block = "#" * (len(self.game_desc.title) + 4)
         self.display_text(
             "\n  " + title_block + "\n  # " + self.game_desc.title + " #\n  " + title_block
@@ -183,62 +362,207 @@ class GameEngine():
         )
         
         self.player = Player(
-            name=HumanName(player_name),
-            initial_inventory=self.game_desc.initial_inventory_items
+            name=utils.parse_name(player_name),
+            initial_inventory=copy.deepcopy(self.game_desc.initial_inventory_items)
         )
-        self.player.room = self.get_room(self.game_desc.starting_room)
+        self.player.session = self
+        self.fire.player = self.player
+        self.player.room = self.engine.get_room(self.game_desc.starting_room)
+        self.engine.npcs.watch(self.player)
         
         self.display_text(self.game_desc.opening_exposition)
+    
+    def play_turn(self, user_response: str):
+        cmd_match, cmd_list = commands.Command.evaluate_command(
+            user_response,
+            self.player,
+            self.last_context
+        )
         
-        last_context = None
-        
-        while not self.__quitting:
-            self.display_text("What do you do?")
-            
-            user_response = self.get_response(default='look around')
-            
-            if user_response.lower() == 'debug':
-                print("Trying to debug....")
-                import code
-                code.interact("** DEBUGGING **", local={'player': self.player})
-                continue
-            
-            cmd_match, cmd_list = commands.Command.evaluate_command(
-                user_response,
-                self.player,
-                last_context
-            )
-            
-            if cmd_match != Match.NoMatch and len(cmd_list) > 0:
-                if len(cmd_list) == 1:
-                    cmd = cmd_list[0]
-                    if 'handlers' in cmd and len(cmd['handlers']) > 0:
-                        for fn in cmd['handlers']:
-                            result = fn()
-                            if result:
-                                self.display_text(result)
-                            else:
-                                self.display_text(phrasing.nothing_happens())
-                    else:
-                        self.display_text(f"You can't {cmd.get('verb', 'do')} that")
-                        
-                    if isinstance(cmd.get('object', None), GameItem):
-                        last_context = cmd['object']
-                    else:
-                        last_context = None
-                elif not cmd_list:
-                    self.display_text(f"That was ambiguous -- can you be more specific?  Type 'help' for examples")
-                    
-                    self.display_text(f"DEBUG: \n{cmd_match}\n{cmd_list}")
+        if cmd_match != Match.NoMatch and len(cmd_list) > 0:
+            if len(cmd_list) == 1:
+                cmd = cmd_list[0]
+                if 'handlers' in cmd and len(cmd['handlers']) > 0:
+                    for fn in cmd['handlers']:
+                        result = fn()
+                        if result:
+                            self.display_text(result)
+                        else:
+                            self.display_text(phrasing.nothing_happens())
                 else:
-                    self.display_text(f"That was ambiguous -- can you be more specific?  Type 'help {cmd_list[0]['verb']}' for examples")
+                    self.display_text(f"You can't {cmd.get('verb', 'do')} that")
                     
-                    self.display_text(f"DEBUG: \n{cmd_match}\n{cmd_list}")
+                if isinstance(cmd.get('object', None), GameItem):
+                    self.last_context = cmd['object']
+                else:
+                    self.last_context = None
+            elif not cmd_list:
+                self.display_text(f"That was ambiguous -- can you be more specific?  Type 'help' for examples")
                 
+                self.display_text(f"DEBUG: \n{cmd_match}\n{cmd_list}")
             else:
-                self.display_text("That didn't make much sense to me.  Type 'help' if you aren't sure what you can do")
+                self.display_text(f"That was ambiguous -- can you be more specific?  Type 'help {cmd_list[0]['verb']}' for examples")
                 
                 self.display_text(f"DEBUG: \n{cmd_match}\n{cmd_list}")
+            
+        else:
+            self.display_text("That didn't make much sense to me.  Type 'help' if you aren't sure what you can do")
+            
+            self.display_text(f"DEBUG: \n{cmd_match}\n{cmd_list}")
+        
+        for result in self.scheduler.tick():
+            self.display_text(result)
+
+
+class GameEngine():
+    def __init__(self):
+        # Guards the shared world.  Sessions hold it while they're playing a turn.
+        self.lock = threading.RLock()
+        
+        self.__rooms = {}
+        self.__room_sources = []
+        
+        # Room id -> the exits (i.e. doors) which lead there, wherever they are.  Held
+        # weakly, so exits which are thrown away (i.e. while compiling a world) drop out.
+        self.__incoming = {}
+        
+        # Room -> breadth first search tree of the routes out of it (see `find_route`)
+        self.__routes = {}
+        
+        # Every NPC in the world
+        self.npcs = NpcRoster(self)
+    
+    def add_room(self, id: str, room: GameRoom):
+        room.room_id = id
+        self.__rooms[id] = room
+    
+    def add_room_source(self, rooms: typ.Mapping[str, GameRoom]):
+        """Register a mapping of rooms which are only looked up (and added) when
+        first needed, i.e. the lazily loaded rooms of a compiled world file"""
+        self.__room_sources.append(rooms)
+        
+    def get_room(self, id: str, silent=False):
+        room = self.__rooms.get(id, None)
+        if room is None:
+            for source in self.__room_sources:
+                if id in source:
+                    room = source[id]
+                    self.add_room(id, room)
+                    break
+        
+        if room is None and not silent:
+            raise KeyError(id)
+        return room
+    
+    def add_exit(self, exit_item: GameItem, goes_to: str):
+        """Note that `exit_item` (i.e. a door) leads to the room with id `goes_to`"""
+        exits = self.__incoming.get(goes_to)
+        if exits is None:
+            exits = self.__incoming[goes_to] = weakref.WeakSet()
+        exits.add(exit_item)
+    
+    def remove_exit(self, exit_item: GameItem, goes_to: str):
+        exits = self.__incoming.get(goes_to)
+        if exits is not None:
+            exits.discard(exit_item)
+            if not exits:
+                del self.__incoming[goes_to]
+    
+    def connections_to(self, id: str) -> typ.List[GameRoom]:
+        """Rooms with an exit leading to the room `id`
+        
+        Args:
+            id (str): Id of the room
+        
+        Returns:
+            List[GameRoom]: The rooms, each listed once
+        """
+        # Rooms which haven't been loaded yet only register their exits once they are
+        for source in self.__room_sources:
+            linking_to = getattr(source, 'rooms_linking_to', None)
+            if linking_to is not None:
+                for from_id in linking_to(id):
+                    self.get_room(from_id, silent=True)
+        
+        rooms = {}
+        for exit_item in list(self.__incoming.get(id, ())):
+            room = exit_item.currently_in
+            if isinstance(room, GameRoom) and self.__rooms.get(room.room_id) is room:
+                rooms[room] = None
+        return list(rooms)
+    
+    def invalidate_routes(self):
+        """Forget the routes worked out so far, i.e. because a door was locked or unlocked,
+        or one was put in or taken out of a room"""
+        self.__routes.clear()
+        self.npcs.forget_map()
+    
+    def _explore(self, start: GameRoom) -> typ.Dict[GameRoom, typ.Optional[typ.Tuple[GameRoom, GameItem]]]:
+        # Each room reachable from `start` -> (the room before it, the exit between them)
+        tree = {start: None}
+        frontier = deque([start])
+        while frontier:
+            room = frontier.popleft()
+            for exit_item in room.exits:
+                if exit_item.is_locked or exit_item.is_secret:
+                    continue
+                
+                target = exit_item.goes_to
+                if target is not None and target not in tree:
+                    tree[target] = (room, exit_item)
+                    frontier.append(target)
+        
+        return tree
+    
+    def find_route(self, from_room: GameRoom, to_room: GameRoom) -> Optional[typ.List[GameItem]]:
+        """Shortest way from one room to another through unlocked doors
+        
+        The search out of each room is done once and kept until a door changes.
+        
+        Returns:
+            Optional[List[GameItem]]: The doors to go through, in order, or None if
+                there's no way there
+        """
+        tree = self.__routes.get(from_room)
+        if tree is None:
+            tree = self.__routes[from_room] = self._explore(from_room)
+        
+        if to_room not in tree:
+            return None
+        
+        route = []
+        room = to_room
+        while tree[room] is not None:
+            room, exit_item = tree[room]
+            route.append(exit_item)
+        route.reverse()
+        
+        return route
+    
+    def travel(self, player, room: GameRoom):
+        if room == player.room:
+            return "You're already there."
+        
+        route = self.find_route(player.room, room)
+        if route is None:
+            return "You don't know a way to get there from here."
+        
+        passed = []
+        for exit_item in route[:-1]:
+            exit_item.is_closed = False
+            player.room = exit_item.goes_to
+            passed.append(player.room.name)
+        route[-1].is_closed = False
+        
+        if passed:
+            return "You make your way through " + phrasing.natural_list(passed) + ".  " + player.move_to(room)
+        return player.move_to(room)
+    
+    def start_session(self, game_desc: GameDefinition, interface: UserInterface) -> GameSession:
+        return GameSession(self, game_desc, interface)
+        
+    def run(self, game_desc: GameDefinition, interface: UserInterface):
+        self.start_session(game_desc, interface).run()
     
     def show_inventory(self, player):
         return player.inventory.on_look(player)
@@ -247,18 +571,18 @@ class GameEngine():
         return commands.get_help_string(wants_help_with)
         
     def quit(self, player):
-        if self.__interface is not None:
-            choice = self.__interface.get_selection(
+        session = player.session
+        if session is not None:
+            choice = session.get_selection(
                 "Are you sure you want to quit?",
                 [ "Yes", "No", "Cancel" ],
                 2
             )
             
             if choice == 0:
-                self.__quitting = True
+                session.quit()
                 return "Thanks for playing!  Later..."
         else:
-            self.__quitting = True
             return "Thanks for playing!  Later..."
             
         return "Nevermind then"
@@ -268,3 +592,11 @@ GameEngine = GameEngine()
 commands.HELP.register_generic_handler(GameEngine.show_help)
 commands.QUIT.register_generic_handler(GameEngine.quit)
 commands.SHOW_INVENTORY.register_generic_handler(GameEngine.show_inventory)
+commands.TRAVEL.register_generic_handler(GameEngine.travel)
+
+def _say(spoken_to, player, text):
+    # Handlers get bound to whatever's spoken to (the room, if nothing's named), but
+    # it's the NPCs in the room who hear it
+    return GameEngine.npcs.hear(player, text)
+
+commands.SAY.register_generic_handler(_say)
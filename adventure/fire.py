@@ -0,0 +1,189 @@
+"""Fire: combustible things catching light from each other.
+
+Something that's set alight burns for a few turns and then it's gone, dropping
+whatever was in it.  At the end of each turn, everything that caught on the turn
+before spreads the fire to combustible things next to it: what it's in, what's
+in it, and what's beside it (in the same container, or directly in the same
+room).  Fire directly in a room also reaches the rooms on the other side of any
+open doors.
+
+Only that frontier spreads, and only the containers and rooms around it get
+looked at, so a tick costs about as much as the fire's edge, however much of
+the world is already burning.  Containers with nothing combustible anywhere
+inside them are skipped on their summaries (see `GameItem.nested_properties`).
+"""
+import typing as typ
+from collections import deque
+from typing import Optional
+
+from . import commands, materials, phrasing
+from .base import GameItem, GameRoom, Player
+from .constants import FIRE_BURN_TURNS
+
+
+def _sentence(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def _room_of(entity) -> Optional[GameRoom]:
+    """The room something's in, however deep, or None if it isn't anywhere"""
+    while isinstance(entity, GameItem):
+        entity = entity.currently_in
+    if isinstance(entity, Player):
+        return entity.room
+    return entity
+
+
+class Fire():
+    """Everything burning on one session's clock
+
+    Args:
+        scheduler (Scheduler): Clock the fire burns on
+        player (Player, optional): Who hears about it.  Only what they can see (their
+            room and what they're carrying) gets mentioned.
+        burn_turns (int, optional): How long things burn before they're gone
+    """
+    def __init__(self, scheduler, player: Optional[Player] = None, burn_turns: int = FIRE_BURN_TURNS):
+        self.scheduler = scheduler
+        self.player = player
+        self.burn_turns = burn_turns
+        self._burns_out = {}        # Burning thing -> turn it burns out at the end of
+        self._queue = deque()       # Burning things, in the order they'll burn out
+        self._frontier = []         # Things that caught since the last tick
+        self._event = None
+
+    def __len__(self) -> int:
+        return len(self._burns_out)
+
+    def is_burning(self, item: GameItem) -> bool:
+        return item in self._burns_out
+
+    @staticmethod
+    def can_burn(item: GameItem) -> bool:
+        # Burning away a door would strand whoever's on the other side
+        return item.is_combustible and not item.is_exit
+
+    def ignite(self, item: GameItem) -> bool:
+        """Set something alight.  Returns False if it won't burn, or already is"""
+        if not self._catch(item):
+            return False
+
+        if self._event is None:
+            self._event = self.scheduler.after_turns(1, self.tick, every=1)
+        return True
+
+    def _catch(self, item: GameItem) -> bool:
+        if item in self._burns_out or not self.can_burn(item):
+            return False
+
+        self._burns_out[item] = self.scheduler.turn + self.burn_turns
+        self._queue.append(item)
+        self._frontier.append(item)
+        return True
+
+    def _spread(self, frontier: typ.Iterable[GameItem]) -> typ.List[GameItem]:
+        """Set light to what's next to `frontier`.  Returns what caught"""
+        caught = []
+        places = {}     # Containers and rooms the frontier is in, to try what's beside it
+        for item in frontier:
+            place = item.currently_in
+            if place is None:
+                continue    # Gone while it was burning
+            places[place] = None
+
+            if isinstance(place, GameItem) and self._catch(place):
+                caught.append(place)
+
+            if item.nested_properties & materials.COMBUSTIBLE:
+                caught.extend(x for x in item.items if self._catch(x))
+
+        for place in places:
+            if not isinstance(place, (GameItem, GameRoom)):
+                continue
+
+            if place.nested_properties & materials.COMBUSTIBLE:
+                caught.extend(x for x in list(place.items) if self._catch(x))
+
+            if isinstance(place, GameRoom):
+                for exit in place.exits:
+                    other = exit.goes_to
+                    if getattr(exit, 'is_closed', False) or other is None:
+                        continue
+                    if other.nested_properties & materials.COMBUSTIBLE:
+                        caught.extend(x for x in list(other.items) if self._catch(x))
+
+        return caught
+
+    def _burn_away(self, item: GameItem):
+        place, location = item.currently_in, item.location
+        # Everything comes out through the usual remove/add, so what it was in (and
+        # what that's in) keeps its space and weight straight, and whatever it held
+        # gets the room the burnt thing leaves behind
+        item._leave_container()
+        for thing in list(item.items):
+            item.remove(thing)
+            if isinstance(place, GameRoom):
+                place.add(thing, location)
+                continue
+
+            try:
+                place.add(thing)
+            except ValueError:
+                _room_of(place).add(thing, "on the floor")
+
+        item.delete()
+
+    def tick(self) -> Optional[str]:
+        """Spread the fire one step, and burn away whatever's done burning"""
+        frontier, self._frontier = self._frontier, []
+        caught = self._spread(frontier)
+
+        burnt = []
+        turn = self.scheduler.turn
+        while self._queue and self._burns_out[self._queue[0]] <= turn:
+            item = self._queue.popleft()
+            del self._burns_out[item]
+            if item.currently_in is None:
+                continue    # Already gone some other way
+
+            # Where it was, for telling the player, since it's about to be nowhere
+            seen = self._can_see(item)
+            name = self._name(item)
+            self._burn_away(item)
+            if seen:
+                burnt.append(name)
+
+        if not self._burns_out:
+            self._event.cancel()
+            self._event = None
+
+        messages = []
+        caught = [self._name(x) for x in caught if self._can_see(x)]
+        if caught:
+            verb = "catches" if len(caught) == 1 else "catch"
+            messages.append(_sentence(f"{phrasing.natural_list(caught)} {verb} fire."))
+        if burnt:
+            messages.append(_sentence(f"{phrasing.natural_list(burnt)} burn{'s' if len(burnt) == 1 else ''} away to nothing."))
+        return "  ".join(messages) or None
+
+    def _can_see(self, item: GameItem) -> bool:
+        return self.player is not None and not item.is_secret and _room_of(item) is self.player.room
+
+    def _name(self, item: GameItem) -> str:
+        return f"{item.possessive_or_the(self.player)} {item.name}"
+
+
+def _burn(item: GameItem, player: Player) -> str:
+    session = player.session
+    if session is None:
+        return None
+
+    fire = session.fire
+    if fire.is_burning(item):
+        return f"The {item.name} is already burning."
+    if not fire.ignite(item):
+        return f"The {item.name} won't burn."
+    return f"You set the {item.name} alight."
+
+
+commands.BURN.register_generic_handler(_burn)
@@ -0,0 +1,280 @@
+"""A small JSON-over-HTTP front-end for the engine, using only the standard library.
+
+Endpoints (all bodies are JSON):
+
+    POST   /sessions                 {"name": "Kara"}           -> {"session": "<id>"}
+    POST   /sessions/<id>/commands   {"command": "look"}        -> {"queued": 1}
+                                     {"commands": ["i", "look"]}
+    GET    /sessions/<id>/output?wait=<seconds>                 -> {"output": [...], "finished": false}
+    DELETE /sessions/<id>                                       -> {}
+
+Every session plays on its own thread through an `HttpInterface`.  Submitting
+commands only queues them, so a client can pipeline as many commands as it likes
+without waiting for the game to answer, then collect the output (one entry per
+turn) with a poll.  The server speaks HTTP/1.1, so connections are kept alive and
+pipelined requests on a connection are answered in order.
+
+Once a game ends (i.e. the player quits), submitting more commands gets a 410.
+Its output can still be collected, after which the session is forgotten.  Only
+the most recently ended `MAX_FINISHED_SESSIONS` are kept around for that, so
+sessions nobody comes back for don't pile up.
+"""
+import json
+import threading
+import typing as typ
+import uuid
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .engine import GameDefinition, GameEngine, UserInterface
+
+MAX_POLL_WAIT = 30.0
+MAX_FINISHED_SESSIONS = 256
+
+
+class SessionClosed(Exception):
+    pass
+
+
+class HttpInterface(UserInterface):
+    """Feeds a session commands submitted over HTTP and collects its output.
+
+    Waiting for input happens on a condition over the engine lock, so a session
+    gives up the world while it has nothing to do.
+    """
+    def __init__(self, engine_lock):
+        self._input = threading.Condition(engine_lock)
+        self._commands = deque()
+        self._output = []
+        self._output_ready = threading.Condition()
+        self.is_closed = False
+        self.is_finished = False
+
+    def display_text(self, text: str) -> None:
+        with self._output_ready:
+            self._output.append(text)
+            self._output_ready.notify_all()
+
+    def _next_command(self) -> str:
+        with self._input:
+            while not self._commands:
+                if self.is_closed:
+                    raise SessionClosed()
+                self._input.wait()
+            return self._commands.popleft()
+
+    def get_response(self, prompt: Optional[str] = None, default: str = '') -> str:
+        if prompt:
+            self.display_text(prompt)
+
+        return self._next_command().strip() or default
+
+    def get_selection(self, prompt, choice_list, default_index=0) -> int:
+        choices = {'': default_index}
+        for idx, item in enumerate(choice_list):
+            choices[item.lower()] = idx
+            choices.setdefault(item[0].lower(), idx)
+
+        while True:
+            self.display_text(prompt + "  [ " + " / ".join(choice_list) + " ]")
+            choice = choices.get(self._next_command().strip().lower(), None)
+            if choice is not None:
+                return choice
+
+            self.display_text("That's not one of the options...")
+
+    def submit(self, commands: typ.List[str]) -> None:
+        with self._input:
+            if self.is_closed or self.is_finished:
+                raise SessionClosed()
+            self._commands.extend(commands)
+            self._input.notify()
+
+    def poll(self, wait: float = 0) -> typ.Tuple[typ.List[str], bool]:
+        """Collect the output so far, waiting up to `wait` seconds for some to show up
+
+        Returns:
+            List[str]: Output of each turn since the last poll
+            bool: Whether the session has ended (and everything has been collected)
+        """
+        with self._output_ready:
+            if not self._output and not self.is_finished and wait > 0:
+                self._output_ready.wait(min(wait, MAX_POLL_WAIT))
+            output, self._output = self._output, []
+            finished = self.is_finished
+        return output, finished
+
+    def close(self) -> None:
+        with self._input:
+            self.is_closed = True
+            self._input.notify_all()
+
+    def finish(self) -> None:
+        with self._output_ready:
+            self.is_finished = True
+            self._output_ready.notify_all()
+
+
+class GameServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, game_desc: GameDefinition, engine=GameEngine):
+        super().__init__(address, _GameRequestHandler)
+        self.game_desc = game_desc
+        self.engine = engine
+        self.sessions = {}
+        # Sessions whose game has ended but whose output hasn't all been collected,
+        # oldest first
+        self.finished = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def start_session(self, player_name: Optional[str] = None) -> str:
+        interface = HttpInterface(self.engine.lock)
+        # The first thing a session asks for is the player's name
+        interface.submit([player_name or ''])
+
+        session_id = uuid.uuid4().hex
+        with self._sessions_lock:
+            self.sessions[session_id] = interface
+
+        thread = threading.Thread(
+            target=self._run_session, args=(session_id, interface), name=f"session-{session_id}", daemon=True
+        )
+        thread.start()
+
+        return session_id
+
+    def _run_session(self, session_id: str, interface: HttpInterface) -> None:
+        try:
+            self.engine.run(self.game_desc, interface)
+        except SessionClosed:
+            pass
+        finally:
+            interface.finish()
+
+            with self._sessions_lock:
+                if self.sessions.pop(session_id, None) is not None:
+                    self.finished[session_id] = interface
+                    while len(self.finished) > MAX_FINISHED_SESSIONS:
+                        self.finished.popitem(last=False)
+
+    def get_session(self, session_id: str) -> Optional[HttpInterface]:
+        with self._sessions_lock:
+            return self.sessions.get(session_id) or self.finished.get(session_id)
+
+    def collected(self, session_id: str) -> None:
+        """Note that all of a finished session's output has been collected"""
+        with self._sessions_lock:
+            self.finished.pop(session_id, None)
+
+    def end_session(self, session_id: str) -> bool:
+        with self._sessions_lock:
+            interface = self.sessions.pop(session_id, None) or self.finished.pop(session_id, None)
+
+        if interface is None:
+            return False
+
+        interface.close()
+        return True
+
+
+class _GameRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, and on a kept-alive connection
+    # Nagle's algorithm would hold the body back waiting for the client's ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length == 0:
+            return {}
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        return body
+
+    def _route(self):
+        """Split the path into (session id or None, action or None, query), or None
+        if it isn't one of ours"""
+        url = urlsplit(self.path)
+        parts = [x for x in url.path.split('/') if x]
+        if not parts or parts[0] != 'sessions' or len(parts) > 3:
+            return None
+
+        parts += [None] * (3 - len(parts))
+        return parts[1], parts[2], parse_qs(url.query)
+
+    def do_POST(self):
+        route = self._route()
+        try:
+            body = self._read_json()
+        except ValueError as ex:
+            return self._send_json(400, {"error": f"Bad request body: {ex}"})
+
+        if route is None:
+            return self._send_json(404, {"error": "Not found"})
+        session_id, action, _ = route
+
+        if session_id is None:
+            return self._send_json(201, {"session": self.server.start_session(body.get("name"))})
+
+        session = self.server.get_session(session_id)
+        if session is None or action != 'commands':
+            return self._send_json(404, {"error": "Not found"})
+
+        commands = body.get("commands", [body["command"]] if "command" in body else [])
+        if not isinstance(commands, list) or not all(isinstance(x, str) for x in commands):
+            return self._send_json(400, {"error": "Commands must be strings"})
+
+        try:
+            session.submit(commands)
+        except SessionClosed:
+            return self._send_json(410, {"error": "Session has ended"})
+
+        self._send_json(202, {"queued": len(commands)})
+
+    def do_GET(self):
+        route = self._route()
+        session = None if route is None else self.server.get_session(route[0])
+        if session is None or route[1] != 'output':
+            return self._send_json(404, {"error": "Not found"})
+
+        try:
+            wait = float(route[2].get("wait", ["0"])[0])
+        except ValueError:
+            return self._send_json(400, {"error": "wait must be a number of seconds"})
+
+        output, finished = session.poll(wait)
+        if finished:
+            self.server.collected(route[0])
+        self._send_json(200, {"output": output, "finished": finished})
+
+    def do_DELETE(self):
+        route = self._route()
+        if route is None or route[0] is None or route[1] is not None or not self.server.end_session(route[0]):
+            return self._send_json(404, {"error": "No such session"})
+
+        self._send_json(200, {})
+
+
+def serve(game_desc: GameDefinition, host: str = "127.0.0.1", port: int = 8080) -> None:
+    """Serve a game over HTTP until interrupted"""
+    with GameServer((host, port), game_desc) as server:
+        print(f"Serving '{game_desc.title}' on http://{host}:{server.server_address[1]}/sessions")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,158 @@
+"""Phrasing lists of things, i.e. "a plate, 12 cups, and 40 other things".
+
+Everything here works on iterators and yields its output a piece at a time, so
+long lists are never sliced or recursed over, and a caller can stream the result
+instead of building one big string.  `summarize` keeps listings of huge
+containers bounded: identical descriptions are collapsed into a count, and
+anything new past the limit is only counted.
+"""
+import typing as typ
+from collections.abc import Sized
+
+_END = object()
+
+_COUNTABLE_ARTICLES = ('a', 'an')
+
+
+def iter_natural_list(descs: typ.Iterable[str], oxford_comma: bool = False) -> typ.Iterator[str]:
+    """Phrase descriptions as a list ("a, b, and c"), yielding it in pieces
+
+    Args:
+        descs (Iterable[str]): The descriptions
+        oxford_comma (bool, optional): Put a comma before the "and" of a two item list.
+            Lists of three or more always get one.
+
+    Yields:
+        str: Consecutive pieces of the list
+    """
+    it = iter(descs)
+
+    first = next(it, _END)
+    if first is _END:
+        yield "Nothing"
+        return
+
+    second = next(it, _END)
+    if second is _END:
+        yield first
+        return
+
+    last = next(it, _END)
+    if last is _END:
+        yield first + (',' if oxford_comma else '') + " and " + second
+        return
+
+    yield first
+    previous = second
+    for desc in it:
+        yield ", " + previous
+        previous, last = last, desc
+
+    yield ", " + previous + ", and " + last
+
+
+def natural_list(descs: typ.Iterable[str], oxford_comma: bool = False) -> str:
+    return ''.join(iter_natural_list(descs, oxford_comma))
+
+
+def iter_bullets(descs: typ.Iterable[str], bullet: str = " * ") -> typ.Iterator[str]:
+    """Yield each description as its own bulleted line"""
+    for desc in descs:
+        yield "\n" + bullet + desc
+
+
+def _plural_noun(noun: str) -> str:
+    if noun.endswith('fe'):
+        return noun[:-2] + 'ves'       # knife, wife
+    if noun.endswith(('lf', 'eaf', 'oaf', 'arf')):
+        return noun[:-1] + 'ves'       # shelf, leaf, loaf, scarf
+    if noun.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return noun + 'es'
+    if len(noun) > 1 and noun.endswith('y') and noun[-2] not in 'aeiou':
+        return noun[:-1] + 'ies'
+    return noun + 's'
+
+
+def pluralize(desc: str) -> typ.Optional[str]:
+    """Plural of a countable description, without its article ("a bit of string" ->
+    "bits of string"), or None if it doesn't start with "a" or "an"
+    """
+    article, _, noun = desc.partition(' ')
+    if article.lower() not in _COUNTABLE_ARTICLES or not noun:
+        return None
+
+    # The noun being counted comes before any "of ...", i.e. "bits of string"
+    head, of, tail = noun.partition(' of ')
+    return _plural_noun(head) + of + tail
+
+
+def summarize(items: typ.Iterable,
+              describe: typ.Callable[[typ.Any], str] = str,
+              limit: typ.Optional[int] = None,
+              collapse: bool = True,
+              name: typ.Optional[typ.Callable[[typ.Any], str]] = None) -> typ.Iterator[str]:
+    """Describe a collection of things for listing, keeping big collections bounded
+
+    Args:
+        items (Iterable): The things to list
+        describe (Callable, optional): Gets the description of one thing
+        limit (Optional[int], optional): Most entries to list before summing the rest
+            up as "N other things"
+        collapse (bool, optional): List identical descriptions once, with a count, i.e.
+            "12 plates" (or "some lint (x2)" for things that can't be counted).  Repeats
+            of something already listed are counted in with it, even past the limit.
+        name (Callable, optional): Gets the name of one thing.  Only descriptions that
+            end with it are made plural, so "a candle (lit)" twice is "a candle (lit)
+            (x2)" rather than "2 candle (lit)s".  Without it, any description starting
+            with "a" or "an" is.
+
+    Yields:
+        str: Descriptions to list
+    """
+    entries = []    # [description, count, first thing described], in the order first seen
+    by_desc = {}    # description -> entry, when collapsing
+    remaining = 0
+
+    it = iter(items)
+    for taken, item in enumerate(it, 1):
+        past_limit = limit is not None and len(entries) >= limit
+        if past_limit and not collapse:
+            # Only count the rest, without describing them if we can help it
+            if isinstance(items, Sized):
+                remaining = len(items) - taken + 1
+            else:
+                remaining = 1 + sum(1 for _ in it)
+            break
+
+        desc = describe(item)
+
+        entry = by_desc.get(desc) if collapse else None
+        if entry is not None:
+            entry[1] += 1
+            continue
+
+        if past_limit:
+            remaining += 1
+            continue
+
+        entry = [desc, 1, item]
+        entries.append(entry)
+        if collapse:
+            by_desc[desc] = entry
+
+    for desc, count, item in entries:
+        if count == 1:
+            yield desc
+            continue
+
+        plural = None
+        if name is None or desc.endswith(' ' + name(item)):
+            plural = pluralize(desc)
+
+        if plural is None:
+            yield f"{desc} (x{count})"
+        else:
+            yield f"{count} {plural}"
+
+    if remaining:
+        yield f"{remaining} other thing" + ("s" if remaining > 1 else "")
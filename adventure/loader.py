@@ -0,0 +1,373 @@
+"""Loads declarative world files (JSON) into rooms and items.
+
+A world file looks like::
+
+    {
+        "title": "Legends of the Great Game Demo",
+        "starting_room": "ENTRYWAY",
+        "opening_exposition": ["Dear {{player.name.first}},", "..."],
+        "initial_inventory": [{"article": "some", "name": "lint", "size": 0}],
+        "rooms": {
+            "ENTRYWAY": {
+                "title": "a tiny cell",
+                "description": "It's damp.",
+                "objects": {
+                    "on the floor": [
+                        {"type": "container", "article": "a", "name": "can", "capacity": 3,
+                         "material": "RUSTY_TIN", "items": [{"article": "a", "name": "comb"}]}
+                    ],
+                    "to your right": [
+                        {"type": "door", "article": "a", "name": "cell door", "goes_to": "DINING_ROOM"}
+                    ]
+                }
+            }
+        },
+        "recipes": [
+            {"name": "a lockpick", "ingredients": ["paperclip", "bit of string"],
+             "makes": {"article": "a", "name": "lockpick", "material": "METAL"}}
+        ]
+    }
+
+Item specs take the same keyword arguments as the class named by their `type`
+(see `ENTITY_TYPES`), with `material` given as the name of a constant in
+`adventure.materials` and `items` as a list of nested item specs.  Recipe
+ingredients are names, or [name, material name] to ask for something made of a
+particular material, again by constant name ("RUSTY_TIN", see
+`adventure.recipes.Recipe`), and what a recipe `makes` is an item spec.  A room
+with `"is_dark": true` can't be seen in without a lit `"light"` item.
+
+Parsing a file and re-running all of the constructors is slow for big worlds, so
+the built world is compiled to a cache file next to the source.  Every room is
+pickled separately and only unpickled the first time something asks for it, so
+startup doesn't pay for rooms nobody has walked into yet.  Unpickling a room isn't
+much cheaper than building it, though, so the cache's win is mostly in the rooms
+that never get used: once half of them have been asked for, the rest are loaded
+in one go, which keeps a load that ends up using everything a bit faster than
+parsing the file, rather than slower.  The cache is keyed on a hash of the file
+contents (and of the entity code), so editing either one invalidates it
+automatically.
+"""
+import contextlib
+import functools
+import gc
+import hashlib
+import json
+import os
+import pickle
+import typing as typ
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from . import materials
+from .base import GameItem, GameRoom
+from .engine import GameDefinition, GameEngine
+from .objects import Door, GameContainer, ItemStack, LightSource
+from .recipes import RECIPES, Recipe
+
+ENTITY_TYPES = {
+    'item': GameItem,
+    'container': GameContainer,
+    'door': Door,
+    'stack': ItemStack,
+    'light': LightSource,
+}
+
+CACHE_SUFFIX = '.worldcache'
+
+_CACHE_MAGIC = b'ADVWORLD4\n'
+
+# Modules whose classes end up in the pickled cache.  If any of them change, the
+# old pickles may no longer match the code, so they're part of the cache key.
+_CODE_MODULES = ('base', 'objects', 'materials', 'engine', 'loader', 'recipes', 'utils', 'store', 'listing')
+_code_fingerprint = None
+
+
+@dataclass
+class World():
+    definition: GameDefinition
+    rooms: typ.Mapping[str, GameRoom] = field(default_factory=dict)
+    # Room id -> ids of the rooms its exits lead to
+    links: typ.Dict[str, typ.List[str]] = field(default_factory=dict)
+    recipes: typ.List[Recipe] = field(default_factory=list)
+
+
+class WorldFormatError(ValueError):
+    pass
+
+
+class _LazyRooms(Mapping):
+    """Read-only room mapping which unpickles each room the first time it's used, until
+    half of them have been, and then all of the rest at once"""
+    def __init__(self, blobs: typ.Dict[str, bytes], links: typ.Dict[str, typ.List[str]]):
+        self._blobs = blobs
+        self._rooms = {}
+        self._links = links
+        self._incoming = None
+
+    def __getitem__(self, room_id: str) -> GameRoom:
+        room = self._rooms.get(room_id)
+        if room is None:
+            if len(self._rooms) * 2 >= len(self._blobs):
+                # Most of the world is being used, so the rest is cheaper loaded together
+                self.load_all()
+                return self._rooms[room_id]
+
+            with _gc_paused():
+                room = pickle.loads(self._blobs[room_id])
+            self._rooms[room_id] = room
+        return room
+
+    def load_all(self) -> None:
+        """Unpickle every room not loaded yet, in one go"""
+        with _gc_paused():
+            for room_id, blob in self._blobs.items():
+                if room_id not in self._rooms:
+                    self._rooms[room_id] = pickle.loads(blob)
+
+    def values(self):
+        # Asking for all of them, so load them together
+        self.load_all()
+        return super().values()
+
+    def __contains__(self, room_id) -> bool:
+        return room_id in self._blobs
+
+    def __iter__(self):
+        return iter(self._blobs)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def rooms_linking_to(self, room_id: str) -> typ.List[str]:
+        """Ids of the rooms with an exit to `room_id`, loaded or not"""
+        if self._incoming is None:
+            self._incoming = {}
+            for from_id, to_ids in self._links.items():
+                for to_id in to_ids:
+                    self._incoming.setdefault(to_id, []).append(from_id)
+        return self._incoming.get(room_id, [])
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    # Building a world allocates lots of objects and no garbage, so the cyclic
+    # collector would just be rescanning the new objects over and over
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _build_item(spec: typ.Dict[str, typ.Any]) -> GameItem:
+    spec = dict(spec)
+    kind = spec.pop('type', 'item')
+
+    cls = ENTITY_TYPES.get(kind)
+    if cls is None:
+        raise WorldFormatError(f"Unknown item type '{kind}'")
+
+    if 'material' in spec:
+        try:
+            spec['material'] = materials.by_name(spec['material'])
+        except KeyError as ex:
+            raise WorldFormatError(str(ex)) from None
+
+    if 'items' in spec:
+        spec['items'] = [_build_item(x) for x in spec['items']]
+
+    try:
+        return cls(**spec)
+    except TypeError as ex:
+        raise WorldFormatError(f"Bad {kind} definition {spec!r}: {ex}") from None
+
+
+def _build_room(spec: typ.Dict[str, typ.Any]) -> GameRoom:
+    objects = {
+        location: [_build_item(x) for x in item_specs]
+        for location, item_specs in spec.get('objects', {}).items()
+    }
+    return GameRoom(spec['title'], description=spec.get('description'), objects=objects,
+                    is_dark=spec.get('is_dark', False))
+
+
+def _build_recipe(spec: typ.Dict[str, typ.Any]) -> Recipe:
+    try:
+        name, ingredients, makes = spec['name'], spec['ingredients'], spec['makes']
+    except KeyError as ex:
+        raise WorldFormatError(f"Recipe {spec.get('name')!r} is missing {ex}") from None
+
+    _build_item(makes)     # Fail now if it doesn't make sense, not when somebody crafts it
+    try:
+        return Recipe(name, ingredients, functools.partial(_build_item, makes))
+    except KeyError as ex:
+        raise WorldFormatError(f"Recipe {name!r}: {ex}") from None
+
+
+def _join_lines(text: typ.Union[str, typ.List[str]]) -> str:
+    if isinstance(text, list):
+        return "\n".join(text)
+    return text
+
+
+def build_world(data: typ.Dict[str, typ.Any]) -> World:
+    """Build rooms and a game definition from already-parsed world data
+
+    Args:
+        data (dict): Parsed contents of a world file
+
+    Raises:
+        WorldFormatError: If the data doesn't describe a valid world
+
+    Returns:
+        World: The game definition and the rooms, keyed by room id
+    """
+    if 'title' not in data or 'rooms' not in data:
+        raise WorldFormatError("A world needs at least a 'title' and some 'rooms'")
+
+    definition = GameDefinition(
+        data['title'],
+        starting_room=data.get('starting_room'),
+        initial_inventory_items=[_build_item(x) for x in data.get('initial_inventory', [])],
+    )
+
+    for key in ('inventory_size', 'default_player_name'):
+        if key in data:
+            setattr(definition, key, data[key])
+
+    if 'opening_exposition' in data:
+        definition.opening_exposition = _join_lines(data['opening_exposition'])
+
+    rooms = {}
+    for room_id, room_spec in data['rooms'].items():
+        try:
+            rooms[room_id] = _build_room(room_spec)
+        except KeyError as ex:
+            raise WorldFormatError(f"Room {room_id} is missing {ex}") from None
+        rooms[room_id].room_id = room_id
+
+    if definition.starting_room is not None and definition.starting_room not in rooms:
+        raise WorldFormatError(f"Starting room '{definition.starting_room}' isn't defined")
+
+    # Point every exit straight at the room it leads to
+    links = {}
+    for room_id, room in rooms.items():
+        links[room_id] = []
+        for exit_item in room.exits:
+            if exit_item.goes_to_id is None:
+                continue
+            if exit_item.resolve(rooms) is None:
+                raise WorldFormatError(f"{exit_item.name} in room {room_id} leads to undefined room '{exit_item.goes_to_id}'")
+            links[room_id].append(exit_item.goes_to_id)
+
+    recipes = [_build_recipe(x) for x in data.get('recipes', [])]
+
+    return World(definition, rooms, links, recipes)
+
+
+def _get_code_fingerprint() -> bytes:
+    global _code_fingerprint
+
+    if _code_fingerprint is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _CODE_MODULES:
+            with open(os.path.join(here, name + '.py'), 'rb') as f:
+                digest.update(f.read())
+        _code_fingerprint = digest.digest()
+
+    return _code_fingerprint
+
+
+def _content_key(source: bytes) -> bytes:
+    digest = hashlib.sha256(_get_code_fingerprint())
+    digest.update(source)
+    return digest.hexdigest().encode('ascii')
+
+
+def cache_path_for(path: str) -> str:
+    return os.path.splitext(path)[0] + CACHE_SUFFIX
+
+
+def _read_cache(cache_path: str, key: bytes) -> typ.Optional[World]:
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.readline() != _CACHE_MAGIC or f.readline().rstrip(b'\n') != key:
+                return None
+            definition, blobs, links, recipes = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        return None
+
+    return World(definition, _LazyRooms(blobs, links), links, recipes)
+
+
+def _write_cache(cache_path: str, key: bytes, world: World) -> None:
+    blobs = {
+        room_id: pickle.dumps(room, protocol=pickle.HIGHEST_PROTOCOL)
+        for room_id, room in world.rooms.items()
+    }
+
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_CACHE_MAGIC)
+            f.write(key + b'\n')
+            pickle.dump((world.definition, blobs, world.links, world.recipes), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # A read-only install still works, it just doesn't get faster
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_world(path: str, use_cache: bool = True, register: bool = True) -> World:
+    """Load a world file, using (and refreshing) the compiled cache next to it
+
+    Args:
+        path (str): Path to the JSON world file
+        use_cache (bool, optional): Read and write the compiled cache. Defaults to True.
+        register (bool, optional): Add the rooms to the `GameEngine`, and the recipes to
+            `RECIPES`. Defaults to True.
+
+    Raises:
+        WorldFormatError: If the file doesn't describe a valid world
+
+    Returns:
+        World: The game definition and the rooms, keyed by room id
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+
+    world = None
+    with _gc_paused():
+        if use_cache:
+            key = _content_key(source)
+            cache_path = cache_path_for(path)
+            world = _read_cache(cache_path, key)
+
+        if world is None:
+            try:
+                data = json.loads(source)
+            except ValueError as ex:
+                raise WorldFormatError(f"{path} isn't valid JSON: {ex}") from None
+
+            world = build_world(data)
+
+            if use_cache:
+                _write_cache(cache_path, key, world)
+
+    if register:
+        if isinstance(world.rooms, _LazyRooms):
+            GameEngine.add_room_source(world.rooms)
+        else:
+            for room_id, room in world.rooms.items():
+                GameEngine.add_room(room_id, room)
+
+        for recipe in world.recipes:
+            RECIPES.add(recipe)
+
+    return world
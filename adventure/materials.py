@@ -1,6 +1,18 @@
 from dataclasses import dataclass
 import typing as typ
 
+# Bits for the yes/no properties of a material, so containers can summarize
+# what's inside them (see `GameItem.nested_properties`)
+COMBUSTIBLE = 1
+FRAGILE = 2
+CONSUMABLE = 4
+SOLID = 8
+# Not something a material is, but counted along with the rest so a room knows
+# whether there's any light in it (see `objects.LightSource`)
+LIT = 16
+N_PROPERTIES = 5
+ALL_PROPERTIES = (1 << N_PROPERTIES) - 1
+
 @dataclass(frozen=True)
 class Material():
     """Describes a material which objects, surfaces, etc can be made of
@@ -13,6 +25,21 @@ class Material():
     consumable: bool = False
     solid: bool = True
 
+    @property
+    def flags(self) -> int:
+        """The material's properties as bits, i.e. `COMBUSTIBLE | SOLID` for wood"""
+        return ((COMBUSTIBLE if self.combustible else 0)
+                | (FRAGILE if self.fragile else 0)
+                | (CONSUMABLE if self.consumable else 0)
+                | (SOLID if self.solid else 0))
+
+    def __reduce_ex__(self, protocol):
+        # Predefined materials pickle by name so they come back as the same objects
+        const_name = _CONSTANT_NAMES.get(id(self))
+        if const_name is not None:
+            return (by_name, (const_name,))
+        return super().__reduce_ex__(protocol)
+
 DEFAULT = Material(name="non-descript")
 
 METAL = Material(name="metal", 
@@ -74,3 +101,28 @@ LEATHER = Material(name="leather")
 PAPER = Material(name="paper", combustible=True)
 CARDBOARD = Material(name="cardboard", combustible=True)
 
+
+def by_name(name: str) -> Material:
+    """Look up one of the predefined materials by its constant name, i.e. "RUSTY_TIN"
+
+    Args:
+        name (str): Name of the module-level constant (case insensitive)
+
+    Raises:
+        KeyError: If no predefined material has that name
+
+    Returns:
+        Material: The predefined material
+    """
+    material = globals().get(name.upper())
+    if not isinstance(material, Material):
+        raise KeyError(f"Unknown material '{name}'")
+    return material
+
+def constant_name(material: Material) -> typ.Optional[str]:
+    """Name of the module-level constant a material is, i.e. "RUSTY_TIN", or None if
+    it isn't one of the predefined materials.  Unlike `Material.name` ("metal" is both
+    METAL and BRITTLE_METAL), this tells every predefined material apart."""
+    return _CONSTANT_NAMES.get(id(material))
+
+_CONSTANT_NAMES = {id(v): k for k, v in globals().items() if isinstance(v, Material)}
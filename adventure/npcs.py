@@ -0,0 +1,436 @@
+"""Non-player characters: people and creatures who wander the world on their own.
+
+Every NPC in the world is a row in an `NpcRoster`'s packed arrays (which room it's
+in, where it's headed, how long until it next moves), rather than an object with
+methods to call every turn.  `NPC` is just a handle on a row, for content to hold.
+
+Only NPCs in rooms where a player is standing are simulated turn by turn, since
+those are the only ones anybody can see.  Everyone else is left alone until a
+player goes somewhere new, when the whole roster is caught up at once: the moves
+each NPC owes are worked out from its cooldown, and wanderers take that many
+random steps together, vectorized with NumPy when it's installed.
+"""
+import random
+import typing as typ
+from array import array
+from typing import Optional
+
+from . import phrasing, utils
+from .base import GameItem, GameRoom, Player
+from .constants import NPC_CATCH_UP_STEPS
+
+NO_GOAL = -1
+
+
+def _sentence(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+class NPC():
+    """Handle on one character in an `NpcRoster`"""
+    __slots__ = ('roster', 'npc_id')
+
+    def __init__(self, roster: "NpcRoster", npc_id: int):
+        self.roster = roster
+        self.npc_id = npc_id
+
+    @property
+    def name(self) -> str:
+        return self.roster.names[self.npc_id]
+
+    @property
+    def room(self) -> Optional[GameRoom]:
+        return self.roster.room_of(self.npc_id)
+
+    @property
+    def belongings(self):
+        return self.roster.belongings(self.npc_id)
+
+    def go_to(self, room_id: Optional[str]) -> None:
+        """Head for a room (by the shortest way), or back to wandering if None"""
+        self.roster.set_goal(self.npc_id, room_id)
+
+    def __eq__(self, other):
+        return isinstance(other, NPC) and other.roster is self.roster and other.npc_id == self.npc_id
+
+    def __hash__(self):
+        return hash((id(self.roster), self.npc_id))
+
+    def __repr__(self):
+        return f"<NPC: {self.name}>"
+
+
+class NpcRoster():
+    """Every NPC in the world, and the clock they run on
+
+    The roster's clock is the game's turn, which moves on as the players watched
+    by it take their turns (see `watch`).  Players each count their own turns from
+    whenever they started being watched, and the world is as far along as the one
+    who has taken the most, so NPCs don't get any faster when more people play.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.turn = 0
+
+        # One entry per NPC
+        self.room = array('q')          # Index into `_room_ids`
+        self.goal = array('q')          # Index into `_room_ids`, or NO_GOAL
+        self.cooldown = array('q')      # Turns until it next moves, as of `updated`
+        self.restlessness = array('q')  # Turns between moves
+        self.updated = array('q')       # Turn it was last brought up to date
+        self.greedy = array('B')        # Picks up whatever it finds lying around
+        self.names = []
+        self.replies = []               # What it says back to things it hears
+
+        self._belongings = {}           # NPC id -> its container, once it's picked something up
+        self._room_ids = []
+        self._room_index = {}
+        self._occupants = {}            # Room index -> ids of the NPCs in there
+        self._neighbours = {}           # Room index -> indexes of the rooms next door
+        self._table = None              # NumPy version of `_neighbours`, built on demand
+        self._watched = {}              # Player -> (room index they were last seen in, scheduled tick,
+                                        #            roster turn as of their session's turn 0)
+        self._arrivals = {}             # Room index -> NPCs who turned up there while catching up
+        self._caught_up = 0
+        self._rng = random.Random()
+        self._np_rng = None
+
+    def __len__(self):
+        return len(self.room)
+
+    def _room_idx(self, room_id: str) -> int:
+        idx = self._room_index.get(room_id)
+        if idx is None:
+            idx = self._room_index[room_id] = len(self._room_ids)
+            self._room_ids.append(room_id)
+        return idx
+
+    def add(self,
+            name: str,
+            room_id: str,
+            restlessness: int = 3,
+            replies: typ.Mapping[str, str] = {},
+            greedy: bool = False,
+            goal: Optional[str] = None) -> NPC:
+        """Put a new NPC in the world
+
+        Args:
+            name (str): What it's called, with its article, i.e. "the butler"
+            room_id (str): Room it starts in
+            restlessness (int, optional): Turns between moves
+            replies (Mapping[str, str], optional): What it says when it hears a word or
+                phrase, with '' for what it says to anything else
+            greedy (bool, optional): Picks up things it finds lying around
+            goal (Optional[str], optional): Room it's heading for
+
+        Returns:
+            NPC: Handle on the new NPC
+        """
+        npc_id = len(self.room)
+        room = self._room_idx(room_id)
+
+        self.room.append(room)
+        self.goal.append(NO_GOAL if goal is None else self._room_idx(goal))
+        self.cooldown.append(max(1, restlessness))
+        self.restlessness.append(max(1, restlessness))
+        self.updated.append(self.turn)
+        self.greedy.append(1 if greedy else 0)
+        self.names.append(name)
+        self.replies.append(dict(replies))
+
+        self._occupants.setdefault(room, set()).add(npc_id)
+        return NPC(self, npc_id)
+
+    def set_goal(self, npc_id: int, room_id: Optional[str]) -> None:
+        self.goal[npc_id] = NO_GOAL if room_id is None else self._room_idx(room_id)
+
+    def belongings(self, npc_id: int):
+        container = self._belongings.get(npc_id)
+        if container is None:
+            from .objects import GameContainer
+            container = self._belongings[npc_id] = GameContainer("some", "belongings", capacity=10000)
+        return container
+
+    def room_of(self, npc_id: int) -> Optional[GameRoom]:
+        self.catch_up()
+        return self.engine.get_room(self._room_ids[self.room[npc_id]], silent=True)
+
+    def occupants(self, room: GameRoom) -> typ.List[NPC]:
+        """NPCs in a room"""
+        self.catch_up()
+        return self._in_room(self._room_index.get(room.room_id))
+
+    def _in_room(self, room: Optional[int]) -> typ.List[NPC]:
+        return [NPC(self, x) for x in sorted(self._occupants.get(room, ()))]
+
+    # The map, as NPCs see it
+
+    def forget_map(self) -> None:
+        """Forget which rooms connect, i.e. because a door was locked, unlocked, added or taken away"""
+        self._neighbours.clear()
+        self._table = None
+
+    def _neighbours_of(self, room: int) -> typ.List[int]:
+        found = self._neighbours.get(room)
+        if found is None:
+            found = []
+            for exit_item in getattr(self.engine.get_room(self._room_ids[room], silent=True), 'exits', ()):
+                if exit_item.is_locked or exit_item.is_secret or exit_item.goes_to_id is None:
+                    continue
+                found.append(self._room_idx(exit_item.goes_to_id))
+
+            self._neighbours[room] = found
+            self._table = None
+        return found
+
+    def _neighbour_table(self, np, rooms):
+        """(rooms x most exits) array of the rooms next door, and how many each has"""
+        for room in rooms:
+            self._neighbours_of(int(room))
+
+        if self._table is None:
+            width = max(1, max((len(x) for x in self._neighbours.values()), default=0))
+            table = np.zeros((len(self._room_ids), width), dtype=np.int64)
+            counts = np.zeros(len(self._room_ids), dtype=np.int64)
+            for room, found in self._neighbours.items():
+                table[room, :len(found)] = found
+                counts[room] = len(found)
+            self._table = (table, counts)
+        return self._table
+
+    def _next_room(self, npc_id: int) -> int:
+        """Where an NPC goes when it next moves"""
+        here = self.room[npc_id]
+        goal = self.goal[npc_id]
+
+        if goal != NO_GOAL:
+            route = self.engine.find_route(
+                self.engine.get_room(self._room_ids[here], silent=True),
+                self.engine.get_room(self._room_ids[goal], silent=True),
+            )
+            if route:
+                return self._room_idx(route[0].goes_to_id)
+
+            # Got there (or can't), so back to wandering
+            self.goal[npc_id] = NO_GOAL
+
+        found = self._neighbours_of(here)
+        return self._rng.choice(found) if found else here
+
+    def _move(self, npc_id: int, room: int) -> None:
+        self._occupants[self.room[npc_id]].discard(npc_id)
+        self._occupants.setdefault(room, set()).add(npc_id)
+        self.room[npc_id] = room
+
+    # Simulation
+
+    def _moves_owed(self, npc_id: int, turn: int) -> int:
+        """How many times an NPC moves between when it was last updated and `turn`,
+        setting its cooldown to match"""
+        elapsed = turn - self.updated[npc_id]
+        cooldown = self.cooldown[npc_id]
+        self.updated[npc_id] = turn
+
+        if elapsed < cooldown:
+            self.cooldown[npc_id] = cooldown - elapsed
+            return 0
+
+        period = self.restlessness[npc_id]
+        moves = 1 + (elapsed - cooldown) // period
+        self.cooldown[npc_id] = cooldown + moves * period - elapsed
+        return moves
+
+    def catch_up(self, turn: Optional[int] = None) -> None:
+        """Bring every NPC up to date, as of `turn` (or now)"""
+        turn = self.turn if turn is None else turn
+        if self._caught_up >= turn:
+            return
+        self._caught_up = turn
+
+        np = utils.optional_import('numpy')
+        if np is not None and len(self.updated):
+            movers, moves = self._moves_owed_np(np, turn)
+        else:
+            movers, moves = [], []
+            for npc_id in [x for x, updated in enumerate(self.updated) if updated < turn]:
+                owed = self._moves_owed(npc_id, turn)
+                if owed:
+                    movers.append(npc_id)
+                    moves.append(owed)
+
+        # Anybody turning up where a player is gets announced on that player's next turn
+        occupied = {room for room, _, _ in self._watched.values()}
+        started = {x: self.room[x] for x in movers} if occupied else {}
+
+        walkers, steps = [], []
+        for npc_id, owed in zip(movers, moves):
+            if self.goal[npc_id] != NO_GOAL:
+                # Few enough of these to follow their routes one by one
+                for _ in range(owed):
+                    room = self._next_room(npc_id)
+                    if room == self.room[npc_id]:
+                        break
+                    self._move(npc_id, room)
+            else:
+                # A random walk forgets where it started soon enough, so only take a few steps
+                walkers.append(npc_id)
+                steps.append(min(owed, NPC_CATCH_UP_STEPS))
+
+        if walkers and np is not None:
+            self._walk_np(np, walkers, steps)
+        else:
+            for npc_id, count in zip(walkers, steps):
+                room = self.room[npc_id]
+                for _ in range(count):
+                    found = self._neighbours_of(room)
+                    if found:
+                        room = self._rng.choice(found)
+                self._move(npc_id, room)
+
+        for npc_id, room in started.items():
+            now = self.room[npc_id]
+            if now != room and now in occupied:
+                self._arrivals.setdefault(now, []).append(npc_id)
+
+    def _moves_owed_np(self, np, turn):
+        """`_moves_owed` for every NPC not already up to date, at once"""
+        updated = np.frombuffer(self.updated, dtype=np.int64)
+        cooldowns = np.frombuffer(self.cooldown, dtype=np.int64)
+
+        stale = np.flatnonzero(updated < turn)
+        elapsed = turn - updated[stale]
+        cooldown = cooldowns[stale]
+        period = np.frombuffer(self.restlessness, dtype=np.int64)[stale]
+
+        moves = np.where(elapsed >= cooldown, 1 + (elapsed - cooldown) // period, 0)
+        cooldowns[stale] = cooldown + moves * period - elapsed
+        updated[stale] = turn
+
+        moving = moves > 0
+        return stale[moving].tolist(), moves[moving].tolist()
+
+    def _walk_np(self, np, walkers, steps):
+        if self._np_rng is None:
+            self._np_rng = np.random.default_rng(self._rng.getrandbits(64))
+
+        walkers = np.array(walkers, dtype=np.int64)
+        steps = np.array(steps, dtype=np.int64)
+        rooms = np.frombuffer(self.room, dtype=np.int64)[walkers]
+
+        for step in range(int(steps.max())):
+            moving = np.flatnonzero(steps > step)
+            current = rooms[moving]
+            table, counts = self._neighbour_table(np, np.unique(current))
+
+            available = counts[current]
+            can_move = available > 0
+            picks = (self._np_rng.random(len(moving)) * available).astype(np.int64)
+            rooms[moving[can_move]] = table[current[can_move], picks[can_move]]
+
+        for npc_id, room in zip(walkers.tolist(), rooms.tolist()):
+            if room != self.room[npc_id]:
+                self._move(npc_id, room)
+
+    def _something_to_take(self, npc_id: int, room: int) -> Optional[GameItem]:
+        belongings = self.belongings(npc_id)
+        for item in getattr(self.engine.get_room(self._room_ids[room], silent=True), 'items', ()):
+            if item.is_scenery or item.is_secret or item.is_exit:
+                continue
+            # Anything too big to carry off is left where it is
+            if belongings.has_room_for(item.total_size()):
+                return item
+        return None
+
+    def _simulate(self, npc_id: int, here: int, messages: typ.List[str]) -> None:
+        """Play one turn for an NPC somebody can see"""
+        if not self._moves_owed(npc_id, self.turn):
+            return
+
+        name = self.names[npc_id]
+        room = self.room[npc_id]
+
+        if self.greedy[npc_id]:
+            item = self._something_to_take(npc_id, room)
+            if item is not None:
+                try:
+                    self.belongings(npc_id).add(item)
+                except ValueError:
+                    pass    # Didn't fit after all, so wander off instead
+                else:
+                    if room == here:
+                        messages.append(f"{_sentence(name)} picks up the {item.name}.")
+                    return
+
+        destination = self._next_room(npc_id)
+        if destination == room:
+            return
+
+        self._move(npc_id, destination)
+        if room == here:
+            messages.append(f"{_sentence(name)} leaves.")
+        elif destination == here:
+            messages.append(f"{_sentence(name)} comes in.")
+
+    def tick(self, player: Player) -> Optional[str]:
+        """Run the end of a turn `player` just took, moving the clock on if nobody
+        else has taken this turn yet"""
+        last_seen, event, start = self._watched[player]
+        self.turn = max(self.turn, start + player.session.scheduler.turn)
+        messages = []
+
+        here = self._room_idx(player.room.room_id)
+        if here != last_seen:
+            # Somewhere new, so find out who's been getting up to what
+            self.catch_up(self.turn - 1)
+            self._watched[player] = (here, event, start)
+            self._arrivals.pop(here, None)
+
+            present = self._in_room(here)
+            if present:
+                names = phrasing.natural_list(x.name for x in present)
+                messages.append(f"{_sentence(names)} {'is' if len(present) == 1 else 'are'} here.")
+        else:
+            for npc_id in dict.fromkeys(self._arrivals.pop(here, ())):
+                if self.room[npc_id] == here:
+                    messages.append(f"{_sentence(self.names[npc_id])} comes in.")
+
+        occupied = {room for room, _, _ in self._watched.values()}
+        for room in occupied:
+            for npc_id in list(self._occupants.get(room, ())):
+                self._simulate(npc_id, here, messages)
+
+        return ' '.join(messages) or None
+
+    def watch(self, player: Player) -> None:
+        """Simulate the NPCs around `player`, every turn they take"""
+        if player in self._watched or player.session is None:
+            return
+
+        scheduler = player.session.scheduler
+        event = scheduler.after_turns(1, self.tick, player, every=1)
+        self._watched[player] = (None, event, self.turn - scheduler.turn)
+
+    def unwatch(self, player: Player) -> None:
+        _, event, _ = self._watched.pop(player, (None, None, None))
+        if event is not None:
+            event.cancel()
+
+    def hear(self, player: Player, text: str) -> str:
+        """NPCs in the room react to something the player says"""
+        present = self.occupants(player.room)
+        if not present:
+            return "Nobody answers."
+
+        text = text.lower()
+        responses = []
+        for npc in present:
+            replies = self.replies[npc.npc_id]
+            reply = next((v for k, v in replies.items() if k and k.lower() in text), replies.get(''))
+            if reply:
+                responses.append(f'{_sentence(npc.name)} says "{reply}"')
+
+        if not responses:
+            names = phrasing.natural_list(x.name for x in present)
+            return f"{_sentence(names)} {'doesn' if len(present) == 1 else 'don'}'t seem to hear you."
+
+        return '  '.join(responses)
@@ -1,5 +1,5 @@
-from .base import GameItem, GameEntity, Player
-from . import materials, commands, utils
+from .base import GameItem, GameEntity, GameRoom, Player, _described_property
+from . import materials, commands, listing, phrasing, utils
 from .engine import GameEngine
 from .enums import Match
 
@@ -7,15 +7,20 @@ from typing import Optional
 import typing as typ
 
 class GameContainer(GameItem):
-    def __init__(self, article, name, capacity, items = [], material=materials.DEFAULT, location=None):
-        super().__init__(article, name, items=items, material=material, size=capacity, include_items_in_description=False)
+    # Takes up as much room as it holds, full or empty
+    is_rigid = True
+    
+    __slots__ = ()
+    
+    def __init__(self, article, name, capacity, items = [], material=materials.DEFAULT, location=None, weight=None):
+        super().__init__(article, name, items=items, material=material, size=capacity, include_items_in_description=False,
+                         weight=weight)
         
         self.capacity = capacity
-        self.used_space = sum(i.size for i in items)
     
     @commands.PUT_IN
     def on_put_in(self, player: Player, item: GameItem) -> Optional[str]:
-        if self.capacity - self.used_space >= item.size:
+        if self.has_room_for(item.total_size()):
             self.add(item)
             
             return f"You put the {item.name} in {self.possessive_or_the(player)} {self.name}"
@@ -24,12 +29,16 @@ class GameContainer(GameItem):
     
     @commands.LOOK
     def on_look(self, player):
+        # You can always feel around in your own pockets
+        if self.currently_in is not player and not player.can_see:
+            return "It's too dark to see what's in it."
+        
         result = f"You look in {self.possessive_or_the(player)} {self.name}."
         
         if not self.items:
             result += "  There's nothing there."
         else:
-            result += "  You see...\n * " + '\n * '.join([x.short_description for x in self.items])
+            result += "  You see..." + ''.join(listing.iter_bullets(phrasing.summarize_items(self.items)))
             
         return result
     
@@ -55,10 +64,21 @@ class GameContainer(GameItem):
     def delete(self):
         super().delete()
         
-        for item in self.items:
+        for item in list(self.items):
             item.delete()
 
 class Door(GameItem):
+    """A way from one room to another.
+    
+    The room a door leads to is looked up once and kept, and every door registers
+    where it goes with the engine, which is what answers "which rooms connect here".
+    The kept room isn't pickled, so compiled rooms don't drag their neighbours along.
+    """
+    is_exit = True
+    
+    # The engine keeps weak references to exits
+    __slots__ = ('_is_locked', '_goes_to', '_is_closed', '_target', '__weakref__')
+    
     def __init__(self, 
                  article, 
                  name, 
@@ -68,17 +88,91 @@ class Door(GameItem):
                  material=materials.WOOD
                  ):
         super().__init__(article, name, is_secret=is_secret, material=material)
-        self.is_locked = is_locked
+        self._is_locked = is_locked
         self._goes_to = goes_to
-        self.is_closed = True
+        self._is_closed = True
+        self._target = None
+        
+        if goes_to is not None:
+            GameEngine.add_exit(self, goes_to)
+    
+    def __getstate__(self):
+        # Slot values from every class in the hierarchy, plus the __dict__ of any
+        # subclass that has one (`object.__getstate__` only exists from Python 3.11)
+        state = {}
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            for name in [slots] if isinstance(slots, str) else slots:
+                if name in ('__dict__', '__weakref__', '_target') or name in state:
+                    continue
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass    # Never set
+        state.update(getattr(self, '__dict__', {}))
+        return state
+    
+    def __setstate__(self, state):
+        for key, value in state.items():
+            object.__setattr__(self, key, value)
+        self._target = None
         
+        if self._goes_to is not None:
+            GameEngine.add_exit(self, self._goes_to)
+    
+    is_closed = _described_property('_is_closed', "Is the door closed")
+    
     @property
-    def goes_to(self):
-        return GameEngine.get_room(self._goes_to)
+    def is_locked(self) -> bool:
+        """Is the door locked"""
+        return self._is_locked
+    
+    @is_locked.setter
+    def is_locked(self, value: bool):
+        self._is_locked = value
+        self.touch()
+        GameEngine.invalidate_routes()
+    
+    def _set_indexed(self, attr: str, value):
+        super()._set_indexed(attr, value)
+        if attr == '_is_secret':
+            GameEngine.invalidate_routes()
+        
+    @property
+    def goes_to(self) -> Optional[GameRoom]:
+        if self._target is None and self._goes_to is not None:
+            self._target = GameEngine.get_room(self._goes_to, silent=True)
+        return self._target
     
     @goes_to.setter
     def goes_to(self, room:str):
+        if self._goes_to is not None:
+            GameEngine.remove_exit(self, self._goes_to)
+        
         self._goes_to = room
+        self._target = None
+        if room is not None:
+            GameEngine.add_exit(self, room)
+        self.touch()
+        GameEngine.invalidate_routes()
+    
+    @property
+    def goes_to_id(self) -> Optional[str]:
+        """Id of the room this door leads to"""
+        return self._goes_to
+    
+    def resolve(self, rooms: typ.Mapping[str, GameRoom]) -> Optional[GameRoom]:
+        """Look up where the door leads in `rooms` (keyed by room id), rather than
+        waiting to find it in the engine"""
+        self._target = rooms.get(self._goes_to)
+        return self._target
+    
+    def delete(self):
+        super().delete()
+        
+        if self._goes_to is not None:
+            GameEngine.remove_exit(self, self._goes_to)
+        GameEngine.invalidate_routes()
         
     @property
     def short_description(self):
@@ -132,7 +226,7 @@ class Door(GameItem):
         
         self.is_closed = False
         
-        return "You opened it.  Through the door you see " + self.goes_to.name
+        return "You opened it.  Through the door you see " + where_it_goes
     
     @commands.CLOSE
     def on_close(self, player, with_obj=None):
@@ -161,4 +255,211 @@ class Door(GameItem):
             return "You open the door and step through.  " + player.move_to(self.goes_to)
         
         return player.move_to(self.goes_to)
-    
\ No newline at end of file
+    
+
+class ItemStack(GameItem):
+    """A pile of identical things (coins, arrows, ...) kept as a single item with a count.
+    
+    Putting a stack where there's already a matching one merges the two.  A command
+    naming a quantity ("take 3 coins") acts on a `portion` of the stack, which is only
+    split off the pile once it's actually moved somewhere.
+    """
+    is_stackable = True
+    
+    __slots__ = ('_count', 'unit_size', 'unit_weight', 'singular', 'plural', '_split_from')
+    
+    def __init__(self,
+                 singular: str,
+                 plural: str,
+                 count: int = 1,
+                 article: str = "a",
+                 unit_size: int = 1,
+                 is_scenery: bool = False,
+                 is_secret: bool = False,
+                 material: materials.Material = materials.DEFAULT,
+                 combustible: Optional[bool] = None,
+                 unit_weight: Optional[int] = None):
+        if count < 1:
+            raise ValueError("A stack needs at least one thing in it")
+        if unit_weight is None:
+            unit_weight = unit_size
+        
+        super().__init__(article, plural, is_scenery=is_scenery, is_secret=is_secret, material=material,
+                         combustible=combustible, size=count * unit_size, weight=count * unit_weight)
+        self._count = count
+        self.unit_weight = unit_weight
+        self.unit_size = unit_size
+        self.singular = singular
+        self.plural = plural
+        self._split_from = None
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    @count.setter
+    def count(self, value: int):
+        if value < 1:
+            raise ValueError("A stack needs at least one thing in it")
+        
+        change = value - self._count
+        self._count = value
+        self.size += change * self.unit_size
+        self.weight += change * self.unit_weight
+        if self.currently_in is not None:
+            self.currently_in._contents_resized(change * self.unit_size, change * self.unit_weight)
+        self.touch()
+    
+    @property
+    def article(self) -> str:
+        return self._article if self._count == 1 else str(self._count)
+    
+    @property
+    def name(self) -> str:
+        return self.singular if self._count == 1 else self.plural
+    
+    @property
+    def verb(self) -> str:
+        return "is" if self._count == 1 else "are"
+    
+    def matches_name(self, text: str) -> Match:
+        return max(super().matches_name(text), utils.is_rough_match(text, self.singular))
+    
+    def stacks_with(self, other: GameItem) -> bool:
+        """Could this stack and `other` be the same pile"""
+        return (
+            type(other) is type(self)
+            and other.singular == self.singular
+            and other.plural == self.plural
+            and other.unit_size == self.unit_size
+            and other.unit_weight == self.unit_weight
+            and other.material == self.material
+            and other.is_scenery == self.is_scenery
+            and other.is_secret == self.is_secret
+        )
+    
+    def merge_into(self, neighbours):
+        for other in neighbours:
+            if other is not self and self.stacks_with(other):
+                other.count += self._count
+                return other
+        
+        return None
+    
+    def portion(self, quantity: int) -> "ItemStack":
+        """Part of this stack, to act on separately.  The portion stays part of the
+        pile until it's put somewhere else.
+
+        Args:
+            quantity (int): How many of the things to take.  Asking for more than there
+                are gets all of them.
+
+        Returns:
+            ItemStack: The portion
+        """
+        quantity = min(quantity, self._count)
+        part = ItemStack(self.singular, self.plural, quantity, article=self._article, unit_size=self.unit_size,
+                         is_scenery=self.is_scenery, is_secret=self.is_secret, material=self.material,
+                         combustible=self._combustible, unit_weight=self.unit_weight)
+        part.currently_in = self.currently_in
+        part._split_from = self
+        return part
+    
+    def _leave_container(self):
+        source = self._split_from
+        if source is None:
+            return super()._leave_container()
+        
+        self._split_from = None
+        self.currently_in = None
+        if self._count < source.count:
+            source.count -= self._count
+        else:
+            # The portion is the whole pile, so it takes the pile's place
+            source._leave_container()
+    
+    def _same_pile_in(self, items: typ.Iterable[GameItem]) -> Optional["ItemStack"]:
+        return next((x for x in items if x is not self and x is not self._split_from and self.stacks_with(x)), None)
+    
+    def _as_much_of(self, pile: "ItemStack") -> "ItemStack":
+        # The same amount of `pile` as the player asked for of this stack
+        return pile if self._split_from is None else pile.portion(self._count)
+    
+    @commands.TAKE
+    def on_take(self, player):
+        # "coins" could mean the pile you've got or the one in the room -- you can only take the latter
+        if self.currently_in is player.inventory and player.room is not None:
+            pile = self._same_pile_in(player.room.items)
+            if pile is not None:
+                return GameItem.on_take(self._as_much_of(pile), player)
+        
+        return super().on_take(player)
+    
+    @commands.DISCARD
+    def on_drop(self, player):
+        if self.currently_in is not player.inventory:
+            pile = self._same_pile_in(player.inventory.items)
+            if pile is not None:
+                return GameItem.on_drop(self._as_much_of(pile), player)
+        
+        return super().on_drop(player)
+
+
+class LightSource(GameItem):
+    """A lamp, candle, torch or anything else that lights up a dark room while it's lit,
+    wherever it is in there (including in someone's hands)."""
+    __slots__ = ('_is_lit',)
+    
+    def __init__(self,
+                 article: str,
+                 name: str,
+                 is_lit: bool = False,
+                 is_scenery: bool = False,
+                 is_secret: bool = False,
+                 material: materials.Material = materials.DEFAULT,
+                 size: int = 1):
+        self._is_lit = is_lit
+        super().__init__(article, name, is_scenery=is_scenery, is_secret=is_secret, material=material, size=size)
+    
+    @property
+    def is_lit(self) -> bool:
+        return self._is_lit
+    
+    @is_lit.setter
+    def is_lit(self, value: bool):
+        before = self.properties
+        self._is_lit = value
+        self._properties_changed(before)
+        self.touch()
+    
+    @property
+    def properties(self) -> int:
+        return super().properties | (materials.LIT if self._is_lit else 0)
+    
+    @property
+    def short_description(self) -> str:
+        desc = super().short_description
+        return desc + " (lit)" if self._is_lit else desc
+    
+    @commands.LIGHT
+    def on_light(self, player):
+        if self.is_lit:
+            return f"The {self.name} is already lit."
+        
+        was_dark = not player.can_see
+        self.is_lit = True
+        result = f"You light the {self.name}."
+        if was_dark and player.can_see:
+            result += "  You can see again!\n\n" + player.room.on_look(player)
+        return result
+    
+    @commands.EXTINGUISH
+    def on_extinguish(self, player):
+        if not self.is_lit:
+            return f"The {self.name} isn't lit."
+        
+        self.is_lit = False
+        result = f"You put out the {self.name}."
+        if not player.can_see:
+            result += "  " + phrasing.dark_room()
+        return result
@@ -1,14 +1,19 @@
-from .utils import select_one
+import operator
 import typing as typ
 
-def natural_list(descs: typ.List[str], oxford_comma=False) -> str:
-    if len(descs) == 0:
-        return "Nothing"
-    if len(descs) == 1:
-        return descs[0]
-    if len(descs) == 2:
-        return descs[0] + (',' if oxford_comma else '') + " and " + descs[1]
-    return descs[0] + ", " + natural_list(descs[1:], oxford_comma=True)
+from . import listing
+from .constants import LISTING_LIMIT
+from .utils import select_one
+
+def natural_list(descs: typ.Iterable[str], oxford_comma=False) -> str:
+    return listing.natural_list(descs, oxford_comma)
+
+def summarize_items(items: typ.Iterable["adventure.base.GameItem"]) -> typ.Iterator[str]:
+    """Short descriptions of items for listing, collapsed and truncated (see `listing.summarize`)"""
+    return listing.summarize(items, describe=_short_description, limit=LISTING_LIMIT, name=_name)
+
+_short_description = operator.attrgetter('short_description')
+_name = operator.attrgetter('name')
 
 
 _DARK_ROOM = [
@@ -30,25 +35,41 @@ _ITEM_DESCRIPTIONS = [
     
 def describe_items(items: typ.List["adventure.base.GameItem"]) -> str:
     groups = {}
-    if len(items) == 0:
-        return ''
-    
     for item in items:
         grp = groups.get(item.location, [])
         groups[item.location] = grp
         grp.append(item)
-        
-    descs = []
+    
+    return describe_groups(groups)
+
+def describe_groups(groups: typ.Mapping[str, typ.Collection["adventure.base.GameItem"]]) -> str:
+    """Describe items which are already grouped by location, i.e. {"on the table": [plate, cup]}"""
+    return describe_parts(group_parts(groups))
+
+def group_parts(groups: typ.Mapping[str, typ.Collection["adventure.base.GameItem"]]) -> typ.List[typ.Tuple[str, str, str]]:
+    """Work out the pieces of a description of grouped items, without choosing the phrasing
+    
+    Returns:
+        List[Tuple[str, str, str]]: (list of items, location, verb) for each group
+    """
+    parts = []
     for loc, grp in groups.items():
-        desc = select_one(_ITEM_DESCRIPTIONS).format(
-            natural_list([x.short_description for x in grp]),
-            loc,
-            grp[0].verb if len(grp) == 1 else "are"
-        )
+        if len(grp) == 1:
+            verb = next(iter(grp)).verb
+        else:
+            verb = "are"
         
+        parts.append((natural_list(summarize_items(grp)), loc, verb))
+    
+    return parts
+
+def describe_parts(parts: typ.List[typ.Tuple[str, str, str]]) -> str:
+    """Turn the output of `group_parts` into sentences, picking the phrasing for each"""
+    descs = []
+    for part in parts:
+        desc = select_one(_ITEM_DESCRIPTIONS).format(*part)
         descs.append(desc[0].upper() + desc[1:])
         
-        
     return " ".join(descs)
     
 _BAD_PERSON_SMELLS = [
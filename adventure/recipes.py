@@ -0,0 +1,332 @@
+"""Crafting: combining things into something new.
+
+A `Recipe` takes a multiset of ingredients, each a name and optionally the
+material it has to be made of.  Materials are told apart by their constant
+names in `adventure.materials` ("BRITTLE_METAL"), since display names aren't
+unique.  `RecipeBook` indexes its recipes two ways:
+
+ * by their canonical ingredient multiset, so "what does combining exactly these
+   things make" is a dict lookup (or a few, when some ingredients don't care what
+   they're made of), and
+ * by each ingredient, so "what could I make out of what I've got" only looks at
+   recipes which use something at hand, and throws out any that need more of
+   something than there is without trying any subsets.
+
+Combining more than one recipe's worth at once ("two sets of three make two
+different potions") is a backtracking search for a way to split the things up,
+where each step only tries recipes which use the first thing left over.
+"""
+import itertools
+import re
+import typing as typ
+from collections import Counter, defaultdict
+from typing import Optional
+
+from . import commands, materials, phrasing, utils
+from .base import GameItem, Player
+
+# (name, material's constant name or None).  None in a recipe means "made of anything",
+# and on an item that it's made of something that isn't a predefined material.
+IngredientKey = typ.Tuple[str, Optional[str]]
+
+_SPLIT_NAMES = re.compile(r",|\band\b|\bwith\b|\binto\b")
+
+
+def _canonical_name(name: str) -> str:
+    return utils.normalize_name(name)
+
+
+def _key_order(key: IngredientKey) -> typ.Tuple[str, str]:
+    """Sort order for ingredient keys, which can't be compared directly when the same
+    name comes with and without a material"""
+    name, material = key
+    return name, material or ''
+
+
+def _canonical_material(material: typ.Union[str, materials.Material]) -> str:
+    if isinstance(material, str):
+        material = materials.by_name(material)
+    name = materials.constant_name(material)
+    if name is None:
+        raise KeyError(f"Ingredients can only ask for predefined materials, not {material.name!r}")
+    return name
+
+
+def _item_key(item: GameItem) -> IngredientKey:
+    return _canonical_name(getattr(item, 'singular', item.name)), materials.constant_name(item.material)
+
+
+def _item_count(item: GameItem) -> int:
+    return item.count if item.is_stackable else 1
+
+
+class Recipe():
+    """Something that can be made by combining other things
+
+    Args:
+        name (str): What it makes, i.e. "a lockpick"
+        ingredients (Iterable): What goes in.  Each is a name ("paperclip"), or a
+            (name, material) pair for one made of something in particular, with the
+            material given as a predefined `Material` or its constant name
+            (("ball", "WOOD")), optionally with a count on the end for more than one
+        makes (Callable[[], GameItem]): Makes whatever comes out
+
+    Raises:
+        KeyError: If an ingredient asks for a material that isn't predefined
+    """
+    __slots__ = ('name', 'ingredients', 'makes')
+
+    def __init__(self, name: str, ingredients: typ.Iterable, makes: typ.Callable[[], GameItem]):
+        counts = Counter()
+        for ingredient in ingredients:
+            if isinstance(ingredient, str):
+                ingredient = (ingredient,)
+
+            name_part = _canonical_name(ingredient[0])
+            material = ingredient[1] if len(ingredient) > 1 else None
+            if material is not None:
+                material = _canonical_material(material)
+            count = ingredient[2] if len(ingredient) > 2 else 1
+            counts[(name_part, material)] += count
+
+        self.name = name
+        # Canonical form of the ingredient multiset: sorted ((name, material), count) pairs
+        self.ingredients = tuple(sorted(counts.items(), key=lambda x: _key_order(x[0])))
+        self.makes = makes
+
+    @property
+    def size(self) -> int:
+        return sum(count for _, count in self.ingredients)
+
+    def __repr__(self):
+        return f"<Recipe: {self.name}>"
+
+
+def _canonical(keys: typ.Iterable[IngredientKey]):
+    return tuple(sorted(Counter(keys).items(), key=lambda x: _key_order(x[0])))
+
+
+class RecipeBook():
+    """Recipes, indexed for looking up what things make.  Adding a recipe with the
+    same name and ingredients as one already in the book (i.e. from loading the
+    same world again) gives back the one that's there."""
+    def __init__(self):
+        self._known = {}                            # (name, canonical ingredients) -> recipe
+        self._by_ingredients = defaultdict(list)    # Canonical ingredient multiset -> recipes
+        self._by_ingredient = defaultdict(list)     # Ingredient key -> recipes which use it
+        self._sizes = set()                         # How many things go into each recipe
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, recipe: Recipe) -> Recipe:
+        known = self._known.setdefault((recipe.name, recipe.ingredients), recipe)
+        if known is not recipe:
+            return known
+
+        self._by_ingredients[recipe.ingredients].append(recipe)
+        for key, _ in recipe.ingredients:
+            self._by_ingredient[key].append(recipe)
+        self._sizes.add(recipe.size)
+        self._count += 1
+        return recipe
+
+    def _options(self, key: IngredientKey) -> typ.List[IngredientKey]:
+        """Ways a recipe might ask for something: as made of its material, or of anything"""
+        generic = (key[0], None)
+        return [x for x in (key, generic) if x in self._by_ingredient]
+
+    def combining(self, items: typ.Sequence[GameItem]) -> typ.List[Recipe]:
+        """Recipes made out of exactly these things"""
+        if sum(_item_count(x) for x in items) not in self._sizes:
+            return []
+
+        keys = [key for item in items for key in [_item_key(item)] * _item_count(item)]
+
+        options = [self._options(key) for key in keys]
+        if not all(options):
+            return []
+
+        found = {}
+        for combination in itertools.product(*options):
+            for recipe in self._by_ingredients.get(_canonical(combination), ()):
+                found[recipe] = None
+        return list(found)
+
+    def _could_make(self, recipe: Recipe, have: Counter, have_by_name: Counter) -> bool:
+        needed_by_name = Counter()
+        for (name, material), count in recipe.ingredients:
+            if material is not None and have[(name, material)] < count:
+                return False
+            needed_by_name[name] += count
+
+        # Anything that doesn't care what it's made of takes whatever's left of that name
+        return all(have_by_name[name] >= count for name, count in needed_by_name.items())
+
+    def possible(self, items: typ.Iterable[GameItem]) -> typ.List[Recipe]:
+        """Recipes which could be made out of some of these things"""
+        have, have_by_name = Counter(), Counter()
+        for item in items:
+            key, count = _item_key(item), _item_count(item)
+            have[key] += count
+            have_by_name[key[0]] += count
+
+        candidates = {}
+        for key in have:
+            for option in self._options(key):
+                for recipe in self._by_ingredient[option]:
+                    candidates[recipe] = None
+
+        return [x for x in candidates if self._could_make(x, have, have_by_name)]
+
+    def split(self, items: typ.Sequence[GameItem]) -> Optional[typ.List[typ.Tuple[Recipe, typ.List[GameItem]]]]:
+        """Find a way to use up all of these things making one or more recipes
+
+        Returns:
+            Optional[List[Tuple[Recipe, List[GameItem]]]]: Each recipe, with the things
+                that go into it, or None if there's no way to use them all
+        """
+        pool = defaultdict(list)     # Ingredient key -> the things there are of it
+        for item in items:
+            pool[_item_key(item)].extend([item] * _item_count(item))
+
+        dead_ends = set()
+
+        def search(left: Counter) -> Optional[typ.List[typ.Tuple[Recipe, Counter]]]:
+            if not left:
+                return []
+
+            state = frozenset(left.items())
+            if state in dead_ends:
+                return None
+
+            # Whatever makes the first thing left over has to use it, so only try those
+            first = min(left, key=_key_order)
+            tried = set()
+            for option in self._options(first):
+                for recipe in self._by_ingredient[option]:
+                    if recipe in tried:
+                        continue
+                    tried.add(recipe)
+
+                    used = self._use(recipe, left, first)
+                    if used is None:
+                        continue
+
+                    rest = search(left - used)
+                    if rest is not None:
+                        return [(recipe, used)] + rest
+
+            dead_ends.add(state)
+            return None
+
+        plan = search(Counter({key: len(things) for key, things in pool.items()}))
+        if plan is None:
+            return None
+
+        result = []
+        for recipe, used in plan:
+            keys = sorted(used, key=_key_order)
+            result.append((recipe, [pool[key].pop() for key in keys for _ in range(used[key])]))
+        return result
+
+    @staticmethod
+    def _use(recipe: Recipe, left: Counter, first: IngredientKey) -> Optional[Counter]:
+        """What making `recipe` would use up out of `left`, making sure it uses `first`,
+        or None if there isn't enough"""
+        used = Counter()
+        for (name, material), count in recipe.ingredients:
+            if material is not None:
+                if left[(name, material)] - used[(name, material)] < count:
+                    return None
+                used[(name, material)] += count
+                continue
+
+            # Made of anything, so take `first` if it fits, then whatever else there is
+            candidates = sorted((x for x in left if x[0] == name), key=lambda x: x != first)
+            for key in candidates:
+                take = min(count, left[key] - used[key])
+                used[key] += take
+                count -= take
+                if not count:
+                    break
+            if count:
+                return None
+
+        return used if used[first] else None
+
+    # Commands
+
+    @staticmethod
+    def _find_things(player: Player, text: str) -> typ.Tuple[typ.List[GameItem], typ.List[str]]:
+        """Things the player means by a list of names, and any names that didn't match.
+        Looks where any other command would (see `commands._CommandContext`), so that's
+        inside open containers, and only by feel in the dark."""
+        context = commands._CommandContext(player)
+        # Where each thing comes in scope, which settles ties in favour of what's nearest to hand
+        usable = {
+            x: idx for idx, x in enumerate(dict.fromkeys(context.available_objects()))
+            if isinstance(x, GameItem) and x is not player.inventory and not x.is_scenery and not x.is_exit
+        }
+
+        found, missing = [], []
+        for desc in (x.strip() for x in _SPLIT_NAMES.split(text.lower())):
+            if not desc:
+                continue
+
+            left = usable.keys() - set(found)
+            if left:
+                context.reset_context(limit_to=left)
+                _, matches = context.find_objects(desc)
+            else:
+                matches = []
+
+            if matches:
+                found.append(min(matches, key=usable.get))
+            else:
+                missing.append(desc)
+
+        return found, missing
+
+    def combine(self, player: Player, text: str) -> str:
+        things, missing = self._find_things(player, text)
+        if missing:
+            return f"You don't see any {phrasing.natural_list(missing)} here."
+        if len(things) < 2:
+            return "You need at least two things to combine."
+
+        recipes = self.combining(things)
+        if len(recipes) > 1:
+            return "You could make " + phrasing.natural_list([x.name for x in recipes], oxford_comma=True) + " out of those.  Be more specific?"
+
+        plan = [(recipes[0], things)] if recipes else self.split(things)
+        if not plan:
+            return f"You fiddle with the {phrasing.natural_list(x.name for x in things)}, but nothing comes of it."
+
+        made = []
+        for recipe, used in plan:
+            for item in dict.fromkeys(used):
+                item.delete()
+
+            result = recipe.makes()
+            if player.inventory.has_room_for(result.total_size()):
+                player.inventory.add(result)
+            else:
+                player.room.add(result, "on the floor")
+            made.append(result.short_description)
+
+        return f"You combine the {phrasing.natural_list(x.name for x in things)} and make {phrasing.natural_list(made)}."
+
+    def show_possible(self, player: Player) -> str:
+        recipes = self.possible(player.inventory.items)
+        if not recipes:
+            return "Nothing comes to mind out of what you're carrying."
+
+        return "Out of what you're carrying, you could make " + phrasing.natural_list(x.name for x in recipes) + "."
+
+
+RECIPES = RecipeBook()
+
+commands.COMBINE.register_generic_handler(RECIPES.combine)
+commands.SHOW_RECIPES.register_generic_handler(RECIPES.show_possible)
@@ -0,0 +1,138 @@
+"""The game clock: things that happen on their own, some turns or seconds from now.
+
+Content schedules a callback for a future turn ("the candle burns out in 20
+turns") or a wall-clock time ("the door slams in 30 seconds"), and gets back a
+`ScheduledEvent` it can cancel.  Whatever a callback returns is shown to the
+player, like the result of a command.
+
+Events wait in two heaps, one ordered by turn and one by time, so each tick only
+looks at the events which are actually due, however many are pending.  Cancelling
+just marks an event; it's thrown away when it reaches the top of its heap, or
+when enough cancelled events pile up that it's worth rebuilding the heaps.
+"""
+import heapq
+import itertools
+import typing as typ
+from time import monotonic
+
+_TURNS = 'turns'
+_SECONDS = 'seconds'
+
+
+class ScheduledEvent():
+    """Something scheduled to happen.  Keep hold of it to `cancel` it later."""
+    __slots__ = ('scheduler', 'kind', 'due', 'every', 'callback', 'args', 'cancelled', 'queued')
+
+    def __init__(self, scheduler, kind, due, every, callback, args):
+        self.scheduler = scheduler
+        self.kind = kind
+        self.due = due
+        self.every = every
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.queued = False     # Sitting in one of the scheduler's heaps
+
+    def cancel(self) -> None:
+        """Stop this from happening (again, for a repeating event)"""
+        self.scheduler.cancel(self)
+
+    def __repr__(self):
+        state = " (cancelled)" if self.cancelled else ""
+        return f"<ScheduledEvent: {self.callback!r} at {self.kind} {self.due}{state}>"
+
+
+class Scheduler():
+    """Clock and pending events for one game session
+
+    Args:
+        clock (Callable[[], float], optional): Wall clock, in seconds
+    """
+    def __init__(self, clock: typ.Callable[[], float] = monotonic):
+        self.turn = 0
+        self._clock = clock
+        self._seq = itertools.count()   # Breaks ties, so events due together run in the order scheduled
+        self._heaps = {_TURNS: [], _SECONDS: []}
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        return sum(len(x) for x in self._heaps.values()) - self._cancelled
+
+    def _push(self, event: ScheduledEvent) -> ScheduledEvent:
+        heapq.heappush(self._heaps[event.kind], (event.due, next(self._seq), event))
+        event.queued = True
+        return event
+
+    def at_turn(self, turn: int, callback: typ.Callable, *args, every: typ.Optional[int] = None) -> ScheduledEvent:
+        """Call `callback(*args)` at the end of turn `turn`, then every `every` turns
+        after that if given"""
+        return self._push(ScheduledEvent(self, _TURNS, turn, every, callback, args))
+
+    def after_turns(self, turns: int, callback: typ.Callable, *args, every: typ.Optional[int] = None) -> ScheduledEvent:
+        """Call `callback(*args)` `turns` turns from now (1 being the end of the next turn)"""
+        return self.at_turn(self.turn + turns, callback, *args, every=every)
+
+    def at_time(self, when: float, callback: typ.Callable, *args, every: typ.Optional[float] = None) -> ScheduledEvent:
+        """Call `callback(*args)` at the first tick once the clock reaches `when`, then
+        every `every` seconds after that if given"""
+        return self._push(ScheduledEvent(self, _SECONDS, when, every, callback, args))
+
+    def after_seconds(self, seconds: float, callback: typ.Callable, *args, every: typ.Optional[float] = None) -> ScheduledEvent:
+        return self.at_time(self._clock() + seconds, callback, *args, every=every)
+
+    def cancel(self, event: ScheduledEvent) -> None:
+        if event.cancelled:
+            return
+
+        event.cancelled = True
+        if not event.queued:
+            return
+        self._cancelled += 1
+
+        # Mostly dead heaps get rebuilt, so lots of cancelled timers don't hang around
+        if self._cancelled > 64 and self._cancelled * 2 > sum(len(x) for x in self._heaps.values()):
+            for kind, heap in self._heaps.items():
+                heap[:] = [x for x in heap if not x[2].cancelled]
+                heapq.heapify(heap)
+            self._cancelled = 0
+
+    def _run_due(self, kind: str, now: float) -> typ.List[str]:
+        heap = self._heaps[kind]
+        results = []
+        repeats = []
+
+        while heap and heap[0][0] <= now:
+            _, _, event = heapq.heappop(heap)
+            event.queued = False
+            if event.cancelled:
+                self._cancelled -= 1
+                continue
+
+            result = event.callback(*event.args)
+            if result:
+                results.append(result)
+
+            if event.every and not event.cancelled:
+                event.due += event.every
+                if event.due <= now:
+                    # Runs at most once per tick, even if the game fell behind, so skip
+                    # the repeats it missed (keeping in step with when it started)
+                    event.due += event.every * ((now - event.due) // event.every + 1)
+                repeats.append(event)
+
+        for event in repeats:
+            # Something else that ran this tick may have cancelled it since
+            if not event.cancelled:
+                self._push(event)
+
+        return results
+
+    def tick(self) -> typ.List[str]:
+        """End the current turn: run everything that's come due
+
+        Returns:
+            List[str]: What the events had to say, in the order they ran
+        """
+        self.turn += 1
+
+        return self._run_due(_TURNS, self.turn) + self._run_due(_SECONDS, self._clock())
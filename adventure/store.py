@@ -0,0 +1,586 @@
+"""Struct-of-arrays entity storage for very large worlds.
+
+`EntityStore` keeps every entity as an integer id into a set of packed arrays
+(parent, size, flags, material id, and string table ids for names), instead of
+one Python object per item.  Bulk questions like "which items are visible in this
+room" or "how much stuff is under this container" become array scans, which are
+vectorized with NumPy when it's installed.
+
+`StoredItem` and `StoredRoom` are lightweight views which present entities in a
+store through the regular `GameItem` / `GameRoom` API, so commands, phrasing,
+and the engine work on them unchanged.  Views are created on demand; two views
+of the same entity compare (and hash) equal.
+
+Only plain `GameItem`s are packed into the arrays.  Anything with behaviour of
+its own (doors, containers, content subclasses) stays a regular object, attached
+to its stored parent.
+
+Stored entities don't keep material property summaries or size totals of
+what's inside them (see `GameItem.find_with` and `GameItem.total_size`), so
+those are worked out from the arrays when they're asked for.  They do pass
+changes on to any regular container they're in, i.e. the player's pockets.
+Stored items weigh the same as their size.
+"""
+import typing as typ
+from array import array
+from typing import Optional
+
+from . import commands, materials, phrasing, utils
+from .base import GameItem, GameRoom, _count_properties, _exits_changed, _note_moved
+from .utils import ItemSet
+
+NO_PARENT = -1
+EXTERNAL_PARENT = -2
+
+FLAG_ROOM = 1
+FLAG_SCENERY = 2
+FLAG_SECRET = 4
+FLAG_COMBUSTIBLE = 8
+FLAG_INCLUDE_ITEMS = 16
+FLAG_DELETED = 32
+
+
+class StringTable():
+    """Interns strings, so each distinct name is stored once and referred to by id"""
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+
+    def intern(self, text: Optional[str]) -> int:
+        if text is None:
+            return -1
+
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._ids[text] = string_id
+            self._strings.append(text)
+        return string_id
+
+    def lookup(self, string_id: int) -> Optional[str]:
+        if string_id < 0:
+            return None
+        return self._strings[string_id]
+
+    def __len__(self):
+        return len(self._strings)
+
+
+class EntityStore():
+    def __init__(self):
+        self.parent = array('q')
+        self.size = array('q')
+        self.flags = array('B')
+        self.material = array('H')
+        self.article = array('l')
+        self.name = array('l')
+        self.verb = array('l')
+        self.location = array('l')
+
+        self.strings = StringTable()
+        self._materials = []
+        self._material_ids = {}
+        # Parents which live outside the store, i.e. a player's inventory
+        self._external_parents = {}
+        # Regular objects whose parent is in the store, keyed by parent id
+        self._attached = {}
+        # Engine room ids of stored rooms, keyed by entity id
+        self.room_ids = {}
+
+    def __len__(self):
+        return len(self.parent)
+
+    def _material_id(self, material: materials.Material) -> int:
+        # Materials aren't hashable (their smells are lists), so go by identity
+        material_id = self._material_ids.get(id(material))
+        if material_id is None:
+            material_id = len(self._materials)
+            self._material_ids[id(material)] = material_id
+            self._materials.append(material)
+        return material_id
+
+    def _append(self, parent, size, flags, material, article, name, verb, location) -> int:
+        entity_id = len(self.parent)
+        self.parent.append(parent)
+        self.size.append(size)
+        self.flags.append(flags)
+        self.material.append(self._material_id(material))
+        self.article.append(self.strings.intern(article))
+        self.name.append(self.strings.intern(name))
+        self.verb.append(self.strings.intern(verb))
+        self.location.append(self.strings.intern(location))
+        return entity_id
+
+    def add_room(self, title: str, description: Optional[str] = None) -> int:
+        # Rooms keep their description in the article column
+        return self._append(NO_PARENT, 0, FLAG_ROOM, materials.DEFAULT, description, title, None, None)
+
+    def add_item(self,
+                 article: str,
+                 name: str,
+                 parent: int = NO_PARENT,
+                 location: Optional[str] = None,
+                 is_scenery: bool = False,
+                 is_secret: bool = False,
+                 material: materials.Material = materials.DEFAULT,
+                 verb: str = "is",
+                 combustible: Optional[bool] = None,
+                 include_items_in_description: bool = True,
+                 size: int = 1) -> int:
+        if combustible is None:
+            combustible = material.combustible
+
+        flags = ((FLAG_SCENERY if is_scenery else 0)
+                 | (FLAG_SECRET if is_secret else 0)
+                 | (FLAG_COMBUSTIBLE if combustible else 0)
+                 | (FLAG_INCLUDE_ITEMS if include_items_in_description else 0))
+
+        if parent >= 0 and not self.flags[parent] & FLAG_ROOM:
+            location = None
+
+        return self._append(parent, size, flags, material, article, name, verb, location)
+
+    def move(self, entity_id: int, parent: int, location: Optional[str] = None) -> None:
+        self._external_parents.pop(entity_id, None)
+        self.parent[entity_id] = parent
+        self.location[entity_id] = self.strings.intern(location if parent >= 0 and self.flags[parent] & FLAG_ROOM else None)
+
+    def move_outside(self, entity_id: int, container) -> None:
+        """Move an entity into a container which isn't part of this store"""
+        self.parent[entity_id] = EXTERNAL_PARENT
+        self.location[entity_id] = -1
+        self._external_parents[entity_id] = container
+
+    def external_parent(self, entity_id: int):
+        return self._external_parents.get(entity_id)
+
+    def attach(self, parent: int, obj: GameItem) -> None:
+        """Put a regular (not stored) object into a stored parent"""
+        self._attached.setdefault(parent, ItemSet()).add(obj)
+
+    def detach(self, parent: int, obj: GameItem) -> None:
+        attached = self._attached.get(parent, ())
+        if obj not in attached:
+            raise ValueError(f"{obj} isn't in {self.view(parent)}")
+
+        attached.remove(obj)
+        if not attached:
+            del self._attached[parent]
+
+    def attached(self, parent: int) -> typ.Iterable[GameItem]:
+        return self._attached.get(parent, ())
+
+    def delete(self, entity_id: int) -> None:
+        self.move(entity_id, NO_PARENT)
+        self.flags[entity_id] |= FLAG_DELETED
+
+    def set_flag(self, entity_id: int, flag: int, value: bool) -> None:
+        if value:
+            self.flags[entity_id] |= flag
+        else:
+            self.flags[entity_id] &= ~flag & 0xFF
+
+    def get_material(self, entity_id: int) -> materials.Material:
+        return self._materials[self.material[entity_id]]
+
+    def set_material(self, entity_id: int, material: materials.Material) -> None:
+        self.material[entity_id] = self._material_id(material)
+
+    # Bulk queries.  Each has a NumPy version and a plain Python fallback.
+
+    def children(self, parent: int, exclude_flags: int = FLAG_DELETED) -> typ.List[int]:
+        """Ids of the direct children of `parent` which have none of `exclude_flags` set"""
+        np = utils.optional_import('numpy')
+        if np is not None and len(self.parent):
+            parents = np.frombuffer(self.parent, dtype=np.int64)
+            flags = np.frombuffer(self.flags, dtype=np.uint8)
+            return np.flatnonzero((parents == parent) & ((flags & exclude_flags) == 0)).tolist()
+
+        return [
+            idx for idx, (p, f) in enumerate(zip(self.parent, self.flags))
+            if p == parent and not f & exclude_flags
+        ]
+
+    def visible_items(self, room: int, scenery: Optional[bool] = None) -> typ.List[int]:
+        """Ids of the non-secret items directly in a room.  If `scenery` is given,
+        only return scenery (True) or non-scenery (False) items"""
+        exclude = FLAG_SECRET | FLAG_DELETED
+        if scenery is False:
+            exclude |= FLAG_SCENERY
+
+        items = self.children(room, exclude)
+        if scenery:
+            flags = self.flags
+            items = [x for x in items if flags[x] & FLAG_SCENERY]
+        return items
+
+    def subtree(self, container: int) -> typ.List[int]:
+        """Ids of everything nested (at any depth) under `container`"""
+        np = utils.optional_import('numpy')
+        if np is not None and len(self.parent):
+            parents = np.frombuffer(self.parent, dtype=np.int64)
+            found = []
+            frontier = np.array([container], dtype=np.int64)
+            while len(frontier):
+                frontier = np.flatnonzero(np.isin(parents, frontier))
+                found.append(frontier)
+            return np.concatenate(found).tolist()
+
+        # One pass to index children, then walk down from the container
+        kids = {}
+        for idx, p in enumerate(self.parent):
+            if p >= 0:
+                kids.setdefault(p, []).append(idx)
+
+        found = []
+        frontier = [container]
+        while frontier:
+            frontier = [c for p in frontier for c in kids.get(p, ())]
+            found.extend(frontier)
+        return found
+
+    def total_size(self, container: int) -> int:
+        """Total size of everything nested under `container`"""
+        np = utils.optional_import('numpy')
+        ids = self.subtree(container)
+        if np is not None and ids:
+            total = int(np.frombuffer(self.size, dtype=np.int64)[ids].sum())
+        else:
+            size = self.size
+            total = sum(size[x] for x in ids)
+
+        # Attached objects only hang off a handful of entities
+        if self._attached:
+            nested = set(ids)
+            nested.add(container)
+            total += sum(obj.total_size() for parent, objs in self._attached.items() if parent in nested for obj in objs)
+
+        return total
+
+    # Views
+
+    def view(self, entity_id: int):
+        if entity_id < 0:
+            return None
+        if self.flags[entity_id] & FLAG_ROOM:
+            return StoredRoom(self, entity_id)
+        return StoredItem(self, entity_id)
+
+    def ingest(self, item: GameItem, parent: int, location: Optional[str] = None) -> None:
+        """Copy a plain `GameItem` (and what's in it) into the store under `parent`.
+        Other kinds of item are attached as they are."""
+        pending = [(item, parent, location)]
+        while pending:
+            item, parent, location = pending.pop()
+
+            if type(item) is not GameItem:
+                item.currently_in = self.view(parent)
+                item.location = location if self.flags[parent] & FLAG_ROOM else None
+                self.attach(parent, item)
+                continue
+
+            entity_id = self.add_item(
+                item.article, item.name, parent,
+                location=location,
+                is_scenery=item.is_scenery,
+                is_secret=item.is_secret,
+                material=item.material,
+                verb=item.verb,
+                combustible=item._combustible,
+                include_items_in_description=item.include_items_in_description,
+                size=item.size,
+            )
+            pending.extend((x, entity_id, None) for x in reversed(item.items))
+
+    @classmethod
+    def from_rooms(cls, rooms: typ.Mapping[str, GameRoom]) -> typ.Tuple["EntityStore", typ.Dict[str, "StoredRoom"]]:
+        """Copy rooms (and everything in them) into a new store
+
+        Args:
+            rooms (Mapping[str, GameRoom]): Rooms keyed by room id
+
+        Returns:
+            EntityStore: The new store
+            Dict[str, StoredRoom]: Views of the copied rooms, keyed by room id
+        """
+        store = cls()
+        views = {}
+
+        for room_id, room in rooms.items():
+            room_entity = store.add_room(room.name, room.description)
+            views[room_id] = StoredRoom(store, room_entity)
+
+            for item in list(room.items):
+                store.ingest(item, room_entity, item.location)
+
+        return store, views
+
+
+def _flag_property(flag: int, doc: str):
+    def getter(self):
+        return bool(self._store.flags[self._id] & flag)
+
+    def setter(self, value):
+        self._store.set_flag(self._id, flag, value)
+
+    return property(getter, setter, doc=doc)
+
+
+def _string_property(column: str, doc: str):
+    def getter(self):
+        return self._store.strings.lookup(getattr(self._store, column)[self._id])
+
+    def setter(self, value):
+        getattr(self._store, column)[self._id] = self._store.strings.intern(value)
+
+    return property(getter, setter, doc=doc)
+
+
+class _StoredEntity():
+    __slots__ = ()
+
+    def __init__(self, store: EntityStore, entity_id: int):
+        self._store = store
+        self._id = entity_id
+
+    @property
+    def entity_id(self) -> int:
+        return self._id
+
+    @property
+    def store(self) -> EntityStore:
+        return self._store
+
+    def __eq__(self, other):
+        return isinstance(other, _StoredEntity) and other._store is self._store and other._id == self._id
+
+    def __hash__(self):
+        return hash((id(self._store), self._id))
+
+    @property
+    def items(self) -> typ.List[GameItem]:
+        store = self._store
+        return [StoredItem(store, x) for x in store.children(self._id)] + list(store.attached(self._id))
+
+    @property
+    def nested_properties(self) -> int:
+        # No summary to go on, so nothing inside can be ruled out without looking
+        return materials.ALL_PROPERTIES
+
+    def _nested_counts(self) -> Optional[typ.List[int]]:
+        counts = None
+        for item in self.items:
+            counts = _count_properties(counts, item.properties, item._nested_counts(), 1)
+        return counts
+
+    def _outside_container(self):
+        """The nearest regular (not stored) entity this is inside, if any"""
+        parent = self
+        while isinstance(parent, _StoredEntity):
+            parent = getattr(parent, 'currently_in', None)
+        return parent
+
+    def _contents_changed(self, own, nested, sign):
+        outside = self._outside_container()
+        if outside is not None:
+            outside._contents_changed(own, nested, sign)
+
+    def _contents_resized(self, space, weight):
+        outside = self._outside_container()
+        if outside is not None:
+            outside._contents_resized(space, weight)
+
+    def _attach(self, item: GameItem, location: Optional[str] = None):
+        """Make this entity the parent of `item`, wherever it was before"""
+        old_parent = item.currently_in
+        if old_parent is not None and old_parent != self:
+            item._leave_container()
+
+        store = self._store
+        if isinstance(item, _StoredEntity) and item._store is store:
+            store.move(item._id, self._id, location)
+        elif old_parent != self:
+            item.currently_in = self
+            item.location = location
+            store.attach(self._id, item)
+
+        outside = self._outside_container()
+        if outside is not None and old_parent != self:
+            _note_moved(outside, item, 1)
+            outside._contents_resized(item.total_size(), item.total_weight())
+
+    def _detach(self, item: GameItem):
+        outside = self._outside_container()
+        if outside is not None:
+            _note_moved(outside, item, -1)
+            outside._contents_resized(-item.total_size(), -item.total_weight())
+
+        if isinstance(item, _StoredEntity) and item._store is self._store:
+            if item.currently_in != self:
+                raise ValueError(f"{item} isn't in {self}")
+            self._store.move(item._id, NO_PARENT)
+        else:
+            self._store.detach(self._id, item)
+            item.currently_in = None
+            item.location = None
+
+
+class StoredItem(_StoredEntity, GameItem):
+    """`GameItem` view of an item in an `EntityStore`"""
+    __slots__ = ('_store', '_id')
+
+    article = _string_property('article', "Article, i.e. 'a' or 'some'")
+    name = _string_property('name', "Name of the item")
+    verb = _string_property('verb', "Verb for describing the item, i.e. 'is' or 'are'")
+    location = _string_property('location', "Where in its room the item is, if it's directly in a room")
+    is_scenery = _flag_property(FLAG_SCENERY, "Is this part of the scenery")
+    is_secret = _flag_property(FLAG_SECRET, "Is this hidden from the player")
+    include_items_in_description = _flag_property(FLAG_INCLUDE_ITEMS, "Describe the contents along with the item")
+
+    # Stored items don't have their own capacity
+    capacity = 10000
+
+    @property
+    def material(self) -> materials.Material:
+        return self._store.get_material(self._id)
+
+    @material.setter
+    def material(self, material: materials.Material):
+        before = self.properties
+        self._store.set_material(self._id, material)
+        after = self.properties
+        if before != after and self.currently_in is not None:
+            self.currently_in._contents_changed(before, None, -1)
+            self.currently_in._contents_changed(after, None, 1)
+
+    @property
+    def is_combustible(self) -> bool:
+        return bool(self._store.flags[self._id] & FLAG_COMBUSTIBLE)
+
+    @property
+    def size(self) -> int:
+        return self._store.size[self._id]
+
+    @size.setter
+    def size(self, value: int):
+        self._store.size[self._id] = value
+
+    @property
+    def currently_in(self):
+        parent = self._store.parent[self._id]
+        if parent == EXTERNAL_PARENT:
+            return self._store.external_parent(self._id)
+        return self._store.view(parent)
+
+    @currently_in.setter
+    def currently_in(self, container):
+        if container is None:
+            self._store.move(self._id, NO_PARENT)
+        elif isinstance(container, _StoredEntity) and container._store is self._store:
+            self._store.move(self._id, container._id, self.location)
+        else:
+            self._store.move_outside(self._id, container)
+
+    @property
+    def used_space(self) -> int:
+        return sum(x.total_size() for x in self.items)
+
+    @used_space.setter
+    def used_space(self, value):
+        # Always worked out from the children
+        pass
+
+    @property
+    def weight(self) -> int:
+        return self._store.size[self._id]
+
+    def add(self, item: GameItem):
+        if not self.has_room_for(item.total_size()):
+            raise ValueError("Not enough space to add that")
+
+        self._attach(item)
+
+    def remove(self, item: GameItem):
+        self._detach(item)
+
+    def delete(self):
+        # Properly out of whatever it's in first, so regular containers forget it too
+        self._leave_container()
+        self._store.delete(self._id)
+
+    def total_size(self) -> int:
+        """Size of this item and everything nested inside it"""
+        return self.size + self._store.total_size(self._id)
+
+    def total_weight(self) -> int:
+        # Attached objects can be heavier than they are big, so they're weighed separately
+        store = self._store
+        ids = [self._id] + store.subtree(self._id)
+        return (sum(store.size[x] for x in ids)
+                + sum(obj.total_weight() for x in ids for obj in store.attached(x)))
+
+
+class StoredRoom(_StoredEntity, GameRoom):
+    """`GameRoom` view of a room in an `EntityStore`"""
+    __slots__ = ('_store', '_id')
+
+    name = _string_property('name', "Title of the room")
+    description = _string_property('article', "Description of the room")
+
+    # There's no column for darkness, so stored rooms are always lit
+    is_dark = False
+    is_lit = True
+
+    @property
+    def room_id(self) -> Optional[str]:
+        return self._store.room_ids.get(self._id)
+
+    @room_id.setter
+    def room_id(self, value: str):
+        self._store.room_ids[self._id] = value
+
+    @property
+    def exits(self) -> typ.List[GameItem]:
+        # Exits are never packed into the store, so they're all attached objects
+        return [x for x in self._store.attached(self._id) if x.is_exit]
+
+    # Visibility comes straight from the store's columns and looks aren't cached, so
+    # there's nothing to index or invalidate
+    def _index(self, item: GameItem):
+        pass
+
+    def _unindex(self, item: GameItem):
+        pass
+
+    def touch(self):
+        pass
+
+    def add(self, item: GameItem, location: str):
+        self._attach(item, location)
+        if item.is_exit:
+            _exits_changed()
+
+    def remove(self, item: GameItem):
+        self._detach(item)
+        if item.is_exit:
+            _exits_changed()
+
+    @commands.LOOK
+    def on_look(self, player):
+        if self.description is not None:
+            desc = self.description + "\n\n"
+        else:
+            desc = "You are in " + self.name + ".  "
+
+        store = self._store
+        attached = [x for x in store.attached(self._id) if not x.is_secret]
+
+        scenery = [StoredItem(store, x) for x in store.visible_items(self._id, scenery=True)]
+        scenery_desc = phrasing.describe_items(scenery + [x for x in attached if x.is_scenery])
+        if scenery_desc:
+            desc += scenery_desc + "\n\n"
+
+        items = [StoredItem(store, x) for x in store.visible_items(self._id, scenery=False)]
+        desc += phrasing.describe_items(items + [x for x in attached if not x.is_scenery])
+
+        return desc
@@ -0,0 +1,88 @@
+"""Compiled text templates.
+
+Game text can refer to the player and their surroundings with `{{...}}`
+placeholders, i.e. "Hello {{player.name.first}}".  A placeholder is an attribute
+path starting at `player` or `room`; one that can't be filled in is shown as
+`{...}`.  Each distinct template string is compiled once into a render function
+and kept in an LRU cache, so rendering the same text again is just a few
+attribute lookups and a join.
+"""
+import functools
+import operator
+import re
+import typing as typ
+
+TEMPLATE_CACHE_SIZE = 1024
+
+_PLACEHOLDER = re.compile("\\{\\{([^\\}]+)\\}\\}")
+_ATTRIBUTE_PATH = re.compile("^[A-Za-z][A-Za-z0-9_]*(\\.[A-Za-z][A-Za-z0-9_]*)*$")
+_ROOTS = ('player', 'room')
+
+Renderer = typ.Callable[["adventure.base.Player", "adventure.base.GameRoom"], str]
+
+
+def _compile_placeholder(expr: str):
+    path = expr.replace(' ', '')
+    root, _, attrs = path.partition('.')
+    # What's shown for a placeholder that can't be filled in
+    unfilled = '{' + expr + '}'
+
+    if root not in _ROOTS or not _ATTRIBUTE_PATH.match(path):
+        # Not something we know how to fill in
+        return lambda player, room: unfilled
+
+    get_attrs = operator.attrgetter(attrs) if attrs else (lambda obj: obj)
+    use_player = root == 'player'
+
+    def fill(player, room):
+        try:
+            return str(get_attrs(player if use_player else room))
+        except AttributeError:
+            return unfilled
+
+    return fill
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> Renderer:
+    """Compile text with `{{...}}` placeholders into a function of (player, room)
+
+    Args:
+        text (str): The template text
+
+    Returns:
+        Renderer: Function taking the player and their room, returning the filled in text
+    """
+    pieces = _PLACEHOLDER.split(text)
+
+    if len(pieces) == 1:
+        return lambda player, room: text
+
+    # Even pieces are literal text, odd ones are placeholder expressions
+    parts = [
+        piece if idx % 2 == 0 else _compile_placeholder(piece)
+        for idx, piece in enumerate(pieces)
+        if piece or idx % 2 == 1
+    ]
+
+    def render(player, room):
+        return ''.join(part if part.__class__ is str else part(player, room) for part in parts)
+
+    return render
+
+
+def fill(text: str, player, room) -> str:
+    """Fill in the `{{...}}` placeholders in some text
+
+    Args:
+        text (str): The template text
+        player (Player): Player to use for `{{player...}}`
+        room (GameRoom): Room to use for `{{room...}}`
+
+    Returns:
+        str: The filled in text
+    """
+    if '{{' not in text:
+        return text
+
+    return compile_template(text)(player, room)
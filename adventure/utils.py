@@ -1,3 +1,5 @@
+import functools
+import importlib
 import random
 import typing as typ
 
@@ -6,7 +8,149 @@ from .enums import Match
 
 import re
 
-from nltk.metrics.distance import jaro_winkler_similarity
+_MISSING = object()
+_OPTIONAL_MODULES = {}
+
+def optional_import(module_name: str):
+    """Import an optional dependency the first time it's actually needed
+
+    Args:
+        module_name (str): Absolute module name, i.e. "nameparser"
+
+    Returns:
+        module: The module, or None if it isn't installed
+    """
+    module = _OPTIONAL_MODULES.get(module_name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            module = None
+        _OPTIONAL_MODULES[module_name] = module
+    
+    return module
+
+def jaro_similarity(s1: str, s2: str) -> float:
+    """Jaro similarity between two strings, computed exactly as
+    `nltk.metrics.distance.jaro_similarity` does (without pulling in nltk)"""
+    len_s1, len_s2 = len(s1), len(s2)
+    match_bound = max(len_s1, len_s2) // 2 - 1
+    
+    matches = 0
+    transpositions = 0
+    flagged_1 = []
+    matched_2 = set()
+    
+    for i in range(len_s1):
+        upperbound = min(i + match_bound, len_s2 - 1)
+        lowerbound = max(0, i - match_bound)
+        for j in range(lowerbound, upperbound + 1):
+            if s1[i] == s2[j] and j not in matched_2:
+                matches += 1
+                flagged_1.append(i)
+                matched_2.add(j)
+                break
+    
+    flagged_2 = sorted(matched_2)
+    for i, j in zip(flagged_1, flagged_2):
+        if s1[i] != s2[j]:
+            transpositions += 1
+    
+    if matches == 0:
+        return 0.0
+    
+    return 1 / 3 * (matches / len_s1 + matches / len_s2 + (matches - transpositions // 2) / matches)
+
+def jaro_winkler_similarity(s1: str, s2: str, p: float = 0.1, max_l: int = 4) -> float:
+    """Jaro-Winkler similarity between two strings, computed exactly as
+    `nltk.metrics.distance.jaro_winkler_similarity` does"""
+    jaro_sim = jaro_similarity(s1, s2)
+    
+    l = 0
+    for s1_i, s2_i in zip(s1, s2):
+        if s1_i == s2_i:
+            l += 1
+        else:
+            break
+        if l == max_l:
+            break
+    
+    return jaro_sim + (l * p * (1 - jaro_sim))
+
+class PlayerName():
+    """Stand-in for `nameparser.HumanName` when nameparser isn't installed"""
+    def __init__(self, full_name: str):
+        self.full_name = full_name.strip()
+        
+        bits = self.full_name.split()
+        self.first = bits[0] if bits else ''
+        self.last = bits[-1] if len(bits) > 1 else ''
+        self.middle = ' '.join(bits[1:-1])
+    
+    def __str__(self):
+        return self.full_name
+    
+    def __repr__(self):
+        return f"<PlayerName: '{self.full_name}'>"
+
+def parse_name(full_name: str):
+    """Split a player's name into parts (`.first`, `.last`, ...), using nameparser if
+    it's installed"""
+    nameparser = optional_import('nameparser')
+    if nameparser is None:
+        return PlayerName(full_name)
+    
+    return nameparser.HumanName(full_name)
+
+class ItemSet():
+    """Insertion-ordered collection of the things in a container or room.
+
+    Backed by a dict, so membership tests, adding and removing are all O(1), while
+    iterating still gives things back in the order they were put in.  Most items
+    never hold anything, so the dict is only created once something is added.
+    """
+    __slots__ = ('_items',)
+
+    def __init__(self, items: typ.Iterable = ()):
+        self._items = dict.fromkeys(items) or None
+
+    def add(self, item) -> None:
+        if self._items is None:
+            self._items = {}
+        self._items[item] = None
+
+    # List-style spelling, for code written against plain lists
+    append = add
+
+    def remove(self, item) -> None:
+        if self._items is None or item not in self._items:
+            raise ValueError(f"{item} not in collection")
+        del self._items[item]
+
+    def discard(self, item) -> None:
+        if self._items is not None:
+            self._items.pop(item, None)
+
+    def clear(self) -> None:
+        self._items = None
+
+    def __contains__(self, item) -> bool:
+        return self._items is not None and item in self._items
+
+    def __iter__(self):
+        return iter(self._items or ())
+
+    def __reversed__(self):
+        return reversed(self._items or ())
+
+    def __len__(self) -> int:
+        return len(self._items) if self._items else 0
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __repr__(self):
+        return f"ItemSet({list(self)!r})"
 
 def select_one(items: typ.List[str]) -> str:
     if isinstance(items, str):
@@ -14,14 +158,20 @@ def select_one(items: typ.List[str]) -> str:
     
     return random.choice(items)
 
-def is_rough_match(text, name, thresh = 0.8):
-    
+@functools.lru_cache(maxsize=4096)
+def normalize_name(text: str) -> str:
+    """Lowercase a name and drop its stop words ("The Red Ball" -> "red ball")"""
     text = text.lower()
-    name = name.lower()
     
     for sw in STOP_WORDS:
         text = re.sub(' +', ' ', re.sub('(^| )' + sw + '($| )', ' ', text)).strip()
-        name = re.sub(' +', ' ', re.sub('(^| )' + sw + '($| )', ' ', name)).strip()
+    
+    return text
+
+def is_rough_match(text, name, thresh = 0.8):
+    
+    text = normalize_name(text)
+    name = normalize_name(name)
     
     if text == name:
         return Match.Full
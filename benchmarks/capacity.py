@@ -0,0 +1,81 @@
+"""Times `GameItem.has_room_for` deep inside a loaded pack, and moving things about.
+
+The pack holds a tray, on which sit 200 plates, each piled with fifty crumbs
+(half of them too small to take up room).  Neither the tray nor the plates are
+rigid, so whether a plate has room for one more crumb depends on everything in
+the pack.  That's asked against the kept totals and against adding it all up, and
+the two have to agree.  Then a plate is moved between tray and pack to time what
+keeping the totals costs, and the pack's total is checked against a fresh count.
+
+    python -m benchmarks.capacity --plates 1000 --per-plate 20
+"""
+import argparse
+import time
+
+from adventure.base import GameItem
+from adventure.objects import GameContainer
+
+
+def make_pack(n_plates: int, per_plate: int) -> GameContainer:
+    pack = GameContainer("a", "pack", capacity=n_plates * (per_plate + 1) + 10)
+    tray = GameItem("a", "tray", size=1)
+    pack.add(tray)
+    for idx in range(n_plates):
+        plate = GameItem("a", f"plate {idx}")
+        tray.add(plate)
+        for item_idx in range(per_plate):
+            plate.add(GameItem("a", f"crumb {item_idx}", size=0 if item_idx % 2 else 1))
+    return pack
+
+
+def footprint(item: GameItem) -> int:
+    if item.is_rigid:
+        return item.size
+    return item.size + sum(footprint(x) for x in item.items)
+
+
+def room_by_walking(container: GameItem, space: int) -> bool:
+    return sum(footprint(x) for x in container.items) + space <= container.capacity
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--plates', type=int, default=200)
+    parser.add_argument('--per-plate', type=int, default=50)
+    parser.add_argument('--checks', type=int, default=200)
+    args = parser.parse_args()
+
+    pack = make_pack(args.plates, args.per_plate)
+    tray = next(iter(pack.items))
+    plate = next(iter(tray.items))
+
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        before_fits = room_by_walking(pack, 1)
+    before = (time.perf_counter() - start) / args.checks
+
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        after_fits = plate.has_room_for(1)
+    after = (time.perf_counter() - start) / args.checks
+
+    assert before_fits == after_fits, "walking and the running totals disagree"
+    assert pack.used_space == sum(footprint(x) for x in pack.items), "running total is off"
+
+    # Moving a plate and all its crumbs in and out keeps the totals straight
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        pack.add(plate)
+        tray.add(plate)
+    moves = (time.perf_counter() - start) / args.checks / 2
+    assert pack.used_space == sum(footprint(x) for x in pack.items), "running total is off after moves"
+
+    n_things = args.plates * (args.per_plate + 1) + 1
+    print(f"Pack holding {n_things} things, {pack.used_space} of {pack.capacity} full")
+    print(f"  before (add it all up):           {before * 1e6:9.1f} us")
+    print(f"  after (running totals):           {after * 1e6:9.2f} us  ({before / after:.0f}x faster)")
+    print(f"  moving a loaded plate:            {moves * 1e6:9.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Bytes per item for a million empty items, traced with `tracemalloc`.
+
+Compares `GameItem` with `_UnslottedItem`, a stand-in with the attributes
+`GameItem` kept in its `__dict__` before the entity classes got `__slots__`.
+Only the items themselves are allocated while tracing, so the figure is the
+per-instance cost, including the empty `ItemSet` each item starts with.  Pass
+a smaller `--items` for a quick run; the per-item numbers barely move.
+"""
+import argparse
+import gc
+import tracemalloc
+
+from adventure import materials
+from adventure.base import GameItem
+
+
+class _UnslottedItem():
+    """Attribute layout of `GameItem` before it had `__slots__`"""
+    def __init__(self, article, name):
+        self.article = article
+        self.name = name
+        self.verb = "is"
+        self.location = None
+        self.is_scenery = False
+        self.material = materials.DEFAULT
+        self._combustible = None
+        self.size = 1
+        self.is_secret = False
+        self.include_items_in_description = True
+        self.items = []
+        self.currently_in = None
+        self.used_space = 0
+        self.capacity = 10000
+
+
+def _measure(make_item, n_items):
+    gc.collect()
+    tracemalloc.start()
+
+    items = [make_item("a", "thing") for _ in range(n_items)]
+
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del items
+    gc.collect()
+    return used / n_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000000)
+    args = parser.parse_args()
+
+    before = _measure(_UnslottedItem, args.items)
+    after = _measure(GameItem, args.items)
+
+    print(f"{args.items} items")
+    print(f"  before (__dict__): {before:7.1f} bytes/item")
+    print(f"  after (__slots__): {after:7.1f} bytes/item  ({100 * (1 - after / before):.0f}% smaller)")
+
+
+if __name__ == '__main__':
+    main()
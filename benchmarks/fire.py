@@ -0,0 +1,94 @@
+"""Times `Fire.tick` while a row of rooms burns down, lit from one wooden thing.
+
+Each room (200 by default) has a quarter of its things in wood, a wooden chest of
+drawers full of letters, a metal strongbox full of deeds, and an open stone door
+to the next room, so the fire walks the whole row, empties every chest on to the
+floor, and leaves the deeds.  The same mansion is burnt twice, once with every
+burning thing trying to spread each turn and once with `Fire` spreading only from
+what caught last turn, and the two have to leave the same things unburnt.
+
+Long `--burn-turns` are what make the first one slow: everything alight keeps
+looking around for the whole time it burns.
+
+    python -m benchmarks.fire --rooms 50 --burn-turns 200
+"""
+import argparse
+import time
+
+from adventure import materials
+from adventure.base import GameItem, GameRoom
+from adventure.fire import Fire
+from adventure.objects import Door, GameContainer
+from adventure.scheduler import Scheduler
+
+INERT = [materials.STONE, materials.GLASS, materials.METAL]
+
+
+class _EverythingSpreads(Fire):
+    """Fire where everything burning tries to spread every tick"""
+    def tick(self):
+        self._frontier = list(self._burns_out)
+        return super().tick()
+
+
+def make_mansion(n_rooms: int, per_room: int):
+    rooms = [GameRoom(f"room {idx}") for idx in range(n_rooms)]
+    for idx, room in enumerate(rooms):
+        for item_idx in range(per_room):
+            material = materials.WOOD if item_idx % 4 == 0 else INERT[item_idx % 3]
+            room.add(GameItem("a", f"thing {item_idx}", material=material), "about the place")
+
+        # Drawers full of letters, and strongboxes full of deeds
+        drawer = GameContainer("a", "chest of drawers", capacity=20, material=materials.WOOD)
+        strongbox = GameContainer("a", "strongbox", capacity=20, material=materials.METAL)
+        for _ in range(10):
+            drawer.add(GameItem("a", "letter", material=materials.PAPER))
+            strongbox.add(GameItem("a", "deed", material=materials.PAPER))
+        room.add(drawer, "against the wall")
+        room.add(strongbox, "under the bed")
+
+        if idx + 1 < n_rooms:
+            door = Door("a", "door", is_locked=False, material=materials.STONE)
+            door.is_closed = False
+            door.resolve({None: rooms[idx + 1]})
+            room.add(door, "to the north")
+
+    return rooms
+
+
+def burn_down(fire_cls, n_rooms: int, per_room: int, burn_turns: int):
+    rooms = make_mansion(n_rooms, per_room)
+    scheduler = Scheduler()
+    fire = fire_cls(scheduler, burn_turns=burn_turns)
+    fire.ignite(next(x for x in rooms[0].items if x.is_combustible))
+
+    start = time.perf_counter()
+    ticks = 0
+    while len(fire):
+        scheduler.tick()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+
+    left = sum(len(x.find_with(materials.COMBUSTIBLE)) for x in rooms)
+    return elapsed, ticks, left
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=200)
+    parser.add_argument('--per-room', type=int, default=200)
+    parser.add_argument('--burn-turns', type=int, default=50, help="how long a wooden mansion's beams burn for")
+    args = parser.parse_args()
+
+    before, ticks, before_left = burn_down(_EverythingSpreads, args.rooms, args.per_room, args.burn_turns)
+    after, _, after_left = burn_down(Fire, args.rooms, args.per_room, args.burn_turns)
+    assert before_left == after_left, "the two fires burnt different things"
+
+    print(f"{args.rooms} rooms of {args.per_room} things, burnt down in {ticks} turns "
+          f"({after_left} combustible things left, in strongboxes)")
+    print(f"  before (everything spreads):  {before * 1000 / ticks:8.2f} ms/turn")
+    print(f"  after (frontier spreads):     {after * 1000 / ticks:8.2f} ms/turn  ({before / after:.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Checks that importing the game stays cheap, with `python -X importtime`.
+
+Imports `adventure.loader` (or `--module`) in a few fresh interpreters and
+prints the median cumulative import time and the slowest individual imports.
+Exits with status 1 if the median is over `--budget-ms` (150 ms by default), or
+if nltk, nameparser or numpy got imported at all, since those are only meant to
+be loaded the first time something uses them.  That makes it usable as a CI step:
+
+    python -m benchmarks.import_time --runs 9
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# These should only ever be imported when they're actually used
+DEFERRED_MODULES = ('nltk', 'nameparser', 'numpy')
+
+
+def measure(module: str):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module', default='adventure.loader')
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.module][1] for run in runs) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms median over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("  slowest imports (self time):")
+    for name, (self_us, _) in sorted(runs[-1].items(), key=lambda x: -x[1][0])[:8]:
+        print(f"    {self_us / 1000:6.1f} ms  {name}")
+
+    eager = sorted({name for run in runs for name in run if name.split('.')[0] in DEFERRED_MODULES})
+    if eager:
+        print("FAIL: optional dependencies imported eagerly: " + ', '.join(eager))
+        sys.exit(1)
+
+    if total_ms > args.budget_ms:
+        print("FAIL: over budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
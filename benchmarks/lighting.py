@@ -0,0 +1,79 @@
+"""Times `GameRoom.is_lit` for a dark cellar, against searching it for a lit light.
+
+The command parser asks whether the player can see on every command, so this
+should stay a lookup however much is in the room.  The cellar is 500 crates of
+twenty glass bottles, and the only light is a lantern in the player's pockets,
+which the search finds last.  With the lantern put out the search has to look at
+every bottle before giving up, which is the number the speedup is quoted against.
+
+    python -m benchmarks.lighting --containers 2000 --checks 50
+"""
+import argparse
+import time
+
+from adventure import materials
+from adventure.base import GameItem, GameRoom, Player
+from adventure.objects import GameContainer, LightSource
+
+
+def make_cellar(n_containers: int, per_container: int) -> GameRoom:
+    cellar = GameRoom("a cellar", is_dark=True)
+    for idx in range(n_containers):
+        crate = GameContainer("a", f"crate {idx}", capacity=per_container)
+        for item_idx in range(per_container):
+            crate.add(GameItem("a", f"bottle {item_idx}", material=materials.GLASS))
+        cellar.add(crate, "stacked up")
+    return cellar
+
+
+def has_light(items) -> bool:
+    pending = [items]
+    while pending:
+        for item in pending.pop():
+            if getattr(item, 'is_lit', False):
+                return True
+            pending.append(item.items)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--containers', type=int, default=500)
+    parser.add_argument('--per-container', type=int, default=20)
+    parser.add_argument('--checks', type=int, default=200)
+    args = parser.parse_args()
+
+    cellar = make_cellar(args.containers, args.per_container)
+    player = Player()
+    lantern = LightSource("a", "lantern", is_lit=True)
+    player.inventory.add(lantern)
+    player.room = cellar
+
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        before_lit = not cellar.is_dark or has_light(cellar.items) or has_light(player.inventory.items)
+    before = (time.perf_counter() - start) / args.checks
+
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        after_lit = cellar.is_lit
+    after = (time.perf_counter() - start) / args.checks
+
+    assert before_lit == after_lit, "walking and counting disagree"
+
+    # The worst case for the walk: no light anywhere, so it looks at everything
+    lantern.is_lit = False
+    start = time.perf_counter()
+    for _ in range(args.checks):
+        has_light(cellar.items) or has_light(player.inventory.items)
+    unlit = (time.perf_counter() - start) / args.checks
+    assert not cellar.is_lit
+
+    n_things = args.containers * (args.per_container + 1)
+    print(f"Dark cellar of {n_things} things, lit by a lantern the player's carrying")
+    print(f"  before (walk for a light):        {before * 1e6:9.1f} us  ({unlit * 1e6:.1f} us with it out)")
+    print(f"  after (kept count):               {after * 1e6:9.3f} us  ({unlit / after:.0f}x faster with it out)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Times `GameRoom.find_with(materials.COMBUSTIBLE)` against walking every item.
+
+The room is a warehouse of metal crates (2,000 by default), each holding twenty
+bits of stone, glass and metal; a letter is dropped into five of them at random.
+Fire asks this question every turn, and the per-container property counts should
+let it open only the five crates with paper in, so the "after" column is the one
+to watch for regressions in how those counts are kept.  Both walks have to find
+the same letters or the run stops with an assertion.
+
+    python -m benchmarks.property_queries --containers 5000 --burnable 50
+"""
+import argparse
+import random
+import time
+
+from adventure import materials
+from adventure.base import GameItem, GameRoom
+from adventure.objects import GameContainer
+
+INERT = [materials.STONE, materials.GLASS, materials.METAL, materials.DEFAULT]
+
+
+def make_room(n_containers: int, per_container: int, n_burnable: int, rng: random.Random) -> GameRoom:
+    room = GameRoom("A warehouse")
+    boxes = []
+    for idx in range(n_containers):
+        box = GameContainer("a", f"crate {idx}", capacity=per_container * 2, material=materials.METAL)
+        for item_idx in range(per_container):
+            box.add(GameItem("a", f"thing {item_idx}", material=rng.choice(INERT)))
+        room.add(box, "in a row")
+        boxes.append(box)
+
+    for box in rng.sample(boxes, n_burnable):
+        box.add(GameItem("a", "letter", material=materials.PAPER))
+    return room
+
+
+def walk_everything(items, prop):
+    found = []
+    pending = [items]
+    while pending:
+        for item in pending.pop():
+            if item.properties & prop == prop:
+                found.append(item)
+            pending.append(item.items)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--containers', type=int, default=2000)
+    parser.add_argument('--per-container', type=int, default=20)
+    parser.add_argument('--burnable', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+
+    room = make_room(args.containers, args.per_container, args.burnable, random.Random(0))
+    prop = materials.COMBUSTIBLE
+
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        before_found = walk_everything(room.items, prop)
+    before = (time.perf_counter() - start) / args.queries
+
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        after_found = room.find_with(prop)
+    after = (time.perf_counter() - start) / args.queries
+
+    assert set(before_found) == set(after_found), "summarized and full walks found different things"
+
+    n_things = args.containers * (args.per_container + 1) + args.burnable
+    print(f"{n_things} things in {args.containers} containers, {len(after_found)} combustible")
+    print(f"  before (walk everything):   {before * 1000:8.2f} ms")
+    print(f"  after (skip by summary):    {after * 1000:8.2f} ms  ({before / after:.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
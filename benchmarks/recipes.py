@@ -0,0 +1,110 @@
+"""Times "what could I make out of this" against a book of 10,000 random recipes.
+
+Recipes use two to four of 500 made-up ingredients, half of them tied to a
+material.  The inventory is built out of three of the recipes plus random odds
+and ends, so something in it is always makeable.  Timed:
+
+ * `RecipeBook.possible` over the whole inventory,
+ * `RecipeBook.combining` for an exact set of three things,
+ * the brute force answer, checking every subset of the inventory (up to the
+   biggest recipe's size) against every recipe.  That takes minutes, so it's
+   timed on a `--sample` of the subsets and scaled up.
+
+The sampled subsets are also used to check the index gives the same answers.
+"""
+import argparse
+import itertools
+import random
+import time
+
+from adventure import materials
+from adventure.base import GameItem
+from adventure.recipes import Recipe, RecipeBook, _canonical, _item_key
+
+MATERIALS = ["DEFAULT", "METAL", "WOOD", "STONE", "GLASS"]
+
+
+def make_recipes(n_recipes: int, n_names: int, rng: random.Random):
+    for idx in range(n_recipes):
+        ingredients = []
+        for _ in range(rng.randint(2, 4)):
+            name = f"ingredient {rng.randrange(n_names)}"
+            if rng.random() < 0.5:
+                ingredients.append(name)
+            else:
+                ingredients.append((name, rng.choice(MATERIALS)))
+        yield Recipe(f"potion {idx}", ingredients, lambda: GameItem("a", "potion"))
+
+
+def subsets(items, biggest):
+    for size in range(2, biggest + 1):
+        yield from itertools.combinations(items, size)
+
+
+def brute_force(recipes, subset):
+    """Recipes made out of exactly `subset`, checking every recipe"""
+    # Every way of reading each thing as made of its material, or of anything
+    keys = [_item_key(x) for x in subset]
+    readings = {_canonical(x) for x in itertools.product(*[(k, (k[0], None)) for k in keys])}
+
+    return [x for x in recipes if x.ingredients in readings]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--names', type=int, default=500, help="distinct ingredient names")
+    parser.add_argument('--inventory', type=int, default=12)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--sample', type=int, default=20, help="subsets to time the brute force on")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    recipes = list(make_recipes(args.recipes, args.names, rng))
+
+    start = time.perf_counter()
+    book = RecipeBook()
+    for recipe in recipes:
+        book.add(recipe)
+    indexing = time.perf_counter() - start
+
+    # Inventory made of the ingredients of a few recipes, plus some odds and ends
+    items = []
+    for recipe in rng.sample(recipes, 3):
+        for (name, material), count in recipe.ingredients:
+            for _ in range(count):
+                items.append(GameItem("a", name, material=materials.by_name(material or "DEFAULT")))
+    while len(items) < args.inventory:
+        items.append(GameItem("a", f"ingredient {rng.randrange(args.names)}"))
+    items = items[:args.inventory]
+
+    start = time.perf_counter()
+    for _ in range(args.lookups):
+        possible = book.possible(items)
+    after = (time.perf_counter() - start) / args.lookups
+
+    start = time.perf_counter()
+    for _ in range(args.lookups):
+        book.combining(items[:3])
+    exact = (time.perf_counter() - start) / args.lookups
+
+    # Trying every subset takes minutes, so time a sample of them and scale up
+    every_subset = list(subsets(items, max(r.size for r in recipes)))
+    sample = rng.sample(every_subset, min(args.sample, len(every_subset)))
+    start = time.perf_counter()
+    for subset in sample:
+        brute_force(recipes, subset)
+    before = (time.perf_counter() - start) / len(sample) * len(every_subset)
+
+    for subset in sample:
+        assert set(brute_force(recipes, subset)) == set(book.combining(subset)), "indexed and brute force answers differ"
+
+    print(f"{args.recipes} recipes, {len(items)} things in the inventory, {len(possible)} makeable")
+    print(f"  indexing:                          {indexing * 1000:9.1f} ms")
+    print(f"  before (every subset x recipe):    {before * 1000:9.1f} ms  (estimated from {len(sample)} of {len(every_subset)} subsets)")
+    print(f"  after (indexed possible):          {after * 1000:9.3f} ms  ({before / after:.0f}x faster)")
+    print(f"  exact combination lookup:          {exact * 1e6:9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""How long `load_world` takes on a big world, with and without the compiled cache.
+
+Generates a ring of rooms (10,000 by default), each furnished with a candlestick,
+some nested place settings and a crate with a note in it, and a door on to the
+next room.  Timings are printed best of `--repeats`: building the world straight
+from the JSON, opening the cache (rooms stay pickled), and opening the cache and
+then using every room, which unpickles all of them.  That last one is timed both
+one room at a time and all at once.
+
+Unpickling a room costs nearly as much as building it, so the cache is a big win
+at startup and only a small one once every room is in use; if "every room" ever
+comes out slower than "parse + build", rooms are being unpickled one by one for
+too long (see `loader._LazyRooms`).
+
+    python -m benchmarks.world_loading --rooms 2000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from adventure import loader
+
+
+def make_world(n_rooms: int) -> dict:
+    rooms = {}
+    for idx in range(n_rooms):
+        rooms[f"ROOM_{idx}"] = {
+            "title": f"room number {idx}",
+            "description": f"A dusty room.  The plaque on the wall says {idx}.",
+            "objects": {
+                "on the table": [
+                    {"article": "a", "name": "candlestick", "material": "METAL"},
+                    {"article": "some", "name": "place settings", "is_scenery": True, "items": [
+                        {"article": "a", "name": "plate"},
+                        {"article": "a", "name": "wine glass", "material": "GLASS"},
+                    ]},
+                ],
+                "on the floor": [
+                    {"type": "container", "article": "a", "name": "crate", "capacity": 5,
+                     "material": "WOOD", "items": [{"article": "a", "name": "note", "material": "PAPER"}]},
+                ],
+                "to the north": [
+                    {"type": "door", "article": "a", "name": "door", "is_locked": False,
+                     "goes_to": f"ROOM_{(idx + 1) % n_rooms}"},
+                ],
+            }
+        }
+
+    return {"title": "Benchmark Manor", "starting_room": "ROOM_0", "rooms": rooms}
+
+
+def _time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'world.json')
+        with open(path, 'w') as f:
+            json.dump(make_world(args.rooms), f)
+
+        uncached = _time(lambda: loader.load_world(path, use_cache=False, register=False), args.repeats)
+
+        # First cached load writes the cache, later ones read it
+        loader.load_world(path, register=False)
+        cached = _time(lambda: loader.load_world(path, register=False), args.repeats)
+        # Rooms are unpickled on first use, so also time using every one of them, one
+        # at a time as players walk in, and all together
+        def one_by_one():
+            rooms = loader.load_world(path, register=False).rooms
+            for room_id in rooms:
+                rooms[room_id]
+        walked = _time(one_by_one, args.repeats)
+        everything = _time(lambda: list(loader.load_world(path, register=False).rooms.values()), args.repeats)
+
+        print(f"{args.rooms} rooms, world file {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"cache {os.path.getsize(loader.cache_path_for(path)) / 1e6:.1f} MB")
+        print(f"  parse + build: {uncached * 1000:8.1f} ms")
+        print(f"  cached load:   {cached * 1000:8.1f} ms  ({uncached / cached:.1f}x faster)")
+        print(f"  + every room:  {walked * 1000:8.1f} ms one at a time, {everything * 1000:.1f} ms all at once")
+
+
+if __name__ == '__main__':
+    main()
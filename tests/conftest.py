@@ -0,0 +1,53 @@
+import pytest
+
+from adventure import utils
+from adventure.base import GameRoom, Player
+from adventure.engine import GameDefinition, GameEngine, GameSession, UserInterface
+
+
+class RecordingInterface(UserInterface):
+    """Keeps everything the game shows, and answers every question with the default"""
+    def __init__(self):
+        self.writes = []
+
+    def display_text(self, text):
+        self.writes.append(text)
+
+    def get_selection(self, prompt, choice_list, default_index=0):
+        return default_index
+
+    def get_response(self, prompt=None, default=''):
+        return default
+
+
+@pytest.fixture
+def room():
+    room = GameRoom("a test room")
+    GameEngine.add_room("TEST_ROOM", room)
+    return room
+
+
+@pytest.fixture
+def session(room):
+    session = GameSession(GameEngine, GameDefinition("Test"), RecordingInterface())
+    player = Player(name=utils.PlayerName("Tess Ter"))
+    player.session = session
+    player.room = room
+    session.player = player
+    session.fire.player = player
+    return session
+
+
+@pytest.fixture
+def player(session):
+    return session.player
+
+
+@pytest.fixture
+def play(session):
+    """Play a turn, returning what the game said"""
+    def play(command):
+        session.play_turn(command)
+        session.flush_output()
+        return session.interface.writes.pop()
+    return play
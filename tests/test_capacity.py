@@ -0,0 +1,53 @@
+import pytest
+
+from adventure.base import GameItem
+from adventure.objects import GameContainer, ItemStack
+
+
+def _footprint(item):
+    if item.is_rigid:
+        return item.size
+    return item.size + sum(_footprint(x) for x in item.items)
+
+
+def _weight(item):
+    return item.weight + sum(_weight(x) for x in item.items)
+
+
+def test_what_is_piled_on_a_thing_takes_up_room_too():
+    pack = GameContainer("a", "pack", capacity=4)
+    plate = GameItem("a", "plate")
+    pack.add(plate)
+    plate.add(GameItem("a", "cake", size=2))
+
+    assert pack.used_space == 3
+    assert not plate.has_room_for(2)
+    with pytest.raises(ValueError):
+        plate.add(GameItem("a", "pie", size=2))
+
+
+def test_containers_are_the_same_size_full_or_empty():
+    pack = GameContainer("a", "pack", capacity=10)
+    box = GameContainer("a", "box", capacity=3)
+    pack.add(box)
+    box.add(GameItem("a", "brick", size=3, weight=7))
+
+    assert pack.used_space == 3
+    assert pack.total_weight() == _weight(pack) == box.weight + 7 + pack.weight
+
+
+def test_totals_follow_moves_and_stack_counts():
+    pack = GameContainer("a", "pack", capacity=20)
+    tray = GameItem("a", "tray")
+    pack.add(tray)
+    coins = ItemStack("coin", "coins", 3, unit_size=1, unit_weight=2)
+    tray.add(coins)
+    assert pack.used_space == _footprint(tray) == 4
+
+    coins.count = 5
+    assert pack.used_space == 6 and pack.total_weight() == _weight(pack)
+
+    pack.add(coins)
+    assert tray.used_space == 0
+    assert pack.used_space == sum(_footprint(x) for x in pack.items)
+    assert pack.total_weight() == _weight(pack)
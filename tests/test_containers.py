@@ -0,0 +1,40 @@
+from adventure.base import GameItem, GameRoom
+from adventure.objects import GameContainer
+
+
+def test_add_and_remove_keep_used_space():
+    box = GameContainer("a", "box", capacity=5)
+    apple, brick = GameItem("an", "apple"), GameItem("a", "brick", size=3)
+
+    box.add(apple)
+    box.add(brick)
+    box.add(apple)      # Already in there, so nothing changes
+    assert list(box.items) == [apple, brick]
+    assert box.used_space == 4
+
+    box.remove(apple)
+    assert list(box.items) == [brick] and apple.currently_in is None
+    assert box.used_space == 3
+
+
+def test_moving_between_containers_leaves_the_first():
+    first, second = GameContainer("a", "box", capacity=5), GameContainer("a", "bag", capacity=5)
+    apple = GameItem("an", "apple")
+    first.add(apple)
+
+    second.add(apple)
+    assert apple not in first.items and first.used_space == 0
+    assert apple in second.items and second.used_space == 1
+
+
+def test_deleting_a_container_deletes_what_is_in_it():
+    room = GameRoom("a room")
+    inner = GameContainer("a", "tin", capacity=2, items=[GameItem("a", "button")])
+    box = GameContainer("a", "box", capacity=5, items=[GameItem("an", "apple"), inner])
+    room.add(box, "on the table")
+
+    box.delete()
+
+    assert list(room.items) == []
+    assert list(box.items) == [] and box.used_space == 0
+    assert list(inner.items) == [] and inner.currently_in is None
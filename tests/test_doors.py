@@ -0,0 +1,48 @@
+import copy
+import pickle
+
+from adventure.base import GameRoom
+from adventure.engine import GameEngine
+from adventure.objects import Door
+
+
+class PaintedDoor(Door):
+    # No __slots__, so it gets a __dict__
+    def __init__(self, *args, colour="red", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.colour = colour
+
+
+def test_door_pickles_slots_and_dict(room):
+    GameEngine.add_room("TEST_HALL", GameRoom("a hall"))
+    door = PaintedDoor("a", "door", is_locked=False, goes_to="TEST_HALL", colour="blue")
+    room.add(door, "to the north")
+    assert door.goes_to is not None
+
+    copied = pickle.loads(pickle.dumps(door, protocol=pickle.HIGHEST_PROTOCOL))
+
+    assert copied.colour == "blue"
+    assert copied.goes_to_id == "TEST_HALL"
+    assert copied.location == "to the north"
+    assert not copied.is_locked and copied.is_closed
+    # Where it goes is looked up again rather than pickled along with it
+    assert copied._target is None
+    assert copied.goes_to is GameEngine.get_room("TEST_HALL")
+
+
+def test_door_state_leaves_out_target(room):
+    GameEngine.add_room("TEST_HALL", GameRoom("a hall"))
+    door = Door("a", "door", goes_to="TEST_HALL")
+    door.goes_to
+    state = door.__getstate__()
+
+    assert '_target' not in state
+    assert state['_goes_to'] == "TEST_HALL"
+    assert copy.deepcopy(door).goes_to_id == "TEST_HALL"
+
+
+def test_opening_door_to_nowhere(room, play):
+    room.add(Door("a", "door", is_locked=False), "to the north")
+
+    assert play("open door") == "You opened it.  Through the door you see ...nothing"
+    assert "leads nowhere" in play("enter door")
@@ -0,0 +1,63 @@
+from adventure import materials
+from adventure.base import GameItem, GameRoom
+from adventure.fire import Fire
+from adventure.objects import GameContainer
+from adventure.scheduler import Scheduler
+
+
+def _burn_out(fire):
+    for _ in range(fire.burn_turns + 1):
+        fire.scheduler.tick()
+
+
+def test_fire_spreads_to_what_is_beside_it_and_not_past_stone():
+    room = GameRoom("a study")
+    letter = GameItem("a", "letter", material=materials.PAPER)
+    book = GameItem("a", "book", material=materials.PAPER)
+    rock = GameItem("a", "rock", material=materials.STONE)
+    for item in (letter, book, rock):
+        room.add(item, "on the desk")
+    fire = Fire(Scheduler())
+
+    assert fire.ignite(letter)
+    assert not fire.ignite(rock)
+    fire.scheduler.tick()
+    assert fire.is_burning(book)
+
+    _burn_out(fire)
+    assert list(room.items) == [rock]
+    assert len(fire) == 0
+
+
+def test_burnt_containers_leave_their_contents_where_they_were():
+    pockets = GameContainer("some", "pockets", capacity=3)
+    coin = GameItem("a", "coin", material=materials.METAL, size=2)
+    bag = GameItem("a", "paper bag", material=materials.PAPER, items=[coin])
+    pockets.add(bag)
+    assert pockets.used_space == 3
+    fire = Fire(Scheduler())
+
+    fire.ignite(bag)
+    _burn_out(fire)
+
+    # The coin had room in the pockets all along, since it was already in them
+    assert list(pockets.items) == [coin] and coin.currently_in is pockets
+    assert pockets.used_space == sum(x.total_size() for x in pockets.items)
+    assert pockets.total_weight() == pockets.weight + sum(x.total_weight() for x in pockets.items)
+
+
+def test_contents_get_the_room_the_burnt_container_leaves():
+    room = GameRoom("a study")
+    crate = GameContainer("a", "crate", capacity=2, material=materials.METAL)
+    room.add(crate, "in the corner")
+    coin = GameItem("a", "coin", material=materials.METAL, size=2)
+    box = GameContainer("a", "box", capacity=2, material=materials.PAPER, items=[coin])
+    crate.add(box)
+    fire = Fire(Scheduler())
+
+    fire.ignite(box)
+    _burn_out(fire)
+
+    assert list(crate.items) == [coin]
+    assert crate.used_space == 2
+
@@ -0,0 +1,87 @@
+import http.client
+import json
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from adventure.http_interface import GameServer
+from adventure.loader import load_world
+
+WORLD_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worlds", "demo.json")
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / "demo.json"
+    shutil.copy(WORLD_FILE, path)
+    game = load_world(str(path), use_cache=False).definition
+
+    server = GameServer(("127.0.0.1", 0), game)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def call(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+
+    def call(method, path, body=None):
+        conn.request(method, path, body=None if body is None else json.dumps(body),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield call
+    conn.close()
+
+
+def _collect(call, session):
+    output = []
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        status, body = call("GET", f"/sessions/{session}/output?wait=1")
+        assert status == 200
+        output += body["output"]
+        if body["finished"]:
+            return output
+    raise AssertionError("game never finished")
+
+
+def test_play_over_keep_alive_connection(server, call):
+    status, body = call("POST", "/sessions", {"name": "Tess Ter"})
+    assert status == 201
+    session = body["session"]
+
+    assert call("POST", f"/sessions/{session}/commands", {"commands": ["look around", "quit", "yes"]}) == (202, {"queued": 3})
+    output = _collect(call, session)
+
+    assert any("Thanks for playing" in x for x in output)
+
+
+def test_finished_session_is_dropped(server, call):
+    _, body = call("POST", "/sessions", {"name": "Tess Ter"})
+    session = body["session"]
+    call("POST", f"/sessions/{session}/commands", {"commands": ["quit", "yes"]})
+
+    deadline = time.monotonic() + 10
+    while session in server.sessions and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert session not in server.sessions
+
+    # Game's over, but what it said can still be picked up
+    status, body = call("POST", f"/sessions/{session}/commands", {"command": "look"})
+    assert status == 410
+    _collect(call, session)
+
+    assert session not in server.finished
+    assert call("GET", f"/sessions/{session}/output")[0] == 404
+
+
+def test_handler_sends_without_delay():
+    from adventure.http_interface import _GameRequestHandler
+    assert _GameRequestHandler.disable_nagle_algorithm
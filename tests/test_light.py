@@ -0,0 +1,54 @@
+from adventure import phrasing
+from adventure.base import GameItem, GameRoom
+from adventure.engine import GameEngine
+from adventure.objects import Door, GameContainer, LightSource
+
+
+def test_dark_room_shows_nothing_but_the_way_out(room, player, play):
+    room.is_dark = True
+    room.add(GameItem("a", "vase"), "on a plinth")
+    GameEngine.add_room("LIGHT_HALL", GameRoom("a hall"))
+    room.add(Door("a", "door", is_locked=False, goes_to="LIGHT_HALL"), "to the north")
+
+    assert play("look") in phrasing._DARK_ROOM
+    assert "didn't make much sense" in play("look at vase")
+    assert "opened" in play("open door")
+
+
+def test_lighting_a_carried_lamp_lights_the_room(room, player, play):
+    room.is_dark = True
+    room.add(GameItem("a", "vase"), "on a plinth")
+    player.inventory.add(LightSource("a", "lantern"))
+    assert not room.is_lit
+
+    assert "You can see again!" in play("light lantern")
+    assert room.is_lit and "vase" in play("look")
+
+    play("extinguish lantern")
+    assert not room.is_lit
+
+
+def test_a_light_lights_whichever_room_its_carrier_is_in(room, player):
+    cellar = GameRoom("a cellar", is_dark=True)
+    GameEngine.add_room("LIGHT_CELLAR", cellar)
+    player.inventory.add(LightSource("a", "lantern", is_lit=True))
+    assert not cellar.is_lit
+
+    player.room = cellar
+    assert cellar.is_lit
+
+    player.room = room
+    assert not cellar.is_lit
+
+
+def test_a_light_in_a_box_still_counts():
+    cellar = GameRoom("a cellar", is_dark=True)
+    crate = GameContainer("a", "crate", capacity=5)
+    cellar.add(crate, "in the corner")
+    candle = LightSource("a", "candle", is_lit=True)
+
+    crate.add(candle)
+    assert cellar.is_lit
+
+    candle.is_lit = False
+    assert not cellar.is_lit
@@ -0,0 +1,64 @@
+import pytest
+
+from adventure import listing, materials, phrasing
+from adventure.base import GameItem, GameRoom
+from adventure.constants import LISTING_LIMIT
+from adventure.objects import LightSource
+
+
+@pytest.mark.parametrize("descs, expected", [
+    ([], "Nothing"),
+    (["a"], "a"),
+    (["a", "b"], "a and b"),
+    (["a", "b", "c"], "a, b, and c"),
+    (["a", "b", "c", "d"], "a, b, c, and d"),
+])
+def test_natural_list(descs, expected):
+    assert listing.natural_list(iter(descs)) == expected
+
+
+@pytest.mark.parametrize("desc, expected", [
+    ("a plate", "plates"),
+    ("a bit of string", "bits of string"),
+    ("a box", "boxes"),
+    ("a berry", "berries"),
+    ("a key", "keys"),
+    ("a knife", "knives"),
+    ("a shelf", "shelves"),
+    ("some lint", None),
+])
+def test_pluralize(desc, expected):
+    assert listing.pluralize(desc) == expected
+
+
+def test_summarize_collapses_and_limits():
+    descs = ["a plate"] * 3 + ["a cup", "some lint", "some lint"]
+    assert list(listing.summarize(descs)) == ["3 plates", "a cup", "some lint (x2)"]
+    assert list(listing.summarize(descs, limit=1)) == ["3 plates", "3 other things"]
+    assert list(listing.summarize(descs, limit=1, collapse=False)) == ["a plate", "5 other things"]
+
+
+def test_repeats_past_the_limit_are_counted_with_what_they_repeat():
+    descs = ["a plate", "a cup", "a plate", "a bowl", "a plate"]
+    assert list(listing.summarize(descs, limit=2)) == ["3 plates", "a cup", "1 other thing"]
+
+
+def test_only_the_name_is_made_plural():
+    items = [GameItem("a", "plate", items=[GameItem("a", "cobweb")]) for _ in range(2)]
+    items += [LightSource("a", "candle", is_lit=True) for _ in range(2)]
+    items += [GameItem("a", "knife", material=materials.METAL) for _ in range(2)]
+
+    assert list(phrasing.summarize_items(items)) == [
+        "a plate with a cobweb (x2)", "a candle (lit) (x2)", "2 metal knives"
+    ]
+
+
+def test_room_lists_a_crowd_of_things_bounded():
+    room = GameRoom("a pantry")
+    for idx in range(LISTING_LIMIT + 5):
+        room.add(GameItem("a", f"jar {idx}"), "on the shelves")
+        room.add(GameItem("a", "spoon"), "on the shelves")
+
+    text = phrasing.describe_items(list(room.items))
+    assert f"{LISTING_LIMIT + 5} spoons" in text
+    assert "6 other things" in text
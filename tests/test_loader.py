@@ -0,0 +1,86 @@
+import io
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+from adventure import loader
+
+WORLD_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worlds", "demo.json")
+
+
+@pytest.fixture
+def world_file(tmp_path):
+    path = tmp_path / "demo.json"
+    shutil.copy(WORLD_FILE, path)
+    return str(path)
+
+
+def _modules_pickled(obj):
+    """The adventure modules whose classes show up in a pickle of `obj`"""
+    found = set()
+
+    class _Recorder(pickle.Pickler):
+        def reducer_override(self, value):
+            module = getattr(type(value), '__module__', '')
+            if module.startswith('adventure.'):
+                found.add(module.split('.', 1)[1])
+            return NotImplemented
+
+    _Recorder(io.BytesIO(), protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return found
+
+
+def test_cache_key_covers_pickled_modules(world_file):
+    world = loader.load_world(world_file, use_cache=False, register=False)
+
+    pickled = set()
+    for room in world.rooms.values():
+        pickled |= _modules_pickled(room)
+    pickled |= _modules_pickled((world.definition, world.recipes))
+
+    assert 'utils' in pickled
+    assert pickled <= set(loader._CODE_MODULES)
+
+
+def test_cached_world_matches_source(world_file):
+    fresh = loader.load_world(world_file, register=False)
+    assert os.path.exists(loader.cache_path_for(world_file))
+
+    cached = loader.load_world(world_file, register=False)
+    assert isinstance(cached.rooms, loader._LazyRooms)
+    assert sorted(cached.rooms) == sorted(fresh.rooms)
+    for room_id, room in fresh.rooms.items():
+        assert [x.short_description for x in cached.rooms[room_id].items] == [x.short_description for x in room.items]
+
+
+def _ring(tmp_path, n_rooms):
+    rooms = {
+        f"ROOM_{idx}": {"title": f"room {idx}", "objects": {"on the floor": [{"article": "a", "name": "rug"}]}}
+        for idx in range(n_rooms)
+    }
+    path = tmp_path / "ring.json"
+    path.write_text(json.dumps({"title": "Ring", "rooms": rooms}))
+    loader.load_world(str(path), register=False)
+    return loader.load_world(str(path), register=False).rooms
+
+
+def test_cached_rooms_load_one_at_a_time_then_all_together(tmp_path):
+    rooms = _ring(tmp_path, 10)
+    assert isinstance(rooms, loader._LazyRooms)
+
+    for idx in range(5):
+        assert rooms[f"ROOM_{idx}"].name == f"room {idx}"
+    assert len(rooms._rooms) == 5
+
+    rooms["ROOM_5"]
+    assert len(rooms._rooms) == 10
+    assert [x.name for x in rooms.values()] == [f"room {idx}" for idx in range(10)]
+
+
+def test_asking_for_every_room_loads_them_together(tmp_path):
+    rooms = _ring(tmp_path, 10)
+    assert [x.name for x in rooms.values()] == [f"room {idx}" for idx in range(10)]
+    assert len(rooms._rooms) == 10
@@ -0,0 +1,53 @@
+from adventure import materials
+from adventure.base import GameItem
+from adventure.objects import LightSource
+
+
+def _table_setting(room):
+    cake = GameItem("a", "cake")
+    plate = GameItem("a", "plate", items=[cake])
+    table = GameItem("a", "table", items=[plate])
+    room.add(table, "in the middle")
+    return table, plate, cake
+
+
+def test_renaming_something_two_levels_down_shows_on_the_next_look(room, play):
+    table, plate, cake = _table_setting(room)
+    assert "a cake" in play("look")
+
+    cake.name = "pie"
+    text = play("look")
+    assert "a pie" in text and "cake" not in text
+
+
+def test_moving_something_two_levels_down_shows_on_the_next_look(room, player, play):
+    table, plate, cake = _table_setting(room)
+    assert "a cake" in play("look")
+
+    plate.remove(cake)
+    assert "cake" not in play("look")
+
+    plate.add(cake)
+    assert "a cake" in play("look")
+
+
+def test_lighting_or_changing_something_two_levels_down_shows_on_the_next_look(room, play):
+    table, plate, cake = _table_setting(room)
+    candle = LightSource("a", "candle")
+    plate.add(candle)
+    assert "(lit)" not in play("look")
+
+    candle.is_lit = True
+    assert "a candle (lit)" in play("look")
+
+    cake.material = materials.STONE
+    assert "a stone cake" in play("look")
+
+
+def test_look_is_cached_while_nothing_changes(room, play):
+    _table_setting(room)
+    play("look")
+    cached = room._look_cache
+
+    play("look")
+    assert room._look_cache is cached
@@ -0,0 +1,66 @@
+import pytest
+
+from adventure import utils
+from adventure.base import GameItem, GameRoom, Player
+from adventure.engine import GameDefinition, GameEngine, GameSession
+from adventure.npcs import NpcRoster
+from adventure.objects import Door
+
+from conftest import RecordingInterface
+
+
+@pytest.fixture
+def house():
+    rooms = {}
+    for room_id, other in (("NPC_KITCHEN", "NPC_PANTRY"), ("NPC_PANTRY", "NPC_KITCHEN")):
+        room = rooms[room_id] = GameRoom(room_id.lower())
+        room.add(Door("a", "door", is_locked=False, goes_to=other), "to the side")
+        GameEngine.add_room(room_id, room)
+    return rooms
+
+
+def _player(roster, room):
+    session = GameSession(GameEngine, GameDefinition("Test"), RecordingInterface())
+    player = Player(name=utils.PlayerName("Tess Ter"))
+    player.session = session
+    player.room = room
+    roster.watch(player)
+    return player
+
+
+def test_clock_moves_once_per_turn_however_many_players(house):
+    roster = NpcRoster(GameEngine)
+    players = [_player(roster, house["NPC_KITCHEN"]) for _ in range(3)]
+
+    for _ in range(4):
+        for player in players:
+            player.session.scheduler.tick()
+
+    assert roster.turn == 4
+
+
+def test_late_joiner_moves_the_clock_on_by_themselves(house):
+    roster = NpcRoster(GameEngine)
+    first = _player(roster, house["NPC_KITCHEN"])
+    for _ in range(5):
+        first.session.scheduler.tick()
+
+    second = _player(roster, house["NPC_PANTRY"])
+    second.session.scheduler.tick()
+    assert roster.turn == 6
+
+    first.session.scheduler.tick()
+    assert roster.turn == 6
+
+
+def test_greedy_npc_leaves_what_it_cannot_carry(house):
+    roster = NpcRoster(GameEngine)
+    kitchen = house["NPC_KITCHEN"]
+    kitchen.add(GameItem("a", "piano", size=20000), "in the corner")
+    npc = roster.add("the magpie", "NPC_KITCHEN", restlessness=1, greedy=True)
+    player = _player(roster, kitchen)
+
+    player.session.scheduler.tick()
+
+    assert not npc.belongings.items
+    assert npc.room is house["NPC_PANTRY"]
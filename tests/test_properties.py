@@ -0,0 +1,54 @@
+from adventure import materials
+from adventure.base import GameItem, GameRoom
+from adventure.objects import GameContainer
+from adventure.store import EntityStore
+
+
+def _crate(*items):
+    return GameContainer("a", "crate", capacity=10, material=materials.METAL, items=list(items))
+
+
+def test_find_with_sees_through_nested_containers():
+    letter = GameItem("a", "letter", material=materials.PAPER)
+    room = GameRoom("a warehouse")
+    room.add(_crate(GameItem("a", "rock", material=materials.STONE), _crate(letter)), "in a row")
+    room.add(_crate(GameItem("a", "bottle", material=materials.GLASS)), "in a row")
+
+    assert room.find_with(materials.COMBUSTIBLE) == [letter]
+    assert room.find_with(materials.COMBUSTIBLE | materials.FRAGILE) == []
+
+
+def test_summaries_follow_things_in_and_out():
+    outer, inner = _crate(), _crate()
+    outer.add(inner)
+    letter = GameItem("a", "letter", material=materials.PAPER)
+
+    inner.add(letter)
+    assert outer.nested_properties & materials.COMBUSTIBLE
+    assert outer.find_with(materials.COMBUSTIBLE) == [letter]
+
+    inner.remove(letter)
+    assert not outer.nested_properties & materials.COMBUSTIBLE
+    assert outer.find_with(materials.COMBUSTIBLE) == []
+
+
+def test_summaries_follow_material_changes():
+    rock = GameItem("a", "rock", material=materials.STONE)
+    crate = _crate(rock)
+    assert crate.find_with(materials.COMBUSTIBLE) == []
+
+    rock.material = materials.WOOD
+    assert crate.find_with(materials.COMBUSTIBLE) == [rock]
+
+    rock.material = materials.METAL
+    assert crate.find_with(materials.COMBUSTIBLE) == []
+
+
+def test_stored_rooms_are_always_looked_through():
+    room = GameRoom("a warehouse")
+    room.add(GameItem("a", "sack", material=materials.STONE, items=[
+        GameItem("a", "letter", material=materials.PAPER)
+    ]), "on the floor")
+    _, views = EntityStore.from_rooms({"WAREHOUSE": room})
+
+    assert [x.name for x in views["WAREHOUSE"].find_with(materials.COMBUSTIBLE)] == ["letter"]
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+from adventure import materials
+from adventure.base import GameItem
+from adventure.loader import WorldFormatError, build_world, load_world
+from adventure.objects import GameContainer
+from adventure.recipes import RECIPES, Recipe, RecipeBook
+
+WORLD_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worlds", "demo.json")
+
+
+def _makes(name):
+    return lambda: GameItem("a", name)
+
+
+def test_ingredient_materials_use_constant_names():
+    book = RecipeBook()
+    torch = book.add(Recipe("a torch", ["stick", ("rag", "RUSTY_TIN")], _makes("torch")))
+
+    stick = GameItem("a", "stick")
+    assert book.combining([stick, GameItem("a", "rag", material=materials.RUSTY_TIN)]) == [torch]
+    assert book.combining([stick, GameItem("a", "rag", material=materials.METAL)]) == []
+
+
+def test_materials_with_the_same_display_name_are_told_apart():
+    book = RecipeBook()
+    bell = book.add(Recipe("a bell", ["clapper", ("cup", materials.METAL)], _makes("bell")))
+
+    brittle = GameItem("a", "cup", material=materials.BRITTLE_METAL)
+    assert brittle.material.name == materials.METAL.name
+    assert book.combining([GameItem("a", "clapper"), brittle]) == []
+    assert book.combining([GameItem("a", "clapper"), GameItem("a", "cup", material=materials.METAL)]) == [bell]
+
+
+def test_unknown_ingredient_material_is_a_format_error():
+    with pytest.raises(KeyError):
+        Recipe("a thing", [("stick", "UNOBTAINIUM")], _makes("thing"))
+
+    data = {"title": "T", "rooms": {}, "recipes": [
+        {"name": "a thing", "ingredients": [["stick", "UNOBTAINIUM"]], "makes": {"article": "a", "name": "thing"}}
+    ]}
+    with pytest.raises(WorldFormatError):
+        build_world(data)
+
+
+def test_adding_the_same_recipe_twice_keeps_one(tmp_path):
+    path = tmp_path / "demo.json"
+    shutil.copy(WORLD_FILE, path)
+
+    load_world(str(path), use_cache=False)
+    after_first = len(RECIPES)
+    load_world(str(path), use_cache=False)
+
+    assert len(RECIPES) == after_first
+    assert [x.name for x in RECIPES.possible([GameItem("a", "paperclip"), GameItem("a", "bit of string")])] == ["a lockpick"]
+
+
+def test_combine_reaches_into_open_containers(room, player, play):
+    player.inventory.add(GameItem("a", "paperclip", size=0))
+    room.add(GameContainer("a", "box", capacity=5, items=[GameItem("a", "bit of string")]), "on the floor")
+
+    assert "lockpick" in play("combine paperclip and bit of string")
+    assert [x.name for x in player.inventory.items] == ["lockpick"]
+
+
+def test_combine_cannot_use_what_it_cannot_see(room, player, play):
+    room.is_dark = True
+    player.inventory.add(GameItem("a", "paperclip", size=0))
+    room.add(GameItem("a", "bit of string"), "on the floor")
+
+    assert play("combine paperclip and bit of string") == "You don't see any bit of string here."
+
+
+def test_split_mixes_plain_and_material_ingredients_with_the_same_name():
+    book = RecipeBook()
+    club = book.add(Recipe("a club", ["stick", ("stick", "WOOD")], _makes("club")))
+    wand = book.add(Recipe("a wand", [("stick", "WOOD"), "star"], _makes("wand")))
+
+    # Made of something that isn't predefined, so its key has no material at all
+    driftwood = materials.Material("driftwood", combustible=True)
+    sticks = [GameItem("a", "stick", material=driftwood), GameItem("a", "stick", material=materials.WOOD),
+              GameItem("a", "stick", material=materials.WOOD)]
+    plan = book.split(sticks + [GameItem("a", "star")])
+
+    assert sorted(recipe.name for recipe, _ in plan) == ["a club", "a wand"]
+    used = [thing for _, things in plan for thing in things]
+    assert len(used) == 4 and len(set(map(id, used))) == 4
+    assert book.split(sticks[:1]) is None
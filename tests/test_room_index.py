@@ -0,0 +1,56 @@
+from adventure.base import GameItem, GameRoom
+
+
+def _groups(room):
+    return ({loc: list(grp) for loc, grp in room._item_groups.items()},
+            {loc: list(grp) for loc, grp in room._scenery_groups.items()})
+
+
+def test_added_things_are_bucketed_by_location_and_kind():
+    room = GameRoom("a kitchen")
+    cup, jug = GameItem("a", "cup"), GameItem("a", "jug")
+    sink = GameItem("a", "sink", is_scenery=True)
+    room.add(cup, "on the counter")
+    room.add(jug, "on the counter")
+    room.add(sink, "under the window")
+
+    assert _groups(room) == ({"on the counter": [cup, jug]}, {"under the window": [sink]})
+
+
+def test_removing_the_last_thing_drops_its_bucket():
+    room = GameRoom("a kitchen")
+    cup = GameItem("a", "cup")
+    room.add(cup, "on the counter")
+
+    room.remove(cup)
+    assert _groups(room) == ({}, {})
+
+
+def test_moving_between_locations_moves_buckets():
+    room = GameRoom("a kitchen")
+    cup, jug = GameItem("a", "cup"), GameItem("a", "jug")
+    room.add(cup, "on the counter")
+    room.add(jug, "on the counter")
+
+    room.add(cup, "in the sink")
+    assert _groups(room)[0] == {"on the counter": [jug], "in the sink": [cup]}
+
+    jug.location = "in the sink"
+    assert _groups(room)[0] == {"in the sink": [cup, jug]}
+    assert list(room._beside(jug, "in the sink")) == [cup, jug]
+
+
+def test_secret_things_stay_out_of_the_visible_buckets():
+    room = GameRoom("a kitchen")
+    key = GameItem("a", "key", is_secret=True)
+    cup = GameItem("a", "cup")
+    room.add(key, "under the mat")
+    room.add(cup, "under the mat")
+    assert _groups(room)[0] == {"under the mat": [cup]}
+    assert list(room._beside(key, "under the mat")) == [key]
+
+    key.is_secret = False
+    assert _groups(room)[0] == {"under the mat": [cup, key]}
+
+    cup.is_secret = True
+    assert _groups(room)[0] == {"under the mat": [key]}
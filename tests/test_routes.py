@@ -0,0 +1,47 @@
+from adventure.base import GameRoom
+from adventure.engine import GameEngine
+from adventure.objects import Door
+
+
+def _rooms(*ids):
+    rooms = [GameRoom(f"room {x}") for x in ids]
+    for room_id, room in zip(ids, rooms):
+        GameEngine.add_room(room_id, room)
+    return rooms
+
+
+def test_route_appears_when_a_door_is_added():
+    hall, library = _rooms("ROUTE_HALL", "ROUTE_LIBRARY")
+    assert GameEngine.find_route(hall, library) is None
+
+    door = Door("a", "door", is_locked=False, goes_to="ROUTE_LIBRARY")
+    hall.add(door, "to the west")
+
+    assert GameEngine.find_route(hall, library) == [door]
+
+
+def test_route_goes_when_the_door_is_taken(player):
+    hall, study, attic = _rooms("ROUTE_HALL", "ROUTE_STUDY", "ROUTE_ATTIC")
+    stairs = Door("some", "stairs", is_locked=False, goes_to="ROUTE_STUDY")
+    ladder = Door("a", "ladder", is_locked=False, goes_to="ROUTE_ATTIC")
+    hall.add(stairs, "up")
+    study.add(ladder, "up")
+    assert GameEngine.find_route(hall, attic) == [stairs, ladder]
+
+    player.inventory.capacity = 10
+    player.inventory.add(ladder)
+
+    assert GameEngine.find_route(hall, attic) is None
+
+
+def test_npcs_stop_using_a_removed_door():
+    hall, garden = _rooms("ROUTE_HALL", "ROUTE_GARDEN")
+    door = Door("a", "door", is_locked=False, goes_to="ROUTE_GARDEN")
+    hall.add(door, "to the south")
+
+    npcs = GameEngine.npcs
+    hall_idx = npcs._room_idx("ROUTE_HALL")
+    assert npcs._neighbours_of(hall_idx) == [npcs._room_idx("ROUTE_GARDEN")]
+
+    hall.remove(door)
+    assert npcs._neighbours_of(hall_idx) == []
@@ -0,0 +1,71 @@
+from adventure.scheduler import Scheduler
+
+
+def test_turn_events_run_in_order_when_due():
+    scheduler = Scheduler()
+    scheduler.after_turns(2, lambda: "second")
+    scheduler.after_turns(1, lambda: "first")
+    scheduler.after_turns(2, lambda: "also second")
+
+    assert scheduler.tick() == ["first"]
+    assert scheduler.tick() == ["second", "also second"]
+    assert scheduler.tick() == []
+    assert len(scheduler) == 0
+
+
+def test_repeating_events_run_once_per_tick_until_cancelled():
+    scheduler = Scheduler()
+    ticks = []
+    event = scheduler.after_turns(1, ticks.append, "tick", every=1)
+
+    for _ in range(3):
+        scheduler.tick()
+    event.cancel()
+    scheduler.tick()
+
+    assert ticks == ["tick"] * 3
+    assert len(scheduler) == 0
+
+
+def test_a_repeating_timer_that_fell_behind_only_runs_once():
+    now = [0.0]
+    scheduler = Scheduler(clock=lambda: now[0])
+    ticks = []
+    scheduler.after_seconds(1, ticks.append, "tick", every=1)
+
+    now[0] = 10.0
+    scheduler.tick()
+    scheduler.tick()
+    now[0] = 11.0
+    scheduler.tick()
+
+    assert ticks == ["tick", "tick"]
+
+
+def test_lots_of_cancelled_events_are_thrown_away():
+    scheduler = Scheduler()
+    events = [scheduler.after_turns(5, lambda: "boom") for _ in range(200)]
+    for event in events[1:]:
+        event.cancel()
+        event.cancel()
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heaps['turns']) < 100
+    for _ in range(5):
+        results = scheduler.tick()
+    assert results == ["boom"]
+
+
+def test_cancelling_a_repeating_event_that_already_ran_this_tick():
+    scheduler = Scheduler()
+    ticks = []
+    repeating = scheduler.after_turns(1, ticks.append, "tick", every=1)
+    scheduler.after_turns(1, repeating.cancel)
+
+    scheduler.tick()
+    assert len(scheduler) == 0
+
+    scheduler.after_turns(1, lambda: "later")
+    assert scheduler.tick() == ["later"]
+    assert ticks == ["tick"] and len(scheduler) == 0
+    assert scheduler._cancelled == 0
@@ -0,0 +1,99 @@
+import pytest
+
+from adventure import commands
+from adventure.base import GameItem, GameRoom
+from adventure.constants import SCOPE_DEPTH
+from adventure.engine import GameEngine
+from adventure.enums import Match
+from adventure.objects import Door
+
+
+def _nest(thing, depth):
+    """`thing` inside `depth - 1` bags, so it's `depth` containers deep in a room"""
+    for idx in range(depth - 1):
+        thing = GameItem("a", f"bag {depth}-{idx}", items=[thing])
+    return thing
+
+
+def test_things_are_found_as_deep_as_the_scope_goes(room, player):
+    button = GameItem("a", "button")
+    room.add(_nest(button, SCOPE_DEPTH), "on the floor")
+    pebble = GameItem("a", "pebble")
+    room.add(_nest(pebble, SCOPE_DEPTH + 1), "on the floor")
+
+    context = commands._CommandContext(player)
+    assert context.find_objects("button") == (Match.Full, [button])
+    # Its bags might be mentioned by what's in them, but never the pebble itself
+    assert pebble not in context.find_objects("pebble")[1]
+
+
+def test_the_nearest_of_equally_good_matches_wins(room, player):
+    near, far = GameItem("a", "coin"), GameItem("a", "coin")
+    room.add(_nest(far, SCOPE_DEPTH), "on the floor")
+    room.add(near, "on the floor")
+
+    context = commands._CommandContext(player)
+    assert context.find_objects("coin")[1] == [near]
+
+
+def test_scope_is_rebuilt_every_turn(room, player, play):
+    play("take apple")
+    assert list(player.inventory.items) == []
+
+    room.add(GameItem("an", "apple"), "on the table")
+    play("take apple")
+    assert [x.name for x in player.inventory.items] == ["apple"]
+
+
+def test_scope_follows_the_player_into_another_room(room, player, play):
+    garden = GameRoom("a garden")
+    GameEngine.add_room("SCOPE_GARDEN", garden)
+    garden.add(GameItem("a", "rose"), "in a bed")
+    door = Door("a", "door", is_locked=False, goes_to="SCOPE_GARDEN")
+    room.add(door, "to the east")
+    play("open door")
+
+    play("enter door")
+    assert player.room is garden
+    play("take rose")
+    assert [x.name for x in player.inventory.items] == ["rose"]
+
+
+@pytest.fixture
+def rose_listener():
+    rose = GameItem("a", "rose")
+    heard = []
+
+    def on_smell(self, player):
+        heard.append(self)
+        return "Lovely."
+
+    commands.SMELL.register_object_handler(on_smell, rose)
+    yield rose, heard
+    commands.SMELL.unregister_object_handler(rose)
+
+
+def _run(text, player):
+    match, found = commands.Command.evaluate_command(text, player)
+    for info in found:
+        for handler in info['handlers']:
+            handler()
+    return match
+
+
+def test_object_listeners_fire_while_their_object_is_in_scope(room, player, rose_listener):
+    rose, heard = rose_listener
+    room.add(_nest(rose, SCOPE_DEPTH), "in a vase")
+
+    _run("smell rose", player)
+    assert heard == [rose]
+
+
+def test_object_listeners_stay_quiet_out_of_scope(room, player, rose_listener):
+    rose, heard = rose_listener
+
+    _run("smell rose", player)
+    room.add(_nest(rose, SCOPE_DEPTH + 1), "in a vase")
+    _run("smell rose", player)
+
+    assert heard == []
@@ -0,0 +1,16 @@
+def test_turn_output_is_sent_in_one_write(session):
+    writes = session.interface.writes
+
+    session.display_text("One")
+    session.display_text("Two")
+    assert writes == []
+
+    session.flush_output()
+    assert writes == ["One\n\n\nTwo"]
+
+    session.flush_output()
+    assert len(writes) == 1
+
+
+def test_unknown_command(play):
+    assert "didn't make much sense" in play("frobnicate the whatsit")
@@ -0,0 +1,46 @@
+from adventure.base import GameItem
+from adventure.objects import ItemStack
+
+
+def _coins(count):
+    return ItemStack("gold coin", "gold coins", count)
+
+
+def test_take_some_of_a_pile(room, player, play):
+    room.add(_coins(10), "on the floor")
+    # Would match "3 goldcoins" if the words of the name were run together
+    room.add(GameItem("a", "goldcoins"), "on the table")
+
+    assert "gold coins" in play("take 3 gold coins")
+
+    pile, = [x for x in room.items if isinstance(x, ItemStack)]
+    assert pile.count == 7
+    carried, = player.inventory.items
+    assert carried.count == 3
+
+
+def test_dropped_stack_merges_with_pile_in_same_place(room):
+    pile = _coins(5)
+    elsewhere = _coins(2)
+    room.add(pile, "on the floor")
+    room.add(elsewhere, "on the table")
+
+    room.add(_coins(4), "on the floor")
+
+    assert pile.count == 9
+    assert elsewhere.count == 2
+    assert len(room.items) == 2
+
+
+def test_stacks_only_merge_with_their_own_kind(room):
+    pile = _coins(5)
+    scenery = ItemStack("gold coin", "gold coins", 3, is_scenery=True)
+    room.add(pile, "on the floor")
+    room.add(scenery, "on the floor")
+
+    secret = ItemStack("gold coin", "gold coins", 1, is_secret=True)
+    room.add(secret, "on the floor")
+    room.add(ItemStack("gold coin", "gold coins", 2, is_secret=True), "on the floor")
+
+    assert (pile.count, scenery.count, secret.count) == (5, 3, 3)
+    assert len(room.items) == 3
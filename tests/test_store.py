@@ -0,0 +1,77 @@
+from adventure import materials
+from adventure.base import GameItem, GameRoom
+from adventure.engine import GameEngine
+from adventure.objects import Door, GameContainer
+from adventure.store import EntityStore
+
+
+def _stored_cellar():
+    cellar = GameRoom("a cellar", "Damp.")
+    cellar.add(GameItem("a", "barrel", material=materials.WOOD, size=3, items=[
+        GameItem("a", "cork"), GameItem("a", "tap", material=materials.METAL)
+    ]), "in the corner")
+    cellar.add(GameContainer("a", "crate", capacity=5), "by the stairs")
+    store, views = EntityStore.from_rooms({"STORE_CELLAR": cellar})
+    return store, views["STORE_CELLAR"]
+
+
+def _find(room, name):
+    # No property bits asked for, so everything at any depth matches
+    return next(x for x in room.find_with(0) if x.name == name)
+
+
+def test_rooms_come_out_of_the_store_as_they_went_in():
+    store, cellar = _stored_cellar()
+
+    assert (cellar.name, cellar.description) == ("a cellar", "Damp.")
+    barrel = _find(cellar, "barrel")
+    assert barrel.location == "in the corner" and barrel.material is materials.WOOD
+    assert sorted(x.name for x in barrel.items) == ["cork", "tap"]
+    assert barrel.total_size() == 5
+    # Anything with behaviour of its own stays a regular object
+    assert any(type(x) is GameContainer for x in cellar.items)
+
+
+def test_views_of_the_same_entity_are_equal():
+    store, cellar = _stored_cellar()
+    first = next(x for x in cellar.items if x.name == "barrel")
+    again = next(x for x in cellar.items if x.name == "barrel")
+
+    assert first is not again
+    assert first == again and hash(first) == hash(again)
+
+
+def test_stored_things_move_in_and_out_of_regular_containers(player):
+    store, cellar = _stored_cellar()
+    cork = _find(cellar, "cork")
+    barrel = cork.currently_in
+
+    player.inventory.add(cork)
+    assert cork.currently_in is player.inventory
+    assert cork not in barrel.items and cork in player.inventory.items
+    assert player.inventory.used_space == 1
+
+    cellar.add(cork, "on the floor")
+    assert cork in cellar.items and cork.location == "on the floor"
+    assert player.inventory.used_space == 0
+
+
+def test_deleted_things_leave_the_pockets_too(player):
+    store, cellar = _stored_cellar()
+    tap = _find(cellar, "tap")
+    player.inventory.add(tap)
+
+    tap.delete()
+    assert list(player.inventory.items) == []
+    assert player.inventory.used_space == 0
+
+
+def test_doors_in_stored_rooms_are_exits():
+    GameEngine.add_room("STORE_YARD", GameRoom("a yard"))
+    store, cellar = _stored_cellar()
+    door = Door("a", "hatch", is_locked=False, goes_to="STORE_YARD")
+
+    cellar.add(door, "overhead")
+    assert cellar.exits == [door]
+    cellar.remove(door)
+    assert cellar.exits == []
@@ -0,0 +1,24 @@
+from adventure import templates
+
+
+def test_dotted_paths_from_player_and_room(player, room):
+    text = "Hello {{player.name.first}}, welcome to {{ room.name }}."
+    assert templates.fill(text, player, room) == "Hello Tess, welcome to a test room."
+
+
+def test_text_without_placeholders_comes_back_as_it_is(player, room):
+    text = "Nothing to fill in {here}."
+    assert templates.fill(text, player, room) is text
+    assert templates.compile_template(text)(player, room) == text
+
+
+def test_placeholders_that_cannot_be_filled_keep_their_braces(player, room):
+    assert templates.fill("{{player.shoe_size}}", player, room) == "{player.shoe_size}"
+    assert templates.fill("a {{1 + 1}} b", player, room) == "a {1 + 1} b"
+    assert templates.fill("{{weather}}", player, room) == "{weather}"
+
+
+def test_templates_are_compiled_once(player, room):
+    text = "Still {{player.name.last}}"
+    assert templates.compile_template(text) is templates.compile_template(text)
+    assert templates.fill(text, player, room) == "Still Ter"
@@ -0,0 +1,82 @@
+import os
+import select
+import sys
+import threading
+import time
+
+import pytest
+
+from adventure.engine import TerminalInterface
+
+
+def test_flush_waits_for_everything(capsys):
+    interface = TerminalInterface(char_delay=0.001, newline_delay=0)
+    interface.display_text("You see a can.")
+    interface.flush()
+
+    assert "You see a can." in capsys.readouterr().out
+    assert interface._frames.unfinished_tasks == 0
+
+
+def test_flush_does_not_hang_when_renderer_dies(capsys):
+    interface = TerminalInterface(char_delay=0.001, newline_delay=0)
+    interface._renderer = threading.Thread(target=lambda: None)
+    interface._renderer.start()
+    interface._renderer.join()
+    interface._frames.put([("still shown", 0)])
+
+    finished = threading.Event()
+    waiter = threading.Thread(target=lambda: (interface.flush(), finished.set()), daemon=True)
+    waiter.start()
+
+    assert finished.wait(2), "flush() kept waiting on a dead renderer"
+    assert "still shown" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty') or sys.platform == 'win32', reason="needs a POSIX terminal")
+def test_keypress_skips_without_enter_and_reaches_the_prompt(monkeypatch, capsys):
+    import termios
+
+    master, slave = os.openpty()
+    stdin = os.fdopen(slave, 'r')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    settings = termios.tcgetattr(slave)
+    try:
+        # Would take about 20 seconds to type out
+        interface = TerminalInterface(char_delay=0.02, newline_delay=0)
+        interface.display_text("x" * 1000)
+
+        finished = threading.Event()
+        threading.Thread(target=lambda: (interface.flush(), finished.set()), daemon=True).start()
+
+        # Press a key once flush() has the terminal out of line-at-a-time mode
+        deadline = time.monotonic() + 5
+        while termios.tcgetattr(slave)[3] & termios.ICANON and time.monotonic() < deadline:
+            time.sleep(0.01)
+        os.write(master, b"q")
+
+        assert finished.wait(5), "the keypress didn't skip the rest"
+        assert capsys.readouterr().out.count("x") == 1000
+        assert termios.tcgetattr(slave) == settings
+
+        # What was typed ahead is still there for the prompt
+        os.write(master, b"uit\n")
+        assert select.select([slave], [], [], 1)[0]
+        assert stdin.readline() == "quit\n"
+    finally:
+        stdin.close()
+        os.close(master)
+
+
+def test_batched_messages_keep_their_own_pacing(monkeypatch):
+    interface = TerminalInterface(char_delay=0.01, newline_delay=0.1, frame_interval=0.01)
+    written = []
+    monkeypatch.setattr(interface, '_write', written.append)
+
+    long_text = "\n".join(f"line {x}" for x in range(20))
+    interface.display_texts([long_text, "Short"])
+
+    frames, = written
+    assert frames == interface._plan_frames(long_text) + interface._plan_frames("Short")
+    # The short message isn't sped up along with the long one
+    assert ("S", 0.01) in frames
@@ -0,0 +1,64 @@
+import pytest
+
+from adventure import utils
+from adventure.enums import Match
+
+
+@pytest.mark.parametrize("s1, s2, expected", [
+    ("MARTHA", "MARHTA", 0.944444),
+    ("DIXON", "DICKSONX", 0.766667),
+    ("JELLYFISH", "SMELLYFISH", 0.896296),
+    ("abc", "xyz", 0.0),
+    # Same as nltk: nothing to match, and single letters can't match at all
+    ("", "", 0.0),
+    ("", "abc", 0.0),
+    ("a", "a", 0.0),
+])
+def test_jaro_similarity_matches_nltk(s1, s2, expected):
+    assert utils.jaro_similarity(s1, s2) == pytest.approx(expected, abs=1e-6)
+
+
+def test_jaro_winkler_similarity():
+    assert utils.jaro_winkler_similarity("MARTHA", "MARHTA") == pytest.approx(0.961111, abs=1e-6)
+    assert utils.jaro_winkler_similarity("", "") == 0.0
+
+
+def test_rough_match_of_empty_text():
+    assert utils.is_rough_match("", "tin can") == Match.NoMatch
+    assert utils.is_rough_match("the tin can", "tin can") == Match.Full
+
+
+def test_player_name_fallback():
+    name = utils.PlayerName("  Kara Jo Anderson ")
+    assert (name.first, name.middle, name.last) == ("Kara", "Jo", "Anderson")
+    assert str(name) == "Kara Jo Anderson"
+
+
+def test_item_set_keeps_insertion_order():
+    items = utils.ItemSet(["a", "b"])
+    items.add("c")
+    items.add("a")      # Already there, so it stays where it was
+
+    assert list(items) == ["a", "b", "c"]
+    assert list(reversed(items)) == ["c", "b", "a"]
+    assert len(items) == 3 and "b" in items
+
+
+def test_item_set_remove_and_discard():
+    items = utils.ItemSet(["a", "b"])
+    items.remove("a")
+    items.discard("missing")
+
+    assert list(items) == ["b"]
+    with pytest.raises(ValueError):
+        items.remove("a")
+
+    items.clear()
+    assert not items and len(items) == 0 and "b" not in items
+
+
+def test_empty_item_set_holds_no_dict():
+    items = utils.ItemSet()
+    assert items._items is None and list(items) == []
+    with pytest.raises(ValueError):
+        items.remove("a")